@@ -0,0 +1,33 @@
+"""
+Long-lived MongoDB checkpointer shared by the compiled agents.
+One pooled MongoClient is created at startup and reused by every agent run,
+instead of opening (and tearing down) a connection per invocation.
+"""
+from langgraph.checkpoint.mongodb import MongoDBSaver
+from pymongo import MongoClient
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGODB_URI = os.getenv("MONGODB_URL")
+MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
+CHECKPOINT_MAX_POOL_SIZE = int(os.getenv("CHECKPOINT_MAX_POOL_SIZE", "20"))
+
+
+def create_checkpoint_client() -> MongoClient:
+    """Pooled client backing all agent checkpointers (closed on shutdown)"""
+    return MongoClient(MONGODB_URI, maxPoolSize=CHECKPOINT_MAX_POOL_SIZE)
+
+
+def create_checkpointer(client: MongoClient, checkpoint_collection_name: str) -> MongoDBSaver:
+    """
+    Checkpointer for one agent's collection.
+    MongoDBSaver's a* methods run on a worker thread, so graphs use it through ainvoke/astream
+    without blocking the event loop.
+    """
+    return MongoDBSaver(
+        client,
+        db_name=MONGODB_DB_NAME,
+        checkpoint_collection_name=checkpoint_collection_name,
+    )
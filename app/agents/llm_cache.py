@@ -0,0 +1,181 @@
+"""
+Content-addressed cache of LLM responses for agent nodes.
+
+Responses are keyed by a SHA-256 of (model, temperature, messages), so re-planning the
+same project replays identical prompts from cache instead of calling the API again.
+Two tiers: an in-memory LRU per worker, backed by a MongoDB collection with a TTL index
+that all workers share. Only responses that parse successfully are stored.
+
+Each entry carries its own expire_at, so the retention can change without rebuilding the
+index. Sampled calls (temperature > 0) are kept much shorter than deterministic ones:
+caching them freezes one random draw, which is only wanted for a short replay window.
+Every agent node currently samples at temperature 0.5, so in practice the cache is a
+short-lived one (LLM_CACHE_NONDETERMINISTIC_TTL_SECONDS, 1 hour by default) that absorbs
+repeated regenerations; LLM_CACHE_TTL_SECONDS only applies to temperature-0 callers.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Retention for responses sampled at temperature > 0 (every current agent node)
+LLM_CACHE_NONDETERMINISTIC_TTL_SECONDS = int(os.getenv("LLM_CACHE_NONDETERMINISTIC_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+        nondeterministic_ttl_seconds: int = LLM_CACHE_NONDETERMINISTIC_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.nondeterministic_ttl_seconds = nondeterministic_ttl_seconds
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._collection = None
+        self._stats: dict[str, dict[str, int]] = {}
+
+    async def configure(self, collection) -> None:
+        """Attach the shared MongoDB tier (called from lifespan)"""
+        self._collection = collection
+        await collection.create_index("expire_at", expireAfterSeconds=0)
+
+    def ttl_for(self, temperature: Optional[float]) -> int:
+        """Retention for a response sampled at temperature (None counts as the provider default, > 0)"""
+        return self.ttl_seconds if temperature == 0 else self.nondeterministic_ttl_seconds
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], messages: list[BaseMessage]) -> str:
+        material = json.dumps({
+            "model": model,
+            "temperature": temperature,
+            "messages": [{"role": m.type, "content": m.content} for m in messages],
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _record(self, node: str, outcome: str) -> None:
+        counters = self._stats.setdefault(node, {"memory_hits": 0, "store_hits": 0, "misses": 0, "bypassed": 0})
+        counters[outcome] += 1
+
+    def _remember(self, key: str, content: str, ttl_seconds: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl_seconds, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def lookup(self, key: str, node: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > time.monotonic():
+                self._memory.move_to_end(key)
+                self._record(node, "memory_hits")
+                return content
+            del self._memory[key]
+
+        if self._collection is not None:
+            try:
+                # The TTL monitor only sweeps once a minute, so filter expired entries here too
+                doc = await self._collection.find_one(
+                    {"_id": key, "expire_at": {"$gt": datetime.utcnow()}}, {"content": 1, "expire_at": 1}
+                )
+            except Exception as e:
+                print(f"❌ LLM cache lookup failed: {e}")
+                doc = None
+            if doc:
+                self._remember(key, doc["content"], (doc["expire_at"] - datetime.utcnow()).total_seconds())
+                self._record(node, "store_hits")
+                return doc["content"]
+
+        self._record(node, "misses")
+        return None
+
+    async def store(self, key: str, content: str, node: str, model: str, ttl_seconds: Optional[int] = None) -> None:
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._remember(key, content, ttl_seconds)
+        if self._collection is None:
+            return
+        now = datetime.utcnow()
+        try:
+            await self._collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    "content": content, "node": node, "model": model,
+                    "created_at": now, "expire_at": now + timedelta(seconds=ttl_seconds),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"❌ LLM cache store failed: {e}")
+
+    def record_bypass(self, node: str) -> None:
+        self._record(node, "bypassed")
+
+    def stats(self) -> dict:
+        """Per-node counters plus hit rate (bypassed calls are excluded from the rate)"""
+        report = {}
+        for node, counters in self._stats.items():
+            hits = counters["memory_hits"] + counters["store_hits"]
+            lookups = hits + counters["misses"]
+            report[node] = {**counters, "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+        return {"enabled": LLM_CACHE_ENABLED, "memory_entries": len(self._memory), "nodes": report}
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self._stats.clear()
+
+
+llm_cache = LLMResponseCache()
+
+
+def is_cache_bypassed(config: Optional[dict]) -> bool:
+    """Per-run opt-out: invoke the graph with configurable={"bypass_llm_cache": True}"""
+    return bool(((config or {}).get("configurable") or {}).get("bypass_llm_cache", False))
+
+
+async def cached_ainvoke(
+    llm,
+    messages: list[BaseMessage],
+    *,
+    node: str,
+    parse: Callable[[str], Any],
+    bypass: bool = False,
+    cacheable: Callable[[Any], bool] = lambda parsed: True,
+) -> Any:
+    """
+    Call llm with messages and return parse(content).
+    Served from cache when the same (model, temperature, messages) was answered before;
+    a fresh response is cached only if parse() accepts it (and cacheable(parsed) holds),
+    so bad outputs are never replayed. Retention follows the llm's temperature (see ttl_for).
+    """
+    if bypass or not LLM_CACHE_ENABLED:
+        llm_cache.record_bypass(node)
+        response = await llm.ainvoke(messages)
+        return parse(response.content.strip())
+
+    model = getattr(llm, "model_name", None) or ""
+    temperature = getattr(llm, "temperature", None)
+    key = llm_cache.make_key(model, temperature, messages)
+
+    content = await llm_cache.lookup(key, node)
+    if content is not None:
+        return parse(content)
+
+    response = await llm.ainvoke(messages)
+    content = response.content.strip()
+    parsed = parse(content)
+    if cacheable(parsed):
+        await llm_cache.store(key, content, node=node, model=model, ttl_seconds=llm_cache.ttl_for(temperature))
+    return parsed
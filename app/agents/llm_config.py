@@ -1,28 +1,92 @@
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from typing import Optional
+import itertools
+import httpx
 import os
 from app.config.external_services import OPENROUTER_BASE_URL
 
 load_dotenv()
 
-def get_chat_llm():
+# ── Client pool settings ────────────────────────────────────
+# Each model gets one pooled HTTP client; its connection cap is that model's concurrency limit
+# (extra calls wait for a free keep-alive connection instead of opening new ones).
+LLM_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", "8"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "120"))
 
-    chat_llm = ChatOpenAI(
-        model=os.getenv("MODEL_1"),
-        base_url=OPENROUTER_BASE_URL,
-        api_key=os.getenv("OPEN_ROUTER_API_KEY_4"),
-        temperature=0.5,
-    )
 
-    return chat_llm
+def load_openrouter_api_keys() -> list[str]:
+    """Keys listed in OPEN_ROUTER_API_KEYS (comma-separated) to rotate across; empty if unset"""
+    return [key.strip() for key in os.getenv("OPEN_ROUTER_API_KEYS", "").split(",") if key.strip()]
 
-def get_chat_llm_2():
 
-    chat_llm = ChatOpenAI(
-        model=os.getenv("MODEL_1"),
-        base_url=OPENROUTER_BASE_URL,
-        api_key=os.getenv("OPEN_ROUTER_API_KEY_2"),
-        temperature=0.5,
-    )
+class LLMClientRegistry:
+    """
+    Builds ChatOpenAI clients once and hands them out round-robin across the keys in
+    OPEN_ROUTER_API_KEYS; without that list each caller keeps its own key (default_api_key).
+    All clients for a model share one pooled httpx.AsyncClient, so TLS sessions are reused.
+    """
+
+    def __init__(
+        self,
+        base_url: str = OPENROUTER_BASE_URL,
+        api_keys: Optional[list[str]] = None,
+        max_concurrency_per_model: int = LLM_MAX_CONCURRENCY_PER_MODEL,
+    ):
+        self.base_url = base_url
+        self.api_keys = api_keys if api_keys is not None else load_openrouter_api_keys()
+        self.max_concurrency_per_model = max_concurrency_per_model
+        self._key_cycle = itertools.cycle(self.api_keys)
+        self._http_clients: dict[str, httpx.AsyncClient] = {}
+        self._llms: dict[tuple, ChatOpenAI] = {}
+
+    def _http_client(self, model: str) -> httpx.AsyncClient:
+        client = self._http_clients.get(model)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency_per_model,
+                    max_keepalive_connections=self.max_concurrency_per_model,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT_SECONDS),
+            )
+            self._http_clients[model] = client
+        return client
+
+    def get(self, model: Optional[str] = None, temperature: float = 0.5, default_api_key: Optional[str] = None) -> ChatOpenAI:
+        model = model or os.getenv("MODEL_1")
+        api_key = next(self._key_cycle) if self.api_keys else default_api_key
+        cache_key = (model, api_key, temperature)
+
+        llm = self._llms.get(cache_key)
+        if llm is None:
+            llm = ChatOpenAI(
+                model=model,
+                base_url=self.base_url,
+                api_key=api_key,
+                temperature=temperature,
+                timeout=LLM_REQUEST_TIMEOUT_SECONDS,
+                http_async_client=self._http_client(model),
+            )
+            self._llms[cache_key] = llm
+        return llm
+
+    async def aclose(self) -> None:
+        for client in self._http_clients.values():
+            await client.aclose()
+        self._http_clients.clear()
+        self._llms.clear()
+
+
+llm_registry = LLMClientRegistry()
+
+
+def get_chat_llm():
+
+    return llm_registry.get(os.getenv("MODEL_1"), temperature=0.5, default_api_key=os.getenv("OPEN_ROUTER_API_KEY_4"))
+
+def get_chat_llm_2():
 
-    return chat_llm
\ No newline at end of file
+    return llm_registry.get(os.getenv("MODEL_1"), temperature=0.5, default_api_key=os.getenv("OPEN_ROUTER_API_KEY_2"))
@@ -3,14 +3,12 @@ from app.agents.project_planner.state import ProjectPlannerState
 from app.agents.project_planner.nodes.feature_extraction import feature_extraction_node
 from app.agents.project_planner.nodes.milestone_definition import milestone_definition_node
 from app.agents.project_planner.nodes.task_generation import task_generation_node
-from langgraph.checkpoint.mongodb import MongoDBSaver
+from app.agents.project_planner.replan import route_planner_entry
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-MONGODB_URI = os.getenv("MONGODB_URL")
-MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
 PROJECT_PLANNER_AGENT_COLLECTION_NAME = os.getenv("PROJECT_PLANNER_AGENT_COLLECTION_NAME")
 
 
@@ -24,7 +22,11 @@ async def initiate_project_planner_agent_graph():
     graph.add_node("task_generation", task_generation_node)
 
     # create edges
-    graph.set_entry_point("feature_extraction")
+    # Normally starts at feature_extraction; incremental re-plans skip stages whose output was pre-filled
+    graph.set_conditional_entry_point(
+        route_planner_entry,
+        ["feature_extraction", "milestone_definition", "task_generation"]
+    )
     graph.add_edge("feature_extraction", "milestone_definition")
     graph.add_edge("milestone_definition", "task_generation")
     graph.add_edge("task_generation", END)
@@ -34,16 +36,43 @@ async def initiate_project_planner_agent_graph():
     return graph
 
 
-async def invoke_project_planner_agent(graph, initial_state : dict, thread_id:str):
-    
-    with MongoDBSaver.from_conn_string(conn_string=MONGODB_URI, db_name=MONGODB_DB_NAME, checkpoint_collection_name=PROJECT_PLANNER_AGENT_COLLECTION_NAME) as checkpointer:
+async def compile_project_planner_agent(checkpointer):
+    """Build and compile the graph once; the compiled agent is reused for every request"""
 
-        project_planner_agent = graph.compile(checkpointer=checkpointer)
+    graph = await initiate_project_planner_agent_graph()
 
-        print("Project Planner Agent Invoked")
+    return graph.compile(checkpointer=checkpointer)
 
-        config = {"configurable":{"thread_id" : f"{thread_id}"}}
 
-        final_state = await project_planner_agent.ainvoke(initial_state, config)
+async def get_previous_plan_state(project_planner_agent, thread_id:str):
+    """State of the last checkpointed run for this thread (None if the project was never planned)"""
 
-        return final_state
\ No newline at end of file
+    config = {"configurable":{"thread_id" : f"{thread_id}"}}
+
+    snapshot = await project_planner_agent.aget_state(config)
+
+    return snapshot.values if snapshot and snapshot.values else None
+
+
+async def invoke_project_planner_agent(project_planner_agent, initial_state : dict, thread_id:str, bypass_llm_cache: bool = False):
+
+    print("Project Planner Agent Invoked")
+
+    config = {"configurable":{"thread_id" : f"{thread_id}", "bypass_llm_cache": bypass_llm_cache}}
+
+    return await project_planner_agent.ainvoke(initial_state, config)
+
+
+async def stream_project_planner_agent(project_planner_agent, initial_state : dict, thread_id:str, bypass_llm_cache: bool = False):
+    """
+    Run the agent and yield (mode, chunk) as it progresses:
+    ("updates", {node_name: state_delta}) after each node, ("custom", payload) for in-node progress.
+    Closing the generator cancels the run.
+    """
+
+    print("Project Planner Agent Streamed")
+
+    config = {"configurable":{"thread_id" : f"{thread_id}", "bypass_llm_cache": bypass_llm_cache}}
+
+    async for mode, chunk in project_planner_agent.astream(initial_state, config, stream_mode=["updates", "custom"]):
+        yield mode, chunk
@@ -3,8 +3,18 @@ from langchain_core.messages import SystemMessage, HumanMessage
 # from app.services.llm_service import get_llm
 from app.agents.llm_config import get_chat_llm_2 as get_llm
 from app.utils.llm_parser import parse_llm_output
+from app.agents.llm_cache import cached_ainvoke, is_cache_bypassed
+from langchain_core.runnables import RunnableConfig
 
-async def feature_extraction_node(state: ProjectPlannerState) -> ProjectPlannerState:
+
+def parse_feature_list(content: str) -> list:
+    refined_features = parse_llm_output(content, expected_type="json")
+    if not isinstance(refined_features, list):
+        raise ValueError("Output is not a list")
+    return refined_features
+
+
+async def feature_extraction_node(state: ProjectPlannerState, config: RunnableConfig = None) -> ProjectPlannerState:
     """
     Analyzes the project description and high-level features to extract 
     granular technical requirements.
@@ -44,13 +54,12 @@ async def feature_extraction_node(state: ProjectPlannerState) -> ProjectPlannerS
     ]
     
     try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-        
-        refined_features = parse_llm_output(content, expected_type="json")
-        
-        if not isinstance(refined_features, list):
-            raise ValueError("Output is not a list")
+        refined_features = await cached_ainvoke(
+            llm, messages,
+            node="feature_extraction",
+            parse=parse_feature_list,
+            bypass=is_cache_bypassed(config),
+        )
             
         print(f"✅ Extracted {len(refined_features)} technical features.")
         return {"extracted_features": refined_features}
@@ -3,9 +3,10 @@ from langchain_core.messages import SystemMessage, HumanMessage
 # from app.services.llm_service import get_llm
 from app.agents.llm_config import get_chat_llm_2 as get_llm
 from app.utils.llm_parser import parse_llm_output
-import json
+from app.agents.llm_cache import cached_ainvoke, is_cache_bypassed
+from langchain_core.runnables import RunnableConfig
 
-async def milestone_definition_node(state: ProjectPlannerState) -> ProjectPlannerState:
+async def milestone_definition_node(state: ProjectPlannerState, config: RunnableConfig = None) -> ProjectPlannerState:
     """
     Groups refined features into sprints based on timeline and team size.
     """
@@ -60,10 +61,12 @@ async def milestone_definition_node(state: ProjectPlannerState) -> ProjectPlanne
     ]
     
     try:
-        response = await llm.ainvoke(messages)
-        content = response.content.strip()
-        
-        milestones = parse_llm_output(content, expected_type="json")
+        milestones = await cached_ainvoke(
+            llm, messages,
+            node="milestone_definition",
+            parse=lambda content: parse_llm_output(content, expected_type="json"),
+            bypass=is_cache_bypassed(config),
+        )
         
         print(f"✅ Created plan with {len(milestones)} sprints.")
         return {"milestones": milestones}
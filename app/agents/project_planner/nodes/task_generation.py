@@ -3,11 +3,106 @@ from langchain_core.messages import SystemMessage, HumanMessage
 # from app.services.llm_service import get_llm
 from app.agents.llm_config import get_chat_llm_2 as get_llm
 from app.utils.llm_parser import parse_llm_output
-import json
+from app.agents.llm_cache import cached_ainvoke, is_cache_bypassed
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+from app.agents.project_planner.replan import member_name, sprint_matches
+from dotenv import load_dotenv
+from typing import Callable, Optional
+import asyncio
+import os
 
-async def task_generation_node(state: ProjectPlannerState) -> ProjectPlannerState:
+load_dotenv()
+
+# Sprints are generated concurrently; cap in-flight LLM calls and retry failed sprints
+TASK_GENERATION_CONCURRENCY = int(os.getenv("TASK_GENERATION_CONCURRENCY", "4"))
+TASK_GENERATION_MAX_ATTEMPTS = int(os.getenv("TASK_GENERATION_MAX_ATTEMPTS", "3"))
+TASK_GENERATION_RETRY_BACKOFF_SECONDS = 1.0
+
+
+async def generate_sprint_tasks(
+    llm,
+    sprint: dict,
+    team_context: list,
+    semaphore: asyncio.Semaphore,
+    bypass_cache: bool = False,
+    on_complete: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Generate the tasks for a single sprint, retrying transient failures.
+    Never raises: a sprint that keeps failing is returned with empty tasks and its error.
+    on_complete (if given) is called with the finished sprint as soon as it is ready.
+    """
+    sprint_name = sprint.get("name", f"Sprint {sprint.get('sprint_number')}")
+    sprint_goals = sprint.get("goals", [])
+    
+    prompt = f"""
+    You are a Tech Lead assigning tasks to your team.
+    
+    SPRINT: {sprint_name}
+    GOALS: {', '.join(sprint_goals)}
+    TEAM:
+    {chr(10).join(team_context)}
+    
+    Task:
+    Break down the sprint goals into granular tasks (coding, design, testing, deployment).
+    Assign each task to the most suitable team member based on their role and skills.
+    Estimate time in hours (e.g. 4h, 8h). Priority: High/Medium/Low.
+    
+    OUTPUT FORMAT:
+    Return valid JSON listing tasks for this sprint.
+    [
+        {{
+            "id": "T-101",
+            "title": "Setup React Repo",
+            "assignee": "Name of member",
+            "role": "Frontend",
+            "estimate": "4h",
+            "priority": "High",
+            "status": "todo"
+        }},
+        ...
+    ]
+    """
+    
+    messages = [
+        SystemMessage(content="You are an expert Tech Lead creating detailed tasks."),
+        HumanMessage(content=prompt)
+    ]
+
+    last_error = None
+    for attempt in range(1, TASK_GENERATION_MAX_ATTEMPTS + 1):
+        try:
+            async with semaphore:
+                tasks = await cached_ainvoke(
+                    llm, messages,
+                    node="task_generation",
+                    parse=lambda content: parse_llm_output(content, expected_type="json"),
+                    bypass=bypass_cache,
+                )
+            
+            # Combine sprint info with tasks
+            result = {**sprint, "tasks": tasks}
+            break
+            
+        except Exception as e:
+            last_error = e
+            print(f"❌ Error generating tasks for sprint {sprint_name} (attempt {attempt}/{TASK_GENERATION_MAX_ATTEMPTS}): {e}")
+            if attempt < TASK_GENERATION_MAX_ATTEMPTS:
+                await asyncio.sleep(TASK_GENERATION_RETRY_BACKOFF_SECONDS * attempt)
+    else:
+        # Fallback: keep sprint but empty tasks
+        result = {**sprint, "tasks": [], "error": str(last_error)}
+
+    if on_complete:
+        on_complete(result)
+    return result
+
+
+async def task_generation_node(state: ProjectPlannerState, config: RunnableConfig = None) -> ProjectPlannerState:
     """
     Breaks down each sprint milestone into granular tasks and assigns them to team members.
+    Sprints are generated concurrently, so wall-clock time follows the slowest sprint.
     """
     print("--- TASK GENERATION ---")
     
@@ -19,73 +114,35 @@ async def task_generation_node(state: ProjectPlannerState) -> ProjectPlannerStat
     for member in team_members:
         # Assuming member dict has 'name', 'role' or 'job_title', 'skills'
         # Default to generic if missing
-        name = member.get("username", member.get("user_id", "Developer"))
+        name = member_name(member)
         role = member.get("role", "Full Stack Developer")   
         skills = member.get("skills", [])
         team_context.append(f"- {name} ({role}): Skills: {', '.join(skills)}")
     
     llm = get_llm()
-    
-    final_roadmap = []
-    
-    for sprint in milestones:
-        sprint_name = sprint.get("name", f"Sprint {sprint.get('sprint_number')}")
-        sprint_goals = sprint.get("goals", [])
-        
-        prompt = f"""
-        You are a Tech Lead assigning tasks to your team.
-        
-        SPRINT: {sprint_name}
-        GOALS: {', '.join(sprint_goals)}
-        TEAM:
-        {chr(10).join(team_context)}
-        
-        Task:
-        Break down the sprint goals into granular tasks (coding, design, testing, deployment).
-        Assign each task to the most suitable team member based on their role and skills.
-        Estimate time in hours (e.g. 4h, 8h). Priority: High/Medium/Low.
-        
-        OUTPUT FORMAT:
-        Return valid JSON listing tasks for this sprint.
-        [
-            {{
-                "id": "T-101",
-                "title": "Setup React Repo",
-                "assignee": "Name of member",
-                "role": "Frontend",
-                "estimate": "4h",
-                "priority": "High",
-                "status": "todo"
-            }},
-            ...
-        ]
-        """
-        
-        messages = [
-            SystemMessage(content="You are an expert Tech Lead creating detailed tasks."),
-            HumanMessage(content=prompt)
-        ]
-        
-        try:
-            response = await llm.ainvoke(messages)
-            content = response.content.strip()
-            
-            tasks = parse_llm_output(content, expected_type="json")
-            
-            # Combine sprint info with tasks
-            final_roadmap.append({
-                **sprint,
-                "tasks": tasks
-            })
-            
-        except Exception as e:
-            print(f"❌ Error generating tasks for sprint {sprint_name}: {e}")
-            # Fallback: keep sprint but empty tasks
-            final_roadmap.append({
-                **sprint,
-                "tasks": [],
-                "error": str(e)
-            })
+    semaphore = asyncio.Semaphore(TASK_GENERATION_CONCURRENCY)
+    # Streamed runs (stream_mode="custom") receive each sprint as soon as its tasks are ready
+    writer = get_stream_writer()
+    on_complete = lambda sprint: writer({"event": "sprint_tasks", "sprint": sprint})
+
+    # Incremental re-plan: sprints that are unchanged since the last run keep their tasks
+    previous_roadmap = state.get("previous_roadmap") or []
+
+    async def plan_sprint(sprint: dict) -> dict:
+        previous = next((p for p in previous_roadmap if sprint_matches(sprint, p)), None)
+        if previous is not None:
+            reused = {**sprint, "tasks": previous.get("tasks", [])}
+            writer({"event": "sprint_tasks", "sprint": reused, "reused": True})
+            return reused
+        return await generate_sprint_tasks(
+            llm, sprint, team_context, semaphore,
+            bypass_cache=is_cache_bypassed(config), on_complete=on_complete
+        )
+
+    # gather() keeps the results in milestone order
+    final_roadmap = await asyncio.gather(*[plan_sprint(sprint) for sprint in milestones])
 
-    print(f"✅ Generated tasks for {len(final_roadmap)} sprints.")
-    return {"roadmap": final_roadmap}
+    failed = sum(1 for sprint in final_roadmap if sprint.get("error"))
+    reused = sum(1 for sprint in milestones if any(sprint_matches(sprint, p) for p in previous_roadmap))
+    print(f"✅ Generated tasks for {len(final_roadmap) - failed}/{len(final_roadmap)} sprints ({reused} reused).")
+    return {"roadmap": list(final_roadmap)}
@@ -0,0 +1,108 @@
+"""
+Incremental re-planning.
+
+Compares a new planner input with the last checkpointed run of the same project and
+pre-fills whatever is still valid, so the graph only re-runs the stages whose inputs changed:
+  - features/description unchanged     -> reuse extracted_features
+  - ...and timeline/team size unchanged -> reuse milestones too (graph starts at task_generation)
+  - sprints whose goals and team are unchanged keep their tasks (see previous_roadmap)
+"""
+import hashlib
+import json
+from typing import Iterable, Optional
+
+
+def _fingerprint(*parts) -> str:
+    material = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def features_fingerprint(state: dict) -> str:
+    """Inputs of feature_extraction"""
+    return _fingerprint(state.get("title", ""), state.get("description", ""), state.get("features", []))
+
+
+def milestones_fingerprint(state: dict) -> str:
+    """Inputs of milestone_definition (besides extracted_features)"""
+    return _fingerprint(state.get("title", ""), state.get("estimated_duration", ""), len(state.get("team_members", [])))
+
+
+def member_name(member: dict) -> str:
+    return str(member.get("username", member.get("user_id", "Developer")))
+
+
+def team_fingerprints(team_members: list) -> dict[str, str]:
+    """Per-member fingerprint of what task generation sees (name, role, skills)"""
+    return {
+        member_name(m): _fingerprint(m.get("role", "Full Stack Developer"), m.get("skills", []))
+        for m in team_members
+    }
+
+
+def sprint_matches(sprint: dict, previous: dict) -> bool:
+    """A sprint's tasks can be reused when it is the same sprint with the same goals"""
+    return (
+        sprint.get("sprint_number") == previous.get("sprint_number")
+        and sprint.get("name") == previous.get("name")
+        and sprint.get("goals", []) == previous.get("goals", [])
+    )
+
+
+def _reusable_sprints(previous_roadmap: list, old_team: list, new_team: list, regenerate: set) -> list:
+    old_members = team_fingerprints(old_team)
+    new_members = team_fingerprints(new_team)
+
+    # A new member could take work in any sprint, so every sprint is affected
+    if set(new_members) - set(old_members):
+        return []
+
+    changed = {name for name, fp in old_members.items() if new_members.get(name) != fp}
+    reusable = []
+    for sprint in previous_roadmap:
+        if sprint.get("error") or sprint.get("sprint_number") in regenerate:
+            continue
+        if any(str(task.get("assignee")) in changed for task in sprint.get("tasks", []) if isinstance(task, dict)):
+            continue
+        reusable.append(sprint)
+    return reusable
+
+
+def prepare_incremental_state(initial_state: dict, previous_state: Optional[dict], regenerate_sprints: Iterable[int] = ()) -> dict:
+    """
+    Return initial_state pre-filled from previous_state (the last checkpoint of this project).
+    Falls back to a full run when there is no previous completed plan.
+    """
+    state = dict(initial_state)
+    if not previous_state or not previous_state.get("roadmap"):
+        print("[Re-plan] No previous plan, running all stages")
+        return state
+
+    if features_fingerprint(previous_state) != features_fingerprint(state) or not previous_state.get("extracted_features"):
+        print("[Re-plan] Features changed, running all stages")
+        return state
+
+    state["extracted_features"] = previous_state["extracted_features"]
+
+    if milestones_fingerprint(previous_state) != milestones_fingerprint(state) or not previous_state.get("milestones"):
+        print("[Re-plan] Reusing extracted features, redefining milestones")
+    else:
+        state["milestones"] = previous_state["milestones"]
+        print("[Re-plan] Reusing extracted features and milestones")
+
+    state["previous_roadmap"] = _reusable_sprints(
+        previous_state.get("roadmap", []),
+        previous_state.get("team_members", []),
+        state.get("team_members", []),
+        set(regenerate_sprints or []),
+    )
+    print(f"[Re-plan] {len(state['previous_roadmap'])} sprint(s) eligible for task reuse")
+    return state
+
+
+def route_planner_entry(state: dict) -> str:
+    """Conditional entry point: skip the stages pre-filled by prepare_incremental_state"""
+    if state.get("extracted_features") and state.get("milestones"):
+        return "task_generation"
+    if state.get("extracted_features"):
+        return "milestone_definition"
+    return "feature_extraction"
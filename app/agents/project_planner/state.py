@@ -25,6 +25,7 @@ class ProjectPlannerState(TypedDict):
     # Intermediate
     extracted_features: List[str]
     milestones: List[dict]
+    previous_roadmap: List[dict] # Sprints from the last run whose tasks may be reused (incremental re-plan)
     
     # Output
     roadmap: List[dict] # Final list of sprints/tasks
@@ -0,0 +1,100 @@
+"""
+Candidate preparation for LLM evaluation.
+
+Skill search returns the same person once per matching role, each with the full profile
+text. Before evaluation, candidates are deduped by email, stripped to the fields the
+evaluator needs and split into chunks that fit a token budget, so prompt size stays
+bounded however many candidates come back.
+"""
+import json
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EVAL_CHUNK_TOKEN_BUDGET = int(os.getenv("EVAL_CHUNK_TOKEN_BUDGET", "2500"))
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "4"))
+EVAL_SKILLS_MAX_CHARS = int(os.getenv("EVAL_SKILLS_MAX_CHARS", "400"))
+
+# Rough chars-per-token ratio for English/JSON; the models sit behind OpenRouter,
+# so there is no single tokenizer to count with exactly.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def compact_candidates(candidates: list[dict]) -> list[dict]:
+    """
+    One entry per email with only what the evaluator scores on.
+    A person matched for several roles is listed once with all of them.
+    """
+    by_email: dict[str, dict] = {}
+    for candidate in candidates:
+        email = candidate.get("email", "")
+        if not email:
+            continue
+        entry = by_email.get(email)
+        if entry is None:
+            skills = " ".join(str(candidate.get("skills", "")).split())
+            entry = {
+                "email": email,
+                "roles": [],
+                "skills": skills[:EVAL_SKILLS_MAX_CHARS],
+                "availability_hours": candidate.get("availability_hours", 0),
+                "timezone_diff": candidate.get("timezone_diff", 0),
+            }
+            by_email[email] = entry
+        role = candidate.get("role", "")
+        if role and role not in entry["roles"]:
+            entry["roles"].append(role)
+    return list(by_email.values())
+
+
+def chunk_by_token_budget(candidates: list[dict], budget: int = EVAL_CHUNK_TOKEN_BUDGET) -> list[list[dict]]:
+    """Greedily pack candidates (in order) into chunks whose compact JSON stays within budget tokens"""
+    chunks: list[list[dict]] = []
+    current: list[dict] = []
+    used = 0
+    for candidate in candidates:
+        cost = estimate_tokens(compact_json(candidate))
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(candidate)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_recommendation(candidate: dict, llm_eval: dict | None = None) -> dict:
+    """
+    Merge a candidate with its LLM evaluation. Without one, match_score falls back to
+    the deterministic rank_score (or raw similarity) on a 0-100 scale.
+    """
+    llm_eval = llm_eval or {}
+    fallback_score = candidate.get("rank_score", candidate.get("similarity_score", 0))
+    return {
+        # Original candidate data
+        "role": candidate.get("role", ""),
+        "name": candidate.get("name", ""),
+        "username": candidate.get("username", ""),
+        "email": candidate.get("email", ""),
+        "skills": candidate.get("skills", ""),
+        "similarity_score": candidate.get("similarity_score", 0),
+        "availability_hours": candidate.get("availability_hours", 0),
+        "timezone": candidate.get("timezone", "UTC"),
+        "timezone_diff": candidate.get("timezone_diff", 0),
+        "timezone_score": candidate.get("timezone_score", 1.0),
+        "rank_score": candidate.get("rank_score"),
+        # LLM evaluation data
+        "match_score": llm_eval.get("match_score", int(fallback_score * 100)),
+        "reasoning": llm_eval.get("reasoning", "Skill match based on profile analysis.")
+    }
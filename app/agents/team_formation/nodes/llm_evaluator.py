@@ -1,15 +1,24 @@
 from langchain_core.prompts import ChatPromptTemplate
 from app.agents.llm_config import get_chat_llm
 from ..state import TeamFormationState
-from langchain_core.output_parsers import StrOutputParser
-from app.agents.utils import extract_json
-import json
+from langchain_core.runnables import RunnableConfig
+from app.agents.utils import extract_json, is_extraction_error
+from app.agents.llm_cache import cached_ainvoke, is_cache_bypassed
+from app.agents.team_formation.evaluation import (
+    EVAL_CONCURRENCY,
+    build_recommendation,
+    chunk_by_token_budget,
+    compact_candidates,
+    compact_json,
+)
+import asyncio
 
 EVAL_PROMPT = """You are evaluating candidates for a project team.
 Project: {project_title}
 Required Skills: {required_skills}
 
-Candidates (with their email as identifier):
+Candidates (compact JSON; email is the identifier, roles are the roles they matched,
+timezone_diff is hours from the project owner):
 {candidates_json}
 
 For each candidate, evaluate and return:
@@ -23,57 +32,61 @@ Return ONLY a JSON array, no markdown:
 ]
 """
 
-async def evaluate_candidates(state: TeamFormationState) -> dict:
+async def evaluate_chunk(llm, messages, bypass_cache: bool) -> list:
+    """Score one chunk of candidates; a chunk that fails is logged and left unscored"""
+    try:
+        evaluations = await cached_ainvoke(
+            llm, messages,
+            node="evaluate_candidates",
+            parse=extract_json,
+            bypass=bypass_cache,
+            cacheable=lambda parsed: not is_extraction_error(parsed),
+        )
+    except Exception as e:
+        print(f"❌ Candidate evaluation chunk failed: {e}")
+        return []
+    return evaluations if isinstance(evaluations, list) else []
+
+
+async def evaluate_candidates(state: TeamFormationState, config: RunnableConfig = None) -> dict:
     llm = get_chat_llm()
     candidates = state.get("candidates", [])
     
     if not candidates:
         return {"recommendations": []}
 
+    # Each person once, compact fields only, packed into token-budgeted chunks
+    chunks = chunk_by_token_budget(compact_candidates(candidates))
+
     prompt = ChatPromptTemplate.from_template(EVAL_PROMPT)
-    chain = prompt | llm | StrOutputParser()
+    semaphore = asyncio.Semaphore(EVAL_CONCURRENCY)
+    bypass_cache = is_cache_bypassed(config)
 
-    response = await chain.ainvoke({
-        "project_title": state["project_title"],
-        "required_skills": ", ".join(state["required_skills"]),
-        "candidates_json": json.dumps(candidates, indent=2)
-    })
+    async def run_chunk(chunk: list) -> list:
+        messages = prompt.format_messages(
+            project_title=state["project_title"],
+            required_skills=", ".join(state["required_skills"]),
+            candidates_json=compact_json(chunk)
+        )
+        async with semaphore:
+            return await evaluate_chunk(llm, messages, bypass_cache)
+
+    chunk_results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks])
+    print(f"✅ Evaluated {sum(len(c) for c in chunks)} unique candidates in {len(chunks)} chunk(s)")
 
-    # Parse JSON from LLM response
-    llm_evaluations = extract_json(response)
-    
     # Create lookup by email for LLM scores
     eval_lookup = {}
-    if isinstance(llm_evaluations, list):
+    for llm_evaluations in chunk_results:
         for evaluation in llm_evaluations:
-            email = evaluation.get("email", "")
+            email = evaluation.get("email", "") if isinstance(evaluation, dict) else ""
             if email:
                 eval_lookup[email] = evaluation
     
     # Merge original candidate data with LLM evaluation
-    recommendations = []
-    for candidate in candidates:
-        email = candidate.get("email", "")
-        llm_eval = eval_lookup.get(email, {})
-        
-        # Combine all data: original candidate + LLM evaluation
-        recommendation = {
-            # Original candidate data
-            "role": candidate.get("role", ""),
-            "name": candidate.get("name", ""),
-            "username": candidate.get("username", ""),
-            "email": email,
-            "skills": candidate.get("skills", ""),
-            "similarity_score": candidate.get("similarity_score", 0),
-            "availability_hours": candidate.get("availability_hours", 0),
-            "timezone": candidate.get("timezone", "UTC"),
-            "timezone_diff": candidate.get("timezone_diff", 0),
-            "timezone_score": candidate.get("timezone_score", 1.0),
-            # LLM evaluation data
-            "match_score": llm_eval.get("match_score", int(candidate.get("similarity_score", 0) * 100)),
-            "reasoning": llm_eval.get("reasoning", "Skill match based on profile analysis.")
-        }
-        recommendations.append(recommendation)
+    recommendations = [
+        build_recommendation(candidate, eval_lookup.get(candidate.get("email", "")))
+        for candidate in candidates
+    ]
     
     # Sort by match_score descending
     recommendations.sort(key=lambda x: x.get("match_score", 0), reverse=True)
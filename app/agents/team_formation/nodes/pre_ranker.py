@@ -0,0 +1,28 @@
+from ..state import TeamFormationState
+from app.agents.team_formation.ranking import top_k_per_role, RANK_TOP_K_PER_ROLE
+from app.agents.team_formation.evaluation import build_recommendation
+
+FAST_MODE_REASONING = "Ranked by skill similarity, timezone overlap and availability."
+
+
+async def pre_rank(state: TeamFormationState) -> dict:
+    """
+    Keep only the top-K candidates per role by blended deterministic score.
+    In fast mode (roles taken straight from the required skills) the ranking is returned
+    as the recommendations and the LLM is never called.
+    """
+    candidates = state.get("candidates", [])
+    ranked = top_k_per_role(candidates, RANK_TOP_K_PER_ROLE)
+    print(f"✅ Pre-ranked {len(candidates)} candidates, {len(ranked)} kept (top {RANK_TOP_K_PER_ROLE} per role)")
+
+    if not state.get("fast_mode"):
+        return {"candidates": ranked}
+
+    recommendations = [
+        build_recommendation(candidate, {"reasoning": FAST_MODE_REASONING}) for candidate in ranked
+    ]
+    return {"candidates": ranked, "recommendations": recommendations}
+
+
+def route_after_pre_rank(state: TeamFormationState) -> str:
+    return "done" if state.get("fast_mode") else "evaluate"
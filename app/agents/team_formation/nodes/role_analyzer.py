@@ -1,8 +1,9 @@
 from langchain_core.prompts import ChatPromptTemplate
 from app.agents.llm_config import get_chat_llm
 from ..state import TeamFormationState
-from langchain_core.output_parsers import StrOutputParser
-from app.agents.utils import extract_json
+from langchain_core.runnables import RunnableConfig
+from app.agents.utils import extract_json, is_extraction_error
+from app.agents.llm_cache import cached_ainvoke, is_cache_bypassed
 
 ROLE_PROMPT = """You are a technical team analyst.
 Given the project requirements, identify the specific team roles needed.
@@ -16,21 +17,33 @@ Return a JSON array of roles:
 ]
 """
 
-async def analyze_roles(state: TeamFormationState) -> dict:
+def skill_roles(required_skills: list) -> list:
+    """Deterministic roles for fast mode: one role per required skill"""
+    return [{"role": skill, "count": 1, "skills": [skill]} for skill in required_skills]
+
+
+async def analyze_roles(state: TeamFormationState, config: RunnableConfig = None) -> dict:
+    if state.get("fast_mode"):
+        return {"roles": skill_roles(state["required_skills"])}
+
     llm = get_chat_llm()
 
     prompt = ChatPromptTemplate.from_template(ROLE_PROMPT)
 
-    chain = prompt | llm | StrOutputParser()
-
-    response = await chain.ainvoke({
-        "project_title": state["project_title"],
-        "required_skills": ", ".join(state["required_skills"]),
-        "team_size": state["team_size"],
-        "timeline": state["timeline"]
-    })
+    messages = prompt.format_messages(
+        project_title=state["project_title"],
+        required_skills=", ".join(state["required_skills"]),
+        team_size=state["team_size"],
+        timeline=state["timeline"]
+    )
 
     # Parse JSON from LLM response (handles markdown code blocks)
-    roles = extract_json(response)
+    roles = await cached_ainvoke(
+        llm, messages,
+        node="analyze_roles",
+        parse=extract_json,
+        bypass=is_cache_bypassed(config),
+        cacheable=lambda parsed: not is_extraction_error(parsed),
+    )
 
     return {"roles": roles}
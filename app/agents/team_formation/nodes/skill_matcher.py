@@ -1,28 +1,55 @@
 from app.vector_stores.pinecone_db import get_pinecone_vector_store
 from ..state import TeamFormationState
-from app.utils.timezone_utils import filter_candidates_by_timezone
+from app.utils.timezone_utils import filter_candidates_by_timezone, utc_offset_metadata_filter
+import asyncio
+
+SKILL_MATCHES_PER_ROLE = 5
+MAX_TIMEZONE_HOUR_DIFFERENCE = 4.0  # Only include people within 4 hours
+
+
+def dedupe_best_role(candidates: list[dict]) -> list[dict]:
+    """One entry per person (email, else username), keeping the role they matched best"""
+    best: dict[str, dict] = {}
+    for candidate in candidates:
+        key = candidate.get("email") or candidate.get("username") or candidate.get("name")
+        current = best.get(key)
+        if current is None or candidate["similarity_score"] > current["similarity_score"]:
+            best[key] = candidate
+    return list(best.values())
 
 
 async def skill_matcher(state: TeamFormationState) -> dict:
     vector_store = get_pinecone_vector_store()
     owner_timezone = state.get("owner_timezone","UTC")
 
-    all_candidates = []
-
     # roles should be a list from extract_json
     roles = state.get("roles", [])
     if isinstance(roles, dict):
         # Handle case where LLM returns {"roles": [...]}
         roles = roles.get("roles", [])
+    roles = [role for role in roles if isinstance(role, dict)]
+    if not roles:
+        return {"candidates": []}
 
-    for role in roles:
-        # building search query from role skills
-        skills = role.get("skills", [])
-        query = " ".join(skills) if skills else role.get("role", "")
+    # building search queries from role skills
+    queries = [" ".join(role.get("skills", [])) or role.get("role", "") for role in roles]
 
-        # search in pinecone (cosine similarity search with score)
-        results = vector_store.similarity_search_with_score(query, k=5)
+    # The timezone pre-filter runs inside Pinecone, so top-k is spent on reachable people
+    timezone_filter = utc_offset_metadata_filter(owner_timezone, MAX_TIMEZONE_HOUR_DIFFERENCE)
 
+    # embed every role query in one batch, then run the Pinecone queries concurrently
+    # (the blocking SDK calls run in worker threads so the event loop stays free)
+    query_vectors = await asyncio.to_thread(vector_store.embeddings.embed_documents, queries)
+    results_per_role = await asyncio.gather(*[
+        asyncio.to_thread(
+            vector_store.similarity_search_by_vector_with_score,
+            vector, k=SKILL_MATCHES_PER_ROLE, filter=timezone_filter
+        )
+        for vector in query_vectors
+    ])
+
+    all_candidates = []
+    for role, results in zip(roles, results_per_role):
         for doc, score in results:
             all_candidates.append({
                 "role": role.get("role", ""),
@@ -34,12 +61,16 @@ async def skill_matcher(state: TeamFormationState) -> dict:
                 "availability_hours": doc.metadata.get("availability_hours", 0),
                 "timezone" : doc.metadata.get("timezone","UTC")
             })
-        
-        # FILTER CANDIDATES BY TIMEZONE (ADD THIS)
+
+    # A person matching several roles is kept once, under their best-matching role
+    unique_candidates = dedupe_best_role(all_candidates)
+    print(f"✅ Skill search: {len(roles)} roles, {len(all_candidates)} matches, {len(unique_candidates)} unique people")
+
+    # FILTER CANDIDATES BY TIMEZONE
     filtered_candidates = filter_candidates_by_timezone(
-        candidates=all_candidates,
+        candidates=unique_candidates,
         owner_timezone=owner_timezone,
-        max_hour_difference=4.0  # Only include people within 4 hours
+        max_hour_difference=MAX_TIMEZONE_HOUR_DIFFERENCE
     )
 
-    return {"candidates": filtered_candidates}
\ No newline at end of file
+    return {"candidates": filtered_candidates}
@@ -0,0 +1,83 @@
+"""
+Deterministic candidate pre-ranking.
+
+Blends the signals skill search already produced (vector similarity, timezone
+compatibility, weekly availability) into one score with NumPy over the whole candidate
+set, then keeps the top K per role. Only those go to the LLM evaluator; in fast mode
+the blended ranking is the final answer and the LLM is skipped entirely.
+"""
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RANK_WEIGHT_SIMILARITY = float(os.getenv("RANK_WEIGHT_SIMILARITY", "0.6"))
+RANK_WEIGHT_TIMEZONE = float(os.getenv("RANK_WEIGHT_TIMEZONE", "0.25"))
+RANK_WEIGHT_AVAILABILITY = float(os.getenv("RANK_WEIGHT_AVAILABILITY", "0.15"))
+RANK_TOP_K_PER_ROLE = int(os.getenv("RANK_TOP_K_PER_ROLE", "3"))
+# Weekly hours at which availability counts as full
+RANK_FULL_AVAILABILITY_HOURS = float(os.getenv("RANK_FULL_AVAILABILITY_HOURS", "40"))
+
+
+def _rank_weights() -> np.ndarray:
+    """(similarity, timezone, availability) weights; similarity only if the configured ones are unusable"""
+    weights = np.array([RANK_WEIGHT_SIMILARITY, RANK_WEIGHT_TIMEZONE, RANK_WEIGHT_AVAILABILITY])
+    if not np.all(np.isfinite(weights)) or (weights < 0).any() or weights.sum() <= 0:
+        print(f"❌ RANK_WEIGHT_* must be non-negative with a positive sum (got {weights.tolist()}), "
+              f"ranking by similarity only")
+        return np.array([1.0, 0.0, 0.0])
+    return weights
+
+
+RANK_WEIGHTS = _rank_weights()
+
+
+def _column(candidates: list[dict], key: str, default: float) -> np.ndarray:
+    values = []
+    for candidate in candidates:
+        try:
+            values.append(float(candidate.get(key, default) or 0.0))
+        except (TypeError, ValueError):
+            values.append(default)
+    return np.asarray(values, dtype=np.float64)
+
+
+def blended_scores(candidates: list[dict]) -> np.ndarray:
+    """Score in [0, 1] per candidate: weighted similarity, timezone score and availability"""
+    if not candidates:
+        return np.zeros(0)
+
+    similarity = np.clip(_column(candidates, "similarity_score", 0.0), 0.0, 1.0)
+    timezone = np.clip(_column(candidates, "timezone_score", 1.0), 0.0, 1.0)
+    availability = np.clip(_column(candidates, "availability_hours", 0.0) / RANK_FULL_AVAILABILITY_HOURS, 0.0, 1.0)
+
+    signals = np.vstack([similarity, timezone, availability])
+    return RANK_WEIGHTS @ signals / RANK_WEIGHTS.sum()
+
+
+def top_k_per_role(candidates: list[dict], k: int = RANK_TOP_K_PER_ROLE) -> list[dict]:
+    """
+    Set candidate["rank_score"] and return the best k candidates of every role,
+    ordered by rank_score (highest first).
+    """
+    if not candidates:
+        return []
+
+    scores = blended_scores(candidates)
+    roles = np.array([c.get("role", "") for c in candidates], dtype=object)
+
+    keep = []
+    for role in dict.fromkeys(roles):
+        indices = np.flatnonzero(roles == role)
+        best = indices[np.argsort(-scores[indices], kind="stable")[:k]]
+        keep.extend(best.tolist())
+
+    keep.sort(key=lambda i: -scores[i])
+    ranked = []
+    for i in keep:
+        candidate = dict(candidates[i])
+        candidate["rank_score"] = round(float(scores[i]), 4)
+        ranked.append(candidate)
+    return ranked
@@ -8,6 +8,7 @@ class TeamFormationState(TypedDict):
     team_size: int
     timeline: str
     owner_timezone : str
+    fast_mode: bool             # Skip LLM evaluation, return the deterministic ranking
     
     # Intermediate
     roles: List[dict]           # From role analyzer
@@ -3,14 +3,12 @@ from .state import TeamFormationState
 from .nodes.role_analyzer import analyze_roles
 from .nodes.skill_matcher import skill_matcher
 from .nodes.llm_evaluator import evaluate_candidates
-from langgraph.checkpoint.mongodb import MongoDBSaver
+from .nodes.pre_ranker import pre_rank, route_after_pre_rank
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-MONGODB_URI = os.getenv("MONGODB_URL")
-MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME")
 TEAM_FORMATION_AGENT_COLLECTION_NAME = os.getenv("TEAM_FORMATION_AGENT_COLLECTION_NAME")
 
 
@@ -21,12 +19,15 @@ async def initiate_team_formation_agent_graph():
     # create nodes
     graph.add_node("analyze_roles", analyze_roles)
     graph.add_node("skill_matcher", skill_matcher)
+    graph.add_node("pre_rank", pre_rank)
     graph.add_node("evaluate_candidates", evaluate_candidates)
 
     # create edges
     graph.add_edge(START, "analyze_roles")
     graph.add_edge("analyze_roles", "skill_matcher")
-    graph.add_edge("skill_matcher", "evaluate_candidates")
+    graph.add_edge("skill_matcher", "pre_rank")
+    # fast mode returns the deterministic ranking without calling the LLM evaluator
+    graph.add_conditional_edges("pre_rank", route_after_pre_rank, {"evaluate": "evaluate_candidates", "done": END})
     graph.add_edge("evaluate_candidates", END)
 
     # return graph
@@ -34,16 +35,33 @@ async def initiate_team_formation_agent_graph():
     return graph
 
 
-async def invoke_team_formation_agent(graph, initial_state : dict, thread_id:str):
-    
-    with MongoDBSaver.from_conn_string(conn_string=MONGODB_URI, db_name=MONGODB_DB_NAME, checkpoint_collection_name=TEAM_FORMATION_AGENT_COLLECTION_NAME) as checkpointer:
+async def compile_team_formation_agent(checkpointer):
+    """Build and compile the graph once; the compiled agent is reused for every request"""
 
-        team_formation_agent = graph.compile(checkpointer=checkpointer)
+    graph = await initiate_team_formation_agent_graph()
 
-        print("Team Formation Agent Invoked")
+    return graph.compile(checkpointer=checkpointer)
 
-        config = {"configurable":{"thread_id" : f"{thread_id}"}}
 
-        final_state = await team_formation_agent.ainvoke(initial_state, config)
+async def invoke_team_formation_agent(team_formation_agent, initial_state : dict, thread_id:str, bypass_llm_cache: bool = False):
 
-        return final_state 
\ No newline at end of file
+    print("Team Formation Agent Invoked")
+
+    config = {"configurable":{"thread_id" : f"{thread_id}", "bypass_llm_cache": bypass_llm_cache}}
+
+    return await team_formation_agent.ainvoke(initial_state, config)
+
+
+async def stream_team_formation_agent(team_formation_agent, initial_state : dict, thread_id:str, bypass_llm_cache: bool = False):
+    """
+    Run the agent and yield (mode, chunk) as it progresses:
+    ("updates", {node_name: state_delta}) after each node, ("custom", payload) for in-node progress.
+    Closing the generator cancels the run.
+    """
+
+    print("Team Formation Agent Streamed")
+
+    config = {"configurable":{"thread_id" : f"{thread_id}", "bypass_llm_cache": bypass_llm_cache}}
+
+    async for mode, chunk in team_formation_agent.astream(initial_state, config, stream_mode=["updates", "custom"]):
+        yield mode, chunk
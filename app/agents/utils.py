@@ -38,3 +38,8 @@ def extract_json(text: str) -> Union[dict, list]:
         
         # Return empty if nothing works
         return {"error": "Could not parse JSON", "raw": text}
+
+
+def is_extraction_error(result: Union[dict, list]) -> bool:
+    """True when extract_json could not find any JSON in the response"""
+    return isinstance(result, dict) and "error" in result and "raw" in result
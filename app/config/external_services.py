@@ -12,6 +12,15 @@ load_dotenv()
 PISTON_API_URL: str = os.getenv(
     "PISTON_API_URL", "http://localhost:2000/api/v2/execute"
 )
+# Catalog of installed languages/versions (cached by app/services/runtime_registry.py)
+PISTON_RUNTIMES_URL: str = os.getenv(
+    "PISTON_RUNTIMES_URL", PISTON_API_URL.rsplit("/execute", 1)[0] + "/runtimes"
+)
+# Piston's interactive WebSocket API (streams stdout/stderr while the program runs)
+PISTON_WS_URL: str = os.getenv(
+    "PISTON_WS_URL",
+    PISTON_API_URL.replace("http", "ws", 1).rsplit("/execute", 1)[0] + "/connect"
+)
 
 # ── LLM / AI services ──────────────────────────────────────
 OPENROUTER_BASE_URL: str = os.getenv(
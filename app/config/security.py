@@ -1,20 +1,128 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
 
 # cryptography works on bits and bytes so we need to convert the password to bytes
 
-def hash_password(password: str) -> str:
+# ── Cost policy ─────────────────────────────────────────────
+# BCRYPT_ROUNDS pins the cost factor (default 12). With BCRYPT_CALIBRATE=true the cost is
+# instead calibrated at startup so a single hash takes roughly BCRYPT_TARGET_MS on this
+# machine, but never below BCRYPT_MIN_ROUNDS. Calibration runs per worker, so only opt in
+# where all workers run on the same hardware.
+DEFAULT_BCRYPT_ROUNDS = 12
+BCRYPT_MIN_ROUNDS = max(DEFAULT_BCRYPT_ROUNDS, int(os.getenv("BCRYPT_MIN_ROUNDS", str(DEFAULT_BCRYPT_ROUNDS))))
+BCRYPT_MAX_ROUNDS = 15
+BCRYPT_TARGET_MS = int(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_CALIBRATE = os.getenv("BCRYPT_CALIBRATE", "false").lower() == "true"
+
+# ── Worker pool ─────────────────────────────────────────────
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_IN_FLIGHT = int(os.getenv("PASSWORD_HASH_MAX_IN_FLIGHT", str(PASSWORD_HASH_WORKERS * 4)))
+
+_bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", str(DEFAULT_BCRYPT_ROUNDS)))
+_executor: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _password_bytes(password: str) -> bytes:
+    # encode converts the raw password to bytes, bcrypt can process only 72 bytes
+    return password.encode('utf-8')[:72]
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """Hash a password using bcrypt"""
-    # Truncate password to 72 bytes (bcrypt limit)
-    password_bytes = password.encode('utf-8')[:72]  # encode converts the raw password to bytes, bcrypt can process only 72 bytes
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+    salt = bcrypt.gensalt(rounds=rounds or _bcrypt_rounds)
+    return bcrypt.hashpw(_password_bytes(password), salt).decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     try:
-        password_bytes = plain_password.encode('utf-8')[:72]
         hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return bcrypt.checkpw(_password_bytes(plain_password), hashed_bytes)
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+
+def get_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Read the cost factor out of a bcrypt hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def get_bcrypt_rounds() -> int:
+    """Cost factor currently used for new hashes"""
+    return _bcrypt_rounds
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when a stored hash is weaker than the current cost policy"""
+    rounds = get_hash_rounds(hashed_password)
+    return rounds is not None and rounds < _bcrypt_rounds
+
+
+def calibrate_bcrypt_rounds(target_ms: int = BCRYPT_TARGET_MS) -> int:
+    """
+    Pick the highest cost factor whose hash time stays within target_ms.
+    Every extra round doubles the work, so one measurement at the minimum cost is enough.
+    """
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=BCRYPT_MIN_ROUNDS))
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 1e-3)
+
+    extra_rounds = math.floor(math.log2(target_ms / elapsed_ms)) if target_ms > elapsed_ms else 0
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS + extra_rounds))
+
+
+def start_password_hasher() -> None:
+    """Calibrate the cost policy and start the hashing process pool (called from lifespan)"""
+    global _executor, _semaphore, _bcrypt_rounds
+
+    if BCRYPT_CALIBRATE and os.getenv("BCRYPT_ROUNDS") is None:
+        _bcrypt_rounds = calibrate_bcrypt_rounds()
+
+    _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    _semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_IN_FLIGHT)
+    logger.info("Password hasher ready: %d workers, bcrypt cost %d", PASSWORD_HASH_WORKERS, _bcrypt_rounds)
+
+
+def shutdown_password_hasher() -> None:
+    global _executor, _semaphore
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _semaphore = None
+
+
+async def _run_in_pool(fn, *args):
+    # Outside the app lifespan (scripts, shells) fall back to a thread
+    if _executor is None or _semaphore is None:
+        return await asyncio.to_thread(fn, *args)
+
+    async with _semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the worker pool without blocking the event loop"""
+    # Pass the cost explicitly: pool processes do not see calibration done after they started
+    return await _run_in_pool(hash_password, password, _bcrypt_rounds)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the worker pool without blocking the event loop"""
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
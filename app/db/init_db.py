@@ -6,9 +6,17 @@ from app.models.User import User
 from app.models.password_reset_token import PasswordResetToken
 
 
+def ensure_indexes():
+    """create_all() skips existing tables, so add indexes declared since a table was created"""
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 def init_db():
     """Create all tables in the database"""
     SQLModel.metadata.create_all(engine)
+    ensure_indexes()
     print("✅ MySQL connection established")
     print("✅ Database tables created: User, PasswordResetToken")
 
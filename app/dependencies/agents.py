@@ -0,0 +1,9 @@
+from fastapi import Request
+
+# Compiled LangGraph agents are built once in lifespan and stored on app.state
+
+def get_team_formation_agent(request: Request):
+    return request.app.state.team_formation_agent
+
+def get_project_planner_agent(request: Request):
+    return request.app.state.project_planner_agent
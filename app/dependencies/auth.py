@@ -3,21 +3,26 @@ Auth dependencies for extracting user info from JWT tokens.
 Shared across all routers that require authentication.
 """
 
+import logging
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from app.config.jwt_config import decode_token
+from app.services.token_verifier import Principal, TokenVerificationError, token_verifier
+
+logger = logging.getLogger(__name__)
 
 # OAuth2 scheme - enables Swagger's "Authorize" button
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
-    """Extract user_id from JWT token"""
-    print(f"🔍 DEBUG: Token received: {token[:30] if token else 'NONE'}...")
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Verify the bearer token (cached until its exp) and return the caller"""
     try:
-        payload = decode_token(token)
-        print(f"✅ DEBUG: User ID extracted: {payload['sub']}")
-        return int(payload["sub"])
-    except Exception as e:
-        print(f"❌ DEBUG: Token error: {e}")
+        return token_verifier.verify_access(token)
+    except TokenVerificationError as e:
+        logger.info("Rejected bearer token", extra={"reason": str(e)})
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+
+async def get_current_user_id(principal: Principal = Depends(get_current_principal)) -> int:
+    """Extract user_id from JWT token"""
+    return principal.user_id
@@ -0,0 +1,27 @@
+"""
+Profile context dependencies for the authenticated caller.
+FastAPI resolves a dependency once per request, so every Depends(get_current_profile)
+in a request shares one lookup; across requests the process-level profile cache
+answers without a MongoDB round trip in the common case.
+"""
+
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from app.dependencies.auth import get_current_user_id
+from app.dependencies.collections import get_profiles_collection
+from app.services.profile_cache import profile_cache
+
+
+async def get_current_profile(
+    request: Request,
+    auth_user_id: int = Depends(get_current_user_id)
+) -> Optional[dict]:
+    """The caller's raw profile document, or None if they have not got one"""
+    return await profile_cache.get(get_profiles_collection(request), auth_user_id)
+
+
+async def require_current_profile(profile: Optional[dict] = Depends(get_current_profile)) -> dict:
+    """The caller's raw profile document; 404 if it does not exist"""
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Any, List, Literal, Optional
+from datetime import datetime
+
+
+class AgentJobRequest(BaseModel):
+    agent: Literal["team_formation", "project_planner"]
+    project_id: str
+    bypass_cache: bool = False
+    # team_formation only, see TeamFormationRequest
+    fast_mode: bool = False
+    # project_planner only, see ProjectPlannerRequest
+    incremental: bool = False
+    regenerate_sprints: List[int] = []
+
+
+class AgentJobResponse(BaseModel):
+    """Status of a queued agent run; result holds the agent's response body once it succeeded"""
+    job_id: str
+    agent: str
+    project_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    deduplicated: bool = False  # True when the submission attached to an identical in-flight job
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
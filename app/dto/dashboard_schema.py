@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from app.dto.project_schema import ProjectPage
+from app.dto.team_schema import TeamResponse
+
+
+class DashboardResponse(BaseModel):
+    """
+    Everything the workspace home needs in one payload: the same data as /my-projects (first
+    page), /teams/my-teams, /rooms, /get-my-invitations and /chat/get-chat-rooms.
+    """
+    projects: ProjectPage
+    teams: list[TeamResponse] = Field(default_factory=list)
+    rooms: list[dict] = Field(default_factory=list)
+    invitations: list[dict] = Field(default_factory=list)
+    pending_invitations: int = 0
+    chat_rooms: list[dict] = Field(default_factory=list)
@@ -3,6 +3,10 @@ from typing import List, Optional, Any
 
 class ProjectPlannerRequest(BaseModel):
     project_id: str
+    bypass_cache: bool = False  # force fresh LLM calls instead of replaying cached responses
+    # Re-plan only what changed since the last plan of this project (reuses checkpointed stages)
+    incremental: bool = False
+    regenerate_sprints: List[int] = []  # with incremental: sprint numbers whose tasks are always redone
 
 class UpdateTaskStatusRequest(BaseModel):
     project_id: str
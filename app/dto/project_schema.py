@@ -66,6 +66,35 @@ class ProjectResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class ProjectListItem(BaseModel):
+    """
+    List-view projection of a project (browse / my projects).
+    description is a preview; fetch /project/{id} for the full document.
+    """
+    model_config = ConfigDict(extra="ignore")
+
+    id: str
+    auth_user_id: int
+    title: str
+    category: str
+    description: str  # first PROJECT_LIST_DESCRIPTION_CHARS characters
+    required_skills: list[str] = Field(default_factory=list)
+    team_size: TeamSize
+    team_id: Optional[str] = None
+    complexity: str
+    estimated_duration: str
+    status: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class ProjectPage(BaseModel):
+    """One page of projects, newest first; pass next_cursor back as ?cursor= for the next page"""
+    items: list[ProjectListItem]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
 class ProjectUpdateRequest(BaseModel):
     """
     Request schema for updating a project.
@@ -7,6 +7,8 @@ class TeamFormationRequest(BaseModel):
     required_skills: List[str]
     team_size: int
     timeline: str
+    bypass_cache: bool = False  # force fresh LLM calls instead of replaying cached responses
+    fast_mode: bool = False  # deterministic ranking only, no LLM evaluation (milliseconds)
 
 class TeamFormationResponse(BaseModel):
     recommendations: list[dict]
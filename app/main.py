@@ -1,7 +1,4 @@
 # In main.py
-import asyncio
-from app.models.password_reset_token import PasswordResetToken
-from app.db.mysql_connection import engine
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.db.init_db import init_db
@@ -10,8 +7,6 @@ from app.routers.auth import auth_router
 from app.routers.profiles import profile_router
 from app.routers.projects import project_router
 from app.routers.agents import agent_router
-from sqlmodel import Session, select, or_
-from datetime import datetime
 from app.db.mongo import create_mongo_client
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.invitations import invitation_router
@@ -20,9 +15,22 @@ from app.routers.planned_projects import planned_projects_router
 from app.routers.rooms import rooms_router
 from app.routers.execution import router as execution_router
 from app.routers.chat import router as chat_router
-from app.tasks.background_tasks import delete_old_invitations
+from app.routers.dashboard import dashboard_router
+from app.tasks.background_tasks import register_maintenance_jobs
+from app.tasks.scheduler import job_scheduler
+from app.config.security import start_password_hasher, shutdown_password_hasher
+from app.agents.llm_config import llm_registry
+from app.agents.llm_cache import llm_cache
+from app.services.agent_jobs import agent_job_queue
+from app.services.agent_runs import build_agent_job_runners
+from app.services.execution_gateway import execution_gateway
+from app.services.runtime_registry import runtime_registry
+from app.agents.checkpointer import create_checkpoint_client, create_checkpointer
+from app.agents.team_formation.team_formation_graph import compile_team_formation_agent, TEAM_FORMATION_AGENT_COLLECTION_NAME
+from app.agents.project_planner.graph import compile_project_planner_agent, PROJECT_PLANNER_AGENT_COLLECTION_NAME
 import os
 import socketio
+from app.sockets.server import sio
 from app.sockets.handlers import register_socket_handlers
 
 load_dotenv()
@@ -30,48 +38,47 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGODB_URL")
 MONGODB_NAME = os.getenv("MONGODB_DB_NAME")
 
-async def cleanup_used_otps():
-    """Background worker that runs every 15 minutes to cleanup used OTPs"""
-    while True:
-        await asyncio.sleep(900)  # 15 minutes
-
-        with Session(engine) as session:
-            # Fixed: Use or_() for SQLModel OR conditions
-            tokens = session.exec(
-                select(PasswordResetToken).where(
-                    or_(
-                        PasswordResetToken.is_used == True,
-                        PasswordResetToken.expires_at < datetime.utcnow()
-                    )
-                )
-            ).all()
-
-            for token in tokens:
-                session.delete(token)
-
-            session.commit()
-            print(f"🧹 Cleaned up {len(tokens)} expired/used OTPs")
-            
-        
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()  # Creates tables on startup
+    start_password_hasher()  # Calibrates bcrypt cost & starts the hashing process pool
 
     mongo_client = create_mongo_client(MONGO_URI)
     app.state.mongo_client = mongo_client
     app.state.db = mongo_client[MONGODB_NAME]
 
     print("MONGODB CONNECTION ESTABLISHED")
+
+    await llm_cache.configure(app.state.db["llm_cache"])  # Shared tier of the LLM response cache
+
+    # Compile the agents once against a long-lived, pooled checkpointer client
+    checkpoint_client = create_checkpoint_client()
+    app.state.team_formation_agent = await compile_team_formation_agent(
+        create_checkpointer(checkpoint_client, TEAM_FORMATION_AGENT_COLLECTION_NAME)
+    )
+    app.state.project_planner_agent = await compile_project_planner_agent(
+        create_checkpointer(checkpoint_client, PROJECT_PLANNER_AGENT_COLLECTION_NAME)
+    )
+
+    runtime_registry.start()  # Piston runtime catalog, refreshed periodically
+
+    # Worker pool for queued agent runs (POST /api/agents/jobs)
+    await agent_job_queue.start(app.state.db["agent_jobs"], build_agent_job_runners(app.state))
     
-    # Start background cleanup tasks
-    cleanup_task = asyncio.create_task(cleanup_used_otps())
-    invitation_cleanup_task = asyncio.create_task(delete_old_invitations(interval_seconds=86400, limit_days=7)) # Run daily, delete older than 7 days
+    # Maintenance jobs: one worker runs each job per interval (Mongo lease), see app/tasks/scheduler.py
+    register_maintenance_jobs(job_scheduler, app.state.db)
+    await job_scheduler.start(app.state.db["scheduled_jobs"])
 
     yield
     # Cancel on shutdown
-    cleanup_task.cancel()
-    invitation_cleanup_task.cancel()
+    await agent_job_queue.stop()
+    await runtime_registry.stop()
+    await job_scheduler.stop()  # lets a running job finish (bounded), releases its lease
     mongo_client.close() # Close MongoDB connection
+    checkpoint_client.close()
+    await llm_registry.aclose()
+    await execution_gateway.aclose()
+    shutdown_password_hasher()
 
 # Rename to fastapi_app to distinguish from the SocketIO app wrapper
 fastapi_app = FastAPI(lifespan=lifespan)
@@ -94,12 +101,9 @@ fastapi_app.include_router(planned_projects_router)
 fastapi_app.include_router(rooms_router)
 fastapi_app.include_router(chat_router)
 fastapi_app.include_router(execution_router)
+fastapi_app.include_router(dashboard_router)
 
 # --- SOCKET.IO SETUP ---
-sio = socketio.AsyncServer(
-    async_mode='asgi',
-    cors_allowed_origins='*' # Allow all origins for now
-)
 
 # Register Event Handlers
 register_socket_handlers(sio)
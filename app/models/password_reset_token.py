@@ -1,11 +1,15 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 
 class PasswordResetToken(SQLModel, table=True):
+    # Serves the maintenance purge: is_used = TRUE OR (is_used = FALSE AND expires_at < now)
+    __table_args__ = (Index("ix_passwordresettoken_is_used_expires_at", "is_used", "expires_at"),)
+
     id : Optional[int] = Field(default=None, primary_key=True)
     user_id : int = Field(foreign_key="user.id", index=True, ondelete="CASCADE")
-    otp  :str
+    otp  :str = Field(index=True)  # reset_password looks tokens up by OTP
     expires_at : datetime
     is_used : bool = False
-    created_at : datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at : datetime = Field(default_factory=datetime.utcnow)
@@ -1,209 +1,255 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from app.agents.team_formation.team_formation_graph import initiate_team_formation_agent_graph, invoke_team_formation_agent
+from fastapi.responses import StreamingResponse
+from app.agents.team_formation.team_formation_graph import stream_team_formation_agent
 from app.dto.team_formation_schema import TeamFormationRequest, TeamFormationResponse
+from app.dto.agent_job_schema import AgentJobRequest, AgentJobResponse
 from app.dependencies.auth import get_current_user_id
-from app.dependencies.collections import get_projects_collection, get_teams_collection, get_project_plans_collection, get_profiles_collection
-from bson import ObjectId
-from app.agents.project_planner.graph import initiate_project_planner_agent_graph, invoke_project_planner_agent
+from app.dependencies.profile import get_current_profile
+from app.dependencies.agents import get_team_formation_agent, get_project_planner_agent
+from app.agents.project_planner.graph import stream_project_planner_agent
 from app.dto.project_planner_schema import ProjectPlannerRequest, ProjectPlannerResponse
-from app.agents.team_formation.state import TeamFormationState
-from app.dto.team_schema import TeamResponse
-from app.models.project_plan import ProjectPlan
-from datetime import datetime, timedelta
-import re
+from app.agents.llm_cache import llm_cache
+from app.services.agent_runs import (
+    build_team_formation_state,
+    build_project_planner_state,
+    save_project_plan,
+    prepare_project_planner_state,
+    run_team_formation,
+    run_project_planner,
+)
+from app.services.agent_jobs import agent_job_queue, AgentJobQueueFull
+import json
 
 agent_router = APIRouter(prefix="/api/agents", tags=["Team Formation Agent"])
 
 
-def parse_duration_to_days(duration_str: str) -> int:
-    """
-    Parse a human-readable duration string into a number of days.
-    Supports: '2 weeks', '1 month', '10 days', '3 months', etc.
-    Defaults to 14 days if parsing fails.
-    """
-    duration_str = duration_str.strip().lower()
-    match = re.match(r'(\d+)\s*(day|days|week|weeks|month|months)', duration_str)
-    if not match:
-        return 14  # default to 2 weeks
-    
-    value = int(match.group(1))
-    unit = match.group(2)
-    
-    if 'day' in unit:
-        return value
-    elif 'week' in unit:
-        return value * 7
-    elif 'month' in unit:
-        return value * 30
-    return 14
-
-
-def compute_sprint_dates(roadmap: list, start_date: datetime) -> list:
+@agent_router.get("/llm-cache/stats", status_code=200)
+async def get_llm_cache_stats(auth_user_id: int = Depends(get_current_user_id)):
+    """Per-node hit/miss counters of the LLM response cache in this worker"""
+    return llm_cache.stats()
+
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Partial results pushed to the client after each node (full state deltas can be large)
+def summarize_team_formation_update(node: str, update: dict) -> dict:
+    if node == "analyze_roles":
+        return {"roles": update.get("roles", [])}
+    if node == "skill_matcher":
+        return {"candidate_count": len(update.get("candidates", []))}
+    if node == "pre_rank":
+        return {"shortlisted_count": len(update.get("candidates", [])), "recommendations": update.get("recommendations")}
+    if node == "evaluate_candidates":
+        return {"recommendations": update.get("recommendations", [])}
+    return {}
+
+
+def summarize_project_planner_update(node: str, update: dict) -> dict:
+    if node == "feature_extraction":
+        return {"extracted_features": update.get("extracted_features", [])}
+    if node == "milestone_definition":
+        return {"milestones": update.get("milestones", [])}
+    if node == "task_generation":
+        return {"sprint_count": len(update.get("roadmap", []))}
+    return {}
+
+
+async def stream_agent_events(request: Request, events, summarize, state: dict):
     """
-    Compute start_date and end_date for each sprint sequentially.
-    Each sprint starts when the previous one ends.
+    Relay agent progress as SSE: a "node" event per finished node, "progress" for in-node
+    updates, then "done" (or "error"). Stops, cancelling the run, when the client disconnects.
     """
-    current_start = start_date
-    for sprint in roadmap:
-        duration_days = parse_duration_to_days(sprint.get("duration", "2 weeks"))
-        sprint_end = current_start + timedelta(days=duration_days)
-        sprint["start_date"] = current_start.isoformat()
-        sprint["end_date"] = sprint_end.isoformat()
-        current_start = sprint_end
-    return roadmap
+    try:
+        async for mode, chunk in events:
+            if await request.is_disconnected():
+                print("Client disconnected, cancelling agent run")
+                return
+            if mode == "custom":
+                yield sse_event("progress", chunk)
+                continue
+            for node, update in chunk.items():
+                update = update or {}
+                state.update(update)
+                yield sse_event("node", {"node": node, "error": update.get("error"), **summarize(node, update)})
+    except Exception as e:
+        print(f"Agent Stream Failed: {e}")
+        yield sse_event("error", {"detail": str(e)})
+        raise
+    finally:
+        await events.aclose()
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @agent_router.post("/team-formation", response_model=TeamFormationResponse, status_code=200)
 async def team_formation_agent(
     request: Request,
     request_body: TeamFormationRequest,
-    auth_user_id: int = Depends(get_current_user_id)
+    auth_user_id: int = Depends(get_current_user_id),
+    owner_profile: dict | None = Depends(get_current_profile),
+    team_formation_agent = Depends(get_team_formation_agent)
 ):
-    # get project from MongoDB
-    projects_collection = get_projects_collection(request)
-    profiles_collection = get_profiles_collection(request)
-
-    project = await projects_collection.find_one({"_id": ObjectId(request_body.project_id)})
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    # GET OWNER'S TIMEZONE FROM THEIR PROFILE (ADD THIS)
-    owner_profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
-    owner_timezone = owner_profile.get("timezone", "UTC") if owner_profile else "UTC"
-
-    # Build initial state with keys matching TeamFormationState
-    initial_state = {
-        "project_id": str(project["_id"]),
-        "project_title": project.get("title", ""),
-        "required_skills": project.get("required_skills", []),
-        "team_size": project.get("team_size", {}).get("max", 4),
-        "timeline": project.get("estimated_duration", "4 weeks"),
-        "owner_timezone": owner_timezone,
-        "roles": [],
-        "candidates": [],
-        "recommendations": [],
-        "error": None
-    }
-
-    # initiate team formation agent graph (building the graph)
-
-    team_formation_agent_graph = await initiate_team_formation_agent_graph()
-
-    # invoke team formation agent graph (executing the graph)
-
-    final_state = await invoke_team_formation_agent(
-        team_formation_agent_graph, 
-        initial_state, 
-        str(auth_user_id)
+    initial_state = await build_team_formation_state(
+        request.app.state.db, request_body.project_id, owner_profile, fast_mode=request_body.fast_mode
     )
 
-    print(final_state)
+    # invoke the precompiled team formation agent (executing the graph)
+    result = await run_team_formation(
+        team_formation_agent, initial_state, str(auth_user_id), bypass_llm_cache=request_body.bypass_cache
+    )
+
+    return TeamFormationResponse(**result)
 
-    return TeamFormationResponse(
-        recommendations=final_state.get("recommendations", []),
-        error=final_state.get("error")
+
+@agent_router.post("/team-formation/stream", status_code=200)
+async def team_formation_agent_stream(
+    request: Request,
+    request_body: TeamFormationRequest,
+    auth_user_id: int = Depends(get_current_user_id),
+    owner_profile: dict | None = Depends(get_current_profile),
+    team_formation_agent = Depends(get_team_formation_agent)
+):
+    """Same as /team-formation, streamed as Server-Sent Events (roles, candidates, recommendations)"""
+    initial_state = await build_team_formation_state(
+        request.app.state.db, request_body.project_id, owner_profile, fast_mode=request_body.fast_mode
     )
 
+    async def event_stream():
+        state = dict(initial_state)
+        events = stream_team_formation_agent(
+            team_formation_agent, initial_state, str(auth_user_id), bypass_llm_cache=request_body.bypass_cache
+        )
+        async for event in stream_agent_events(request, events, summarize_team_formation_update, state):
+            yield event
+        if await request.is_disconnected():
+            return
+
+        yield sse_event("done", TeamFormationResponse(
+            recommendations=state.get("recommendations", []),
+            error=state.get("error")
+        ).model_dump())
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 
 @agent_router.post("/project-planner", response_model=ProjectPlannerResponse, status_code=200)
 async def project_planner_agent(
     request: Request,
     request_body: ProjectPlannerRequest,
-    auth_user_id: int = Depends(get_current_user_id)
+    auth_user_id: int = Depends(get_current_user_id),
+    project_planner_agent = Depends(get_project_planner_agent)
 ):
     print(f"--- Project Planner Agent Request Received for Project ID: {request_body.project_id} ---")
-    
-    projects_collection = get_projects_collection(request)
-    teams_collection = get_teams_collection(request)
-    project_plans_collection = get_project_plans_collection(request)
-    
-    # Fetch Project
-    try:
-        project = await projects_collection.find_one({"_id": ObjectId(request_body.project_id)})
-        print(f"Project found: {project.get('title', 'Unknown')}")
-    except:
-        print(f"Invalid Project ID format: {request_body.project_id}")
-        raise HTTPException(status_code=400, detail="Invalid Project ID format")
-        
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    # Fetch Team (if exists)
-    team_members = []
-    if project.get("team_id"):
-        try:
-            team = await teams_collection.find_one({"_id": ObjectId(project["team_id"])})
-            if team:
-                team_members = team.get("team_members", [])
-                print(f"Team found: {len(team_members)} members")
-        except:
-            print("Invalid team ID format or team not found")
-    else:
-        print("No team assigned to this project yet.")
-            
-    # Prepare State
-    initial_state = {
-        "project_id": str(project["_id"]),
-        "title": project.get("title", ""),
-        "category": project.get("category", ""),
-        "description": project.get("description", ""),
-        "features": project.get("features", []),
-        "required_skills": project.get("required_skills", []),
-        "team_size": project.get("team_size", {}), # Pass raw dict
-        "team_members": team_members, # Raw list from DB
-        "team_id": project.get("team_id"),
-        "complexity": project.get("complexity", ""),
-        "estimated_duration": project.get("estimated_duration", ""),
-        "status": project.get("status", "Open"),
-        "extracted_features": [],
-        "milestones": [],
-        "roadmap": [],
-        "error": None
-    }
-    
+
+    initial_state = await build_project_planner_state(request.app.state.db, request_body.project_id)
+
     # Run Agent
     try:
-        print("Initiating Project Planner Agent Graph...")
-        # Using new async structure:
-        graph = await initiate_project_planner_agent_graph()
-        
         print("Invoking Project Planner Agent...")
-        result = await invoke_project_planner_agent(graph, initial_state, thread_id=str(project["_id"]))
-        
-        print("Project Planner Agent Execution Successful")
-        
-        # Save Plan to DB
-        try:
-            # Compute sprint dates before saving
-            now = datetime.utcnow()
-            roadmap_with_dates = compute_sprint_dates(result["roadmap"], now)
-            
-            plan_data = ProjectPlan(
-                project_id=result["project_id"],
-                roadmap=roadmap_with_dates,
-                extracted_features=result["extracted_features"],
-                created_at=now,
-                updated_at=now
-            )
-            
-            # Upsert: Update if exists, Insert if not
-            await project_plans_collection.update_one(
-                {"project_id": result["project_id"]},
-                {"$set": plan_data.model_dump()},
-                upsert=True
-            )
-            print(f"✅ Project Plan saved to DB for project: {result['project_id']}")
-        except Exception as db_err:
-            print(f"❌ Failed to save project plan to DB: {db_err}")
-            # We don't raise error here to let the response go through, but log it
-        
-        return ProjectPlannerResponse(
-            project_id=result["project_id"],
-            roadmap=roadmap_with_dates,
-            extracted_features=result["extracted_features"],
-            error=result.get("error")
+        result = await run_project_planner(
+            project_planner_agent, request.app.state.db, initial_state,
+            bypass_llm_cache=request_body.bypass_cache,
+            incremental=request_body.incremental,
+            regenerate_sprints=request_body.regenerate_sprints
         )
-        
+        return ProjectPlannerResponse(**result)
+
     except Exception as e:
         print(f"Agent Execution Failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@agent_router.post("/project-planner/stream", status_code=200)
+async def project_planner_agent_stream(
+    request: Request,
+    request_body: ProjectPlannerRequest,
+    auth_user_id: int = Depends(get_current_user_id),
+    project_planner_agent = Depends(get_project_planner_agent)
+):
+    """
+    Same as /project-planner, streamed as Server-Sent Events: extracted features, then milestones,
+    then each sprint's tasks as it completes. The plan is saved once the run finishes.
+    """
+    print(f"--- Project Planner Agent Stream Request Received for Project ID: {request_body.project_id} ---")
+
+    initial_state = await build_project_planner_state(request.app.state.db, request_body.project_id)
+    initial_state = await prepare_project_planner_state(
+        project_planner_agent, initial_state, request_body.incremental, request_body.regenerate_sprints
+    )
+
+    async def event_stream():
+        state = dict(initial_state)
+        events = stream_project_planner_agent(
+            project_planner_agent, initial_state, thread_id=initial_state["project_id"], bypass_llm_cache=request_body.bypass_cache
+        )
+        async for event in stream_agent_events(request, events, summarize_project_planner_update, state):
+            yield event
+        if await request.is_disconnected():
+            return
+
+        roadmap_with_dates = await save_project_plan(request.app.state.db, state)
+        yield sse_event("done", ProjectPlannerResponse(
+            project_id=state["project_id"],
+            roadmap=roadmap_with_dates,
+            extracted_features=state["extracted_features"],
+            error=state.get("error")
+        ).model_dump())
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def job_to_response(job: dict, deduplicated: bool = False) -> AgentJobResponse:
+    return AgentJobResponse(
+        job_id=str(job["_id"]),
+        agent=job["agent"],
+        project_id=job["project_id"],
+        status=job["status"],
+        deduplicated=deduplicated,
+        result=job.get("result"),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        started_at=job.get("started_at"),
+        finished_at=job.get("finished_at"),
+    )
+
+
+@agent_router.post("/jobs", response_model=AgentJobResponse, status_code=202)
+async def submit_agent_job(
+    request: Request,
+    request_body: AgentJobRequest,
+    auth_user_id: int = Depends(get_current_user_id),
+    owner_profile: dict | None = Depends(get_current_profile),
+):
+    """
+    Queue an agent run and return its job id immediately; poll GET /jobs/{job_id} for the result.
+    Resubmitting while an identical run is queued or running returns that job (deduplicated=true).
+    """
+    db = request.app.state.db
+    if request_body.agent == "team_formation":
+        initial_state = await build_team_formation_state(db, request_body.project_id, owner_profile, fast_mode=request_body.fast_mode)
+    else:
+        initial_state = await build_project_planner_state(db, request_body.project_id)
+
+    payload = {"initial_state": initial_state, "bypass_cache": request_body.bypass_cache}
+    if request_body.agent == "project_planner":
+        payload.update(incremental=request_body.incremental, regenerate_sprints=request_body.regenerate_sprints)
+    try:
+        job, deduplicated = await agent_job_queue.submit(
+            request_body.agent, initial_state["project_id"], auth_user_id, payload
+        )
+    except AgentJobQueueFull:
+        raise HTTPException(status_code=503, detail="Agent job queue is full, try again later")
+
+    return job_to_response(job, deduplicated)
+
+
+@agent_router.get("/jobs/{job_id}", response_model=AgentJobResponse, status_code=200)
+async def get_agent_job(job_id: str, auth_user_id: int = Depends(get_current_user_id)):
+    job = await agent_job_queue.get(job_id)
+    if not job or auth_user_id not in job.get("subscribers", []):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
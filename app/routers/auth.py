@@ -1,18 +1,35 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from datetime import datetime
 from app.models.schemas import UserRegisterRequest, UserLoginRequest, RefreshTokenRequest, ForgotPasswordRequest, ResetPasswordRequest
 from app.config.jwt_config import create_access_token, create_refresh_token, decode_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.config.security import hash_password, verify_password
+from app.config.security import hash_password_async, verify_password_async, needs_rehash
 from app.models.schemas import UserResponse, TokenResponse, MessageResponse, AuthResponse
 from app.models.User import User
 from app.services.mail_service import send_mail, generate_otp, generate_otp_expiry_time
 from app.models.password_reset_token import PasswordResetToken
 from app.db.mysql_connection import get_session
+from app.services.profile_cache import profile_cache
+from app.services.user_directory import user_directory
 
 
 auth_router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+
+# login / reset_password are async so they can await the hasher pool; their (sync) MySQL
+# work goes through these helpers on the threadpool so it never blocks the event loop
+def _first(session: Session, statement):
+    return session.exec(statement).first()
+
+
+def _save(session: Session, *rows):
+    for row in rows:
+        session.add(row)
+    session.commit()
+    for row in rows:
+        session.refresh(row)
+
 @auth_router.post("/register", response_model=MessageResponse)
 async def register(request: Request, data : UserRegisterRequest, session : Session = Depends(get_session)):
     existing = session.exec(select(User).where(User.email == data.email)).first()
@@ -26,12 +43,13 @@ async def register(request: Request, data : UserRegisterRequest, session : Sessi
     user = User(
         email = data.email,
         username = data.username,
-        hashed_password = hash_password(data.password)
+        hashed_password = await hash_password_async(data.password)
     )
 
     session.add(user)
     session.commit()
     session.refresh(user)  # Get the auto-generated user.id
+    user_directory.remember(user.id, user.username)
 
     # --- Auto-create partial MongoDB profile (Manual Saga) ---
     try:
@@ -66,6 +84,7 @@ async def register(request: Request, data : UserRegisterRequest, session : Sessi
             "updated_at": None
         }
         await profiles_collection.insert_one(partial_profile)
+        profile_cache.put(user.id, partial_profile)
     except Exception as e:
         # Compensating transaction: rollback MySQL user if MongoDB fails
         session.delete(user)
@@ -82,8 +101,8 @@ async def register(request: Request, data : UserRegisterRequest, session : Sessi
     )
 
 @auth_router.post("/login", response_model=AuthResponse)
-def login(data : UserLoginRequest, session : Session = Depends(get_session)):
-    existing = session.exec(select(User).where(User.email == data.email)).first()
+async def login(data : UserLoginRequest, session : Session = Depends(get_session)):
+    existing = await run_in_threadpool(_first, session, select(User).where(User.email == data.email))
 
     if not existing:
         raise HTTPException(
@@ -91,12 +110,17 @@ def login(data : UserLoginRequest, session : Session = Depends(get_session)):
             detail="Invalid credentials"
         )
 
-    if not verify_password(data.password, existing.hashed_password):
+    if not await verify_password_async(data.password, existing.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
+    # Upgrade hashes created under an older (cheaper) cost policy while we have the plain password
+    if needs_rehash(existing.hashed_password):
+        existing.hashed_password = await hash_password_async(data.password)
+        await run_in_threadpool(_save, session, existing)
+
     access_token = create_access_token(existing.id)
     refresh_token = create_refresh_token(existing.id)
 
@@ -178,8 +202,8 @@ async def forgot_password(data : ForgotPasswordRequest, session : Session = Depe
     )
 
 @auth_router.post("/reset-password", response_model=MessageResponse)
-def reset_password(data : ResetPasswordRequest, session : Session = Depends(get_session)):
-    token = session.exec(select(PasswordResetToken).where(PasswordResetToken.otp == data.otp)).first()
+async def reset_password(data : ResetPasswordRequest, session : Session = Depends(get_session)):
+    token = await run_in_threadpool(_first, session, select(PasswordResetToken).where(PasswordResetToken.otp == data.otp))
 
     if not token:
         raise HTTPException(
@@ -199,7 +223,7 @@ def reset_password(data : ResetPasswordRequest, session : Session = Depends(get_
             detail="OTP expired"
         )
 
-    user = session.exec(select(User).where(User.id == token.user_id)).first()
+    user = await run_in_threadpool(_first, session, select(User).where(User.id == token.user_id))
 
     if not user:
         raise HTTPException(
@@ -207,12 +231,10 @@ def reset_password(data : ResetPasswordRequest, session : Session = Depends(get_
             detail="User not found"
         )
 
-    user.hashed_password = hash_password(data.new_password)
+    user.hashed_password = await hash_password_async(data.new_password)
     token.is_used = True
 
-    session.add(user)
-    session.add(token)
-    session.commit()
+    await run_in_threadpool(_save, session, user, token)
 
     return MessageResponse(
         message="Password reset successfully",
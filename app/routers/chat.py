@@ -2,12 +2,29 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List, Optional
 from datetime import datetime
 from bson import ObjectId
+from app.services.chat_rooms import enrich_chat_rooms
 from app.models.chat import ChatRoom, Message
 from app.dependencies.auth import get_current_user_id
 from app.dto.chat_schema import NewChatRequest, TeamChatRequest, SendMessageRequest
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
+
+async def profile_usernames(db, user_ids) -> dict:
+    """
+    Map user ids to the username on their profile, in one query.
+    Chat shows the name users pick in create-profile, not the MySQL login name that
+    UserDirectory resolves, so it reads profiles rather than going through the directory.
+    """
+    ids = list(set(user_ids))
+    if not ids:
+        return {}
+    profiles = await db.profiles.find(
+        {"auth_user_id": {"$in": ids}}, {"auth_user_id": 1, "username": 1}
+    ).to_list(length=None)
+    return {profile["auth_user_id"]: profile.get("username", "Unknown") for profile in profiles}
+
+
 @router.get("/get-chat-rooms")
 async def get_chat_rooms(
     request: Request,
@@ -15,36 +32,11 @@ async def get_chat_rooms(
 ):
     """Fetch all chat rooms (direct and team) for the current user."""
     db = request.app.state.db
-    rooms_cursor = db.chats.find({"participants": current_user_id}).sort("updated_at", -1)
-    rooms = []
-    
-    async for room in rooms_cursor:
-        # Convert ObjectId to string for JSON serialization
-        room["_id"] = str(room["_id"])
-        
-        # Enrich the room with the names of the other participants if it's a direct chat
-        if room.get("room_type") == "direct":
-            other_user_ids = [uid for uid in room.get("participants", []) if uid != current_user_id]
-            if other_user_ids:
-                other_uid = other_user_ids[0]
-                # Fetch profile of the other user
-                profile = await db.profiles.find_one({"auth_user_id": other_uid})
-                if profile:
-                    room["other_user_name"] = profile.get("name")
-                    room["other_user_pic"] = profile.get("profile_picture")
-        elif room.get("room_type") == "team" and room.get("team_id"):
-            team = await db.teams.find_one({"project_id": room["team_id"]})
-            if team:
-                room["project_title"] = team.get("project_title", f"Team: {room['team_id']}")
-            else:
-                room["project_title"] = f"Team: {room['team_id']}"
-                    
-        # Also convert last_message _id
-        if "last_message" in room and room["last_message"] and "_id" in room["last_message"]:
-            room["last_message"]["_id"] = str(room["last_message"]["_id"])
-            
-        rooms.append(room)
-        
+    rooms = await db.chats.find({"participants": current_user_id}).sort("updated_at", -1).to_list(length=None)
+
+    # Participant names / team titles are resolved in batched lookups, not one query per room
+    await enrich_chat_rooms(db, rooms, current_user_id)
+
     return {"rooms": rooms}
 
 @router.post("/new-chat")
@@ -180,12 +172,8 @@ async def get_messages_for_room(
         
     messages_cursor = db.messages.find({"room_id": room_id}).sort("timestamp", 1)
     
-    # Fetch user profiles to attach usernames
-    user_ids = room.get("participants", [])
-    profiles_cursor = db.profiles.find({"auth_user_id": {"$in": user_ids}})
-    user_names = {}
-    async for p in profiles_cursor:
-        user_names[p["auth_user_id"]] = p.get("username", "Unknown")
+    # Display names are the profile usernames chosen in create-profile (one $in query)
+    user_names = await profile_usernames(db, room.get("participants", []))
 
     messages = []
     async for msg in messages_cursor:
@@ -233,8 +221,8 @@ async def send_message_to_room(
     saved_msg["_id"] = str(saved_msg["_id"])
     
     # Attach sender username before returning via socket/http
-    sender_profile = await db.profiles.find_one({"auth_user_id": current_user_id})
-    saved_msg["sender_name"] = sender_profile.get("username", "Unknown") if sender_profile else "Unknown"
+    user_names = await profile_usernames(db, [current_user_id])
+    saved_msg["sender_name"] = user_names.get(current_user_id, "Unknown")
     
     return {"message": saved_msg}
 
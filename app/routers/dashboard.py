@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Request, Response, Depends, Query
+from bson import ObjectId
+from sqlmodel import Session
+import asyncio
+from app.dependencies.auth import get_current_user_id
+from app.dependencies.collections import (
+    get_invitations_collection,
+    get_projects_collection,
+    get_rooms_collection,
+    get_teams_collection
+)
+from app.db.mysql_connection import get_session
+from app.dto.dashboard_schema import DashboardResponse
+from app.dto.project_schema import ProjectListItem, ProjectPage
+from app.dto.team_schema import TeamResponse
+from app.routers.projects import PROJECT_LIST_PROJECTION, PROJECT_PAGE_SIZE, PROJECT_PAGE_MAX_SIZE
+from app.services.chat_rooms import enrich_chat_rooms
+from app.services.pagination import fetch_page, not_modified
+from app.services.user_directory import user_directory
+
+dashboard_router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
+
+
+@dashboard_router.get("", response_model=DashboardResponse, status_code=200)
+async def get_dashboard(
+    request: Request,
+    response: Response,
+    project_limit: int = Query(PROJECT_PAGE_SIZE, ge=1, le=PROJECT_PAGE_MAX_SIZE),
+    auth_user_id: int = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+):
+    """
+    Workspace home in one request.
+    The user's team memberships are loaded once and shared by every section; independent
+    queries run concurrently in two rounds instead of one request (and query) after another.
+    Use /my-projects with next_cursor for further project pages.
+    """
+    db = request.app.state.db
+    projects_collection = get_projects_collection(request)
+
+    # Round 1: everything that only needs the user id
+    teams, owned, invitations, chat_rooms = await asyncio.gather(
+        get_teams_collection(request).find({"team_members.user_id": auth_user_id}).to_list(length=None),
+        projects_collection.find({"auth_user_id": auth_user_id}, {"_id": 1}).to_list(length=None),
+        get_invitations_collection(request).find({"receiver_id": auth_user_id}).to_list(length=None),
+        db.chats.find({"participants": auth_user_id}).sort("updated_at", -1).to_list(length=None),
+    )
+
+    joined_project_ids = [team["project_id"] for team in teams if ObjectId.is_valid(team.get("project_id", ""))]
+    project_ids = list({str(project["_id"]) for project in owned} | set(joined_project_ids))
+
+    # Round 2: everything derived from the membership set
+    (projects, next_cursor), rooms, titles, _, _ = await asyncio.gather(
+        fetch_page(
+            projects_collection,
+            {"$or": [{"auth_user_id": auth_user_id}, {"_id": {"$in": [ObjectId(pid) for pid in joined_project_ids]}}]},
+            project_limit,
+            projection=PROJECT_LIST_PROJECTION,
+        ),
+        get_rooms_collection(request).find({"project_id": {"$in": project_ids}}).to_list(length=None),
+        projects_collection.find(
+            {"_id": {"$in": [ObjectId(pid) for pid in project_ids]}}, {"_id": 1, "title": 1}
+        ).to_list(length=None),
+        enrich_chat_rooms(db, chat_rooms, auth_user_id, known_teams=teams),
+        # Resolve usernames for every member of every team in one query
+        asyncio.to_thread(user_directory.enrich_team_members, teams, session),
+    )
+
+    for project in projects:
+        project["id"] = str(project.pop("_id"))
+
+    id_to_title = {str(project["_id"]): project.get("title", "Untitled") for project in titles}
+    for room in rooms:
+        room.pop("_id", None)
+        room["project_title"] = id_to_title.get(room["project_id"], "Untitled")
+
+    for invitation in invitations:
+        invitation["id"] = str(invitation.pop("_id"))
+
+    for team in teams:
+        team["id"] = str(team.pop("_id"))
+
+    dashboard = DashboardResponse(
+        projects=ProjectPage(
+            items=[ProjectListItem(**project) for project in projects],
+            next_cursor=next_cursor,
+            has_more=next_cursor is not None
+        ),
+        teams=[TeamResponse(**team) for team in teams],
+        rooms=rooms,
+        invitations=invitations,
+        pending_invitations=sum(1 for invitation in invitations if invitation.get("status") == "PENDING"),
+        chat_rooms=chat_rooms,
+    )
+    return not_modified(request, response, dashboard) or dashboard
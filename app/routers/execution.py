@@ -1,12 +1,21 @@
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 import httpx
-import subprocess
-import os
-import tempfile
-import asyncio
+import json
+import time
+import uuid
+from bson import ObjectId
 from typing import List, Optional
-from app.config.external_services import PISTON_API_URL
+from app.dependencies.auth import get_current_user_id
+from app.dependencies.collections import get_projects_collection, get_rooms_collection, get_teams_collection
+from app.services.execution_gateway import execution_gateway, ExecutionQueueFull
+from app.services.execution_cache import execution_cache
+from app.services.execution_batch import run_batch, summarize_batch, EXECUTION_BATCH_MAX_CASES
+from app.services.execution_stream import stream_execution
+from app.services.runtime_registry import runtime_registry, UnknownRuntime
+from app.sockets.events import SocketEvent
+from app.sockets.server import sio
 
 router = APIRouter(prefix="/api/execution", tags=["Code Execution"])
 
@@ -14,14 +23,26 @@ class FileContent(BaseModel):
     name: str
     content: str
 
-class ExecutionRequest(BaseModel):
+class ProgramRequest(BaseModel):
     language: str
     version: str = "*" 
     files: List[FileContent]
-    stdin: Optional[str] = ""
     args: Optional[List[str]] = []
     compile_timeout: int = 10000
     run_timeout: int = 3000
+    bypass_cache: bool = False  # always do a fresh run (e.g. code that reads time or randomness)
+
+class ExecutionRequest(ProgramRequest):
+    stdin: Optional[str] = ""
+
+class TestCase(BaseModel):
+    name: Optional[str] = None
+    stdin: str = ""
+    expected_output: Optional[str] = None  # compared ignoring trailing whitespace; omit to just run
+
+class BatchExecutionRequest(ProgramRequest):
+    cases: List[TestCase] = Field(min_length=1, max_length=EXECUTION_BATCH_MAX_CASES)
+    stream: bool = False  # NDJSON: one line per case as it finishes, then the summary
 
 class ExecutionResponse(BaseModel):
     run: dict
@@ -29,48 +50,194 @@ class ExecutionResponse(BaseModel):
     language: str
     version: str
 
+
+def build_payload(request: ProgramRequest, stdin: Optional[str] = "") -> dict:
+    """Piston payload with language/version resolved locally; 400 for runtimes Piston doesn't have"""
+    try:
+        language, version = runtime_registry.resolve(request.language, request.version)
+    except UnknownRuntime as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "language": language,
+        "version": version,
+        "files": [f.model_dump() for f in request.files],
+        "stdin": stdin,
+        "args": request.args,
+        "compile_timeout": request.compile_timeout,
+        "run_timeout": request.run_timeout,
+    }
+
+
+def execution_http_error(e: Exception) -> HTTPException:
+    """Map gateway / Piston failures to the HTTP error returned to the caller"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, ExecutionQueueFull):
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many code executions in progress. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    if isinstance(e, httpx.ConnectError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Code Execution Service (Piston) is unavailable. Please ensure Docker container is running."
+        )
+    if isinstance(e, (httpx.TimeoutException, TimeoutError)):
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Code execution timed out"
+        )
+    if isinstance(e, httpx.HTTPStatusError):
+        print(f"HTTPStatusError: {e}")
+        return HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Piston API Error: {e.response.text}"
+        )
+    print(f"Exception: {e}")
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=str(e)
+    )
+
+
 @router.post("", response_model=ExecutionResponse)
-async def execute_code(request: ExecutionRequest):
+async def execute_code(
+    request: ExecutionRequest,
+    response: Response,
+    auth_user_id: int = Depends(get_current_user_id)
+):
     """
     Execute code using the Self-Hosted Piston API (Docker).
+    Repeated identical runs are answered from the result cache; the rest go through the
+    execution gateway: bounded concurrency, fair per-user queueing, 429 + Retry-After when full.
+    """
+    payload = build_payload(request, request.stdin)
+
+    print(f"Executing Code (Self-Hosted) for user {auth_user_id}: {request.language} {request.version}")
+
+    try:
+        # Identical code + input is served from the result cache or shares an in-flight run
+        result, queue_wait, cache_status = await execution_cache.run(
+            payload,
+            lambda: execution_gateway.execute(auth_user_id, payload),
+            bypass=request.bypass_cache
+        )
+        response.headers["X-Queue-Wait-Ms"] = str(int(queue_wait * 1000))
+        response.headers["X-Execution-Cache"] = cache_status
+        return result
+
+    except Exception as e:
+        raise execution_http_error(e)
+
+
+@router.get("/queue")
+async def get_execution_queue(auth_user_id: int = Depends(get_current_user_id)):
+    """Gateway load, the caller's position(s) in the execution queue and result cache counters"""
+    return {**execution_gateway.status(auth_user_id), "cache": execution_cache.stats()}
+
+
+@router.post("/room/{room_id}", response_model=ExecutionResponse)
+async def execute_code_in_room(
+    room_id: str,
+    request: ExecutionRequest,
+    http_request: Request,
+    auth_user_id: int = Depends(get_current_user_id)
+):
     """
-    async with httpx.AsyncClient() as client:
+    Execute code once for the whole collaboration room.
+    stdout/stderr are pushed to everyone in the room as Socket.IO events while the program
+    runs (execution_started, execution_output..., execution_finished), so collaborators
+    watch a single run instead of each re-running it. Identical runs are served from the
+    result cache and posted in one piece. The final result is also returned here.
+    """
+    room = await get_rooms_collection(http_request).find_one({"room_id": room_id}, {"project_id": 1})
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+
+    # Same membership rule as /api/rooms: the project's owner or a member of its team
+    project_id = room.get("project_id", room_id)
+    is_owner = ObjectId.is_valid(project_id) and await get_projects_collection(http_request).find_one(
+        {"_id": ObjectId(project_id), "auth_user_id": auth_user_id}, {"_id": 1}
+    )
+    if not is_owner and not await get_teams_collection(http_request).find_one(
+        {"project_id": project_id, "team_members.user_id": auth_user_id}, {"_id": 1}
+    ):
+        raise HTTPException(status_code=403, detail="You are not a member of this room")
+
+    execution_id = str(uuid.uuid4())
+
+    async def emit(event: SocketEvent, data: dict) -> None:
+        await sio.emit(event.value, {"executionId": execution_id, **data}, room=room_id)
+
+    print(f"Executing Code (streamed to room {room_id}) for user {auth_user_id}: {request.language} {request.version}")
+
+    try:
+        return await stream_execution(
+            auth_user_id, build_payload(request, request.stdin), emit,
+            started_by=str(auth_user_id), bypass_cache=request.bypass_cache
+        )
+    except Exception as e:
+        raise execution_http_error(e)
+
+
+@router.post("/batch")
+async def execute_batch(
+    request: BatchExecutionRequest,
+    http_request: Request,
+    auth_user_id: int = Depends(get_current_user_id)
+):
+    """
+    Run one program against many stdin test cases.
+    Cases run concurrently through the result cache and execution gateway; the batch stops
+    at the first compile error. Returns per-case results (status, output, timings) and a
+    pass/fail summary, or with stream=true an NDJSON stream of cases as they finish.
+    """
+    payload = build_payload(request)
+    cases = [case.model_dump() for case in request.cases]
+    print(f"Executing batch of {len(cases)} cases for user {auth_user_id}: {request.language} {request.version}")
+
+    started = time.perf_counter()
+    if not request.stream:
+        results = [result async for result in run_batch(auth_user_id, payload, cases, request.bypass_cache)]
+        results.sort(key=lambda result: result["index"])
+        return {"cases": results, "summary": summarize_batch(results, time.perf_counter() - started)}
+
+    async def ndjson_stream():
+        results = []
+        batch = run_batch(auth_user_id, payload, cases, request.bypass_cache)
         try:
-            payload = {
-                "language": request.language,
-                "version": request.version,
-                "files": [f.model_dump() for f in request.files],
-                "stdin": request.stdin,
-                "args": request.args,
-                "compile_timeout": request.compile_timeout,
-                "run_timeout": request.run_timeout,
-            }
-            
-            print(f"Executing Code (Self-Hosted): {payload}")
-            
-            # Forward directly to local Piston service
-            response = await client.post(PISTON_API_URL, json=payload)
-            
-            if response.status_code != 200:
-                print(f"Piston Error Body: {response.text}")
-
-            response.raise_for_status()
-            return response.json()
-            
-        except httpx.ConnectError:
-             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Code Execution Service (Piston) is unavailable. Please ensure Docker container is running."
-            )
-        except httpx.HTTPStatusError as e:
-            print(f"HTTPStatusError: {e}")
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Piston API Error: {e.response.text}"
-            )
-        except Exception as e:
-            print(f"Exception: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e)
-            )
+            async for result in batch:
+                if await http_request.is_disconnected():
+                    print("Client disconnected, cancelling batch execution")
+                    return
+                results.append(result)
+                yield json.dumps({"type": "case", **result}) + "\n"
+            yield json.dumps({"type": "summary", **summarize_batch(results, time.perf_counter() - started)}) + "\n"
+        finally:
+            await batch.aclose()
+
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/runtimes")
+async def get_runtimes(request: Request, response: Response):
+    """
+    Installed languages, versions and aliases (served from the local catalog).
+    Cacheable by the browser; revalidate with If-None-Match to get a 304.
+    """
+    if not runtime_registry.loaded and not await runtime_registry.refresh():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Code Execution Service (Piston) is unavailable. Please ensure Docker container is running."
+        )
+
+    headers = {"ETag": runtime_registry.etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == runtime_registry.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return runtime_registry.runtimes
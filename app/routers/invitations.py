@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlmodel import Session
 from app.dto.invitation_schema import SendInvitation, UpdateInvitation, JoinRequest
 from app.models.teams import TeamMember
-from app.models.User import User
-from app.dependencies.collections import get_profiles_collection , get_invitations_collection, get_projects_collection, get_teams_collection
+from app.services.user_directory import user_directory
+from app.dependencies.collections import get_invitations_collection, get_projects_collection, get_teams_collection
 from app.db.mysql_connection import get_session
 from bson import ObjectId
 from app.dependencies.auth import get_current_user_id
+from app.dependencies.profile import require_current_profile
+from app.tasks.background_tasks import invitation_expire_at
 
 invitation_router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
@@ -16,26 +19,18 @@ async def send_invitation(request : Request,
                             request_body : SendInvitation,
                             auth_user_id : int = Depends(get_current_user_id),
                             session : Session = Depends(get_session),
+                            sender_profile : dict = Depends(require_current_profile),
                         ):
     
-    profiles_collection = get_profiles_collection(request)
     projects_collection = get_projects_collection(request)
     invitations_collection = get_invitations_collection(request)
-    
-    existing_profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
-
-    if not existing_profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
 
     # Resolve receiver_id from receiver_username if not provided
     receiver_id = request_body.receiver_id
     if not receiver_id and request_body.receiver_username:
-        user = session.exec(
-            select(User).where(User.username == request_body.receiver_username)
-        ).first()
-        if not user:
+        receiver_id = await run_in_threadpool(user_directory.resolve_user_id, session, request_body.receiver_username)
+        if not receiver_id:
             raise HTTPException(status_code=404, detail=f"User '{request_body.receiver_username}' not found")
-        receiver_id = user.id
     
     if not receiver_id:
         raise HTTPException(status_code=400, detail="Either receiver_id or receiver_username is required")
@@ -101,7 +96,7 @@ async def update_invitation(request : Request,
 
     result = await invitations_collection.update_one(
         {"_id" : ObjectId(request_body.invitation_id)}, 
-        {"$set" : {"status": new_status, "updated_at": updated_at}}
+        {"$set" : {"status": new_status, "updated_at": updated_at, "expire_at": invitation_expire_at(updated_at)}}
     )
 
     if result.modified_count == 0:
@@ -243,10 +238,11 @@ async def respond_join_request(request: Request,
     if new_status not in ("ACCEPTED", "REJECTED"):
         raise HTTPException(status_code=400, detail="Status must be ACCEPTED or REJECTED")
 
-    # Update invitation status
+    # Update invitation status (answered requests expire via the TTL index on expire_at)
+    updated_at = datetime.utcnow()
     await invitations_collection.update_one(
         {"_id": ObjectId(request_body.invitation_id)},
-        {"$set": {"status": new_status, "updated_at": datetime.utcnow()}}
+        {"$set": {"status": new_status, "updated_at": updated_at, "expire_at": invitation_expire_at(updated_at)}}
     )
 
     # On ACCEPT: add member to team (single source of truth)
@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException, Request, Depends
 from datetime import datetime
 from app.dependencies.collections import get_profiles_collection
 from app.dependencies.auth import get_current_user_id
+from app.dependencies.profile import get_current_profile
+from app.services.profile_cache import profile_cache
 from app.dto.profile_schema import ProfileCreateRequest, ProfileResponse
 from app.vector_stores.pinecone_db import index_profile
 from app.db.mysql_connection import get_session
@@ -74,6 +76,9 @@ async def create_profile(
         profile_dict["created_at"] = datetime.utcnow()
         result = await profiles_collection.insert_one(profile_dict)
         created_profile = await profiles_collection.find_one({"_id": result.inserted_id})
+
+    # Write-through so the next request sees the new profile without a MongoDB read
+    profile_cache.put(auth_user_id, created_profile)
     
     # Convert MongoDB _id to string for response
     created_profile["id"] = str(created_profile.pop("_id"))
@@ -90,9 +95,7 @@ async def create_profile(
 
 
 @profile_router.get("/profile", response_model = ProfileResponse, status_code=200)
-async def get_profile(request: Request, auth_user_id: int = Depends(get_current_user_id)):
-    profiles_collection = get_profiles_collection(request)
-    profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
+async def get_profile(profile: dict | None = Depends(get_current_profile)):
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
     profile["id"] = str(profile.pop("_id"))
@@ -106,10 +109,9 @@ async def get_profile(request: Request, auth_user_id: int = Depends(get_current_
 async def get_profile_by_username(
     request : Request,
     username : str,
-    auth_user_id : int = Depends(get_current_user_id)
+    profile : dict | None = Depends(get_current_profile)
 ):
     profiles_collection = get_profiles_collection(request)
-    profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
     if not profile:
         raise HTTPException(status_code=404, detail="User not found... Login First")
 
@@ -150,6 +152,7 @@ async def update_profile(
 
     # Fetch the updated profile
     updated_profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
+    profile_cache.put(auth_user_id, updated_profile)
     
     # Convert MongoDB _id to string for response
     updated_profile["id"] = str(updated_profile.pop("_id"))
@@ -1,15 +1,44 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, HTTPException, Request, Response, Depends, Query
 from datetime import datetime
+from typing import Optional
 from bson import ObjectId
-from app.dto.project_schema import ProjectCreateRequest, ProjectResponse, ProjectUpdateRequest
+import os
+from app.dto.project_schema import ProjectCreateRequest, ProjectResponse, ProjectUpdateRequest, ProjectListItem, ProjectPage
 from app.models.teams import Team, TeamMember
 from app.dependencies.collections import get_projects_collection, get_teams_collection
 from app.dependencies.auth import get_current_user_id
 from app.vector_stores.pinecone_db import index_project, delete_project_index, search_projects as pinecone_search_projects
+from app.services.pagination import fetch_page, not_modified
 
 
 project_router = APIRouter(prefix="/api/projects", tags=["Projects"])
 
+PROJECT_PAGE_SIZE = int(os.getenv("PROJECT_PAGE_SIZE", "20"))
+PROJECT_PAGE_MAX_SIZE = int(os.getenv("PROJECT_PAGE_MAX_SIZE", "100"))
+PROJECT_LIST_DESCRIPTION_CHARS = int(os.getenv("PROJECT_LIST_DESCRIPTION_CHARS", "200"))
+
+# List views only need a description preview; features and the full text stay on the detail endpoint
+PROJECT_LIST_PROJECTION = {
+    "auth_user_id": 1, "title": 1, "category": 1, "required_skills": 1, "team_size": 1, "team_id": 1,
+    "complexity": 1, "estimated_duration": 1, "status": 1, "created_at": 1, "updated_at": 1,
+    "description": {"$substrCP": [{"$ifNull": ["$description", ""]}, 0, PROJECT_LIST_DESCRIPTION_CHARS]},
+}
+
+
+async def list_projects_page(request: Request, response: Response, query: dict, limit: int, cursor: Optional[str]):
+    projects, next_cursor = await fetch_page(
+        get_projects_collection(request), query, limit, cursor, PROJECT_LIST_PROJECTION
+    )
+    for project in projects:
+        project["id"] = str(project.pop("_id"))
+
+    page = ProjectPage(
+        items=[ProjectListItem(**project) for project in projects],
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None
+    )
+    return not_modified(request, response, page) or page
+
 @project_router.post("/create-project", response_model=ProjectResponse, status_code=201)
 async def create_project(
     request: Request, 
@@ -75,16 +104,24 @@ async def create_project(
     return ProjectResponse(**created_project)
 
 
-@project_router.get("/my-projects", response_model=list[ProjectResponse], status_code=200)
-async def get_projects(request: Request, auth_user_id: int = Depends(get_current_user_id)):
-    projects_collection = get_projects_collection(request)
+@project_router.get("/my-projects", response_model=ProjectPage, status_code=200)
+async def get_projects(
+    request: Request,
+    response: Response,
+    limit: int = Query(PROJECT_PAGE_SIZE, ge=1, le=PROJECT_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    auth_user_id: int = Depends(get_current_user_id)
+):
+    """Projects the user owns or is a team member of, newest first, one page per call"""
     teams_collection = get_teams_collection(request)
 
-    # 1. Find teams where the user is a member
-    teams = await teams_collection.find({"team_members.user_id": auth_user_id}).to_list(length=None)
+    # 1. Find teams where the user is a member (only their project ids are needed)
+    teams = await teams_collection.find(
+        {"team_members.user_id": auth_user_id}, {"project_id": 1, "_id": 0}
+    ).to_list(length=None)
     
     # Extract project IDs from teams (stored as strings in Team model)
-    joined_project_ids = [ObjectId(team["project_id"]) for team in teams]
+    joined_project_ids = [ObjectId(team["project_id"]) for team in teams if ObjectId.is_valid(team.get("project_id", ""))]
     
     # 2. Find projects where user is owner OR a team member
     query = {
@@ -94,16 +131,7 @@ async def get_projects(request: Request, auth_user_id: int = Depends(get_current
         ]
     }
 
-    projects = await projects_collection.find(query).to_list(length=None)
-    
-    if not projects:
-        return []
-
-    for project in projects:
-        project["id"] = str(project.pop("_id"))
-        
-    return [ProjectResponse(**project) for project in projects]
-
+    return await list_projects_page(request, response, query, limit, cursor)
 
 
 @project_router.get("/project/{project_id}", response_model = ProjectResponse, status_code=200)
@@ -225,15 +253,14 @@ async def search_projects_endpoint(
     return ordered_results
 
 
-@project_router.get("/all-projects", response_model=list[ProjectResponse], status_code=200)
-async def get_all_projects(request : Request, auth_user_id: int=Depends(get_current_user_id)):
-    projects_collection = get_projects_collection(request)
-
+@project_router.get("/all-projects", response_model=ProjectPage, status_code=200)
+async def get_all_projects(
+    request : Request,
+    response: Response,
+    limit: int = Query(PROJECT_PAGE_SIZE, ge=1, le=PROJECT_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    auth_user_id: int=Depends(get_current_user_id)
+):
+    """Browse other users' projects, newest first, one page per call"""
     # Find all projects where auth_user_id is NOT the current user
-    projects = await projects_collection.find({"auth_user_id": {"$ne": auth_user_id}}).to_list(length=None)
-
-    # Convert _id to id for response
-    for project in projects:
-        project["id"] = str(project.pop("_id"))
-
-    return [ProjectResponse(**project) for project in projects]
\ No newline at end of file
+    return await list_projects_page(request, response, {"auth_user_id": {"$ne": auth_user_id}}, limit, cursor)
\ No newline at end of file
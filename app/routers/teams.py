@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from bson import ObjectId
-from sqlmodel import Session, select
+from sqlmodel import Session
 from app.dependencies.collections import get_teams_collection
 from app.dependencies.auth import get_current_user_id
 from app.dto.team_schema import TeamResponse, TeamMemberResponse
 from app.db.mysql_connection import get_session
-from app.models.User import User
+from app.services.user_directory import user_directory
 
 teams_router = APIRouter(prefix="/api/teams", tags=["Teams"])
 
@@ -18,29 +19,14 @@ async def get_my_teams(
 ):
     """Fetch all teams where the authenticated user is a member."""
     teams_collection = get_teams_collection(request)
-    cursor = teams_collection.find({"team_members.user_id": auth_user_id})
-    teams = []
-    async for team in cursor:
-        team["id"] = str(team.pop("_id"))
-        team = _enrich_members_with_usernames(team, session)
-        teams.append(TeamResponse(**team))
-    return teams
-
-def _enrich_members_with_usernames(team: dict, session: Session) -> dict:
-    """Resolve user_ids to usernames from the SQL User table."""
-    user_ids = [m["user_id"] for m in team.get("team_members", [])]
-    if not user_ids:
-        return team
+    teams = await teams_collection.find({"team_members.user_id": auth_user_id}).to_list(length=None)
 
-    # Batch query all users at once
-    statement = select(User).where(User.id.in_(user_ids))  # type: ignore
-    users = session.exec(statement).all()
-    id_to_username = {u.id: u.username for u in users}
+    # Resolve usernames for every member of every team in one query
+    await run_in_threadpool(user_directory.enrich_team_members, teams, session)
 
-    for member in team.get("team_members", []):
-        member["username"] = id_to_username.get(member["user_id"])
-
-    return team
+    for team in teams:
+        team["id"] = str(team.pop("_id"))
+    return [TeamResponse(**team) for team in teams]
 
 
 @teams_router.get("/team/{team_id}", response_model=TeamResponse, status_code=200)
@@ -56,7 +42,7 @@ async def get_team_by_id(
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     team["id"] = str(team.pop("_id"))
-    team = _enrich_members_with_usernames(team, session)
+    await run_in_threadpool(user_directory.enrich_team_members, [team], session)
     return TeamResponse(**team)
 
 
@@ -73,5 +59,5 @@ async def get_team_by_project_id(
     if not team:
         raise HTTPException(status_code=404, detail="Team not found for this project")
     team["id"] = str(team.pop("_id"))
-    team = _enrich_members_with_usernames(team, session)
+    await run_in_threadpool(user_directory.enrich_team_members, [team], session)
     return TeamResponse(**team)
@@ -0,0 +1,243 @@
+"""
+Background job queue for agent runs.
+
+Submitting a job stores it in MongoDB (agent_jobs) and returns its id straight away;
+a fixed pool of worker tasks runs the graphs, so bursts queue up instead of running
+side by side. Jobs are idempotent per (agent, project_id, input hash): a submission
+whose inputs match a queued or running job attaches to that job instead of starting another.
+
+Every job records the process that owns it (worker_id) and that process refreshes
+updated_at on its active jobs every AGENT_JOB_HEARTBEAT_SECONDS, so a job only goes stale
+once its process is gone. On startup, active jobs left behind by this process's previous
+run (or by any process that stopped heartbeating) are re-queued if they never started and
+failed if they were interrupted mid-run.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+load_dotenv()
+
+AGENT_JOB_WORKERS = int(os.getenv("AGENT_JOB_WORKERS", "2"))
+AGENT_JOB_QUEUE_SIZE = int(os.getenv("AGENT_JOB_QUEUE_SIZE", "100"))
+AGENT_JOB_HEARTBEAT_SECONDS = int(os.getenv("AGENT_JOB_HEARTBEAT_SECONDS", "30"))
+# A queued/running job without a heartbeat for this long is treated as lost (its worker process died)
+AGENT_JOB_STALE_SECONDS = int(os.getenv("AGENT_JOB_STALE_SECONDS", str(4 * AGENT_JOB_HEARTBEAT_SECONDS)))
+# Identity of this process; set it to something stable per replica so a restart can reclaim its jobs
+AGENT_JOB_WORKER_ID = os.getenv("AGENT_JOB_WORKER_ID") or f"{socket.gethostname()}:{os.getpid()}"
+AGENT_JOB_RETENTION_SECONDS = int(os.getenv("AGENT_JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# runner(job_document) -> result dict stored on the job
+JobRunner = Callable[[dict], Awaitable[dict]]
+
+
+class AgentJobQueueFull(Exception):
+    pass
+
+
+def hash_job_input(payload: dict) -> str:
+    material = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AgentJobQueue:
+    def __init__(self, workers: int = AGENT_JOB_WORKERS, max_queued: int = AGENT_JOB_QUEUE_SIZE,
+                 worker_id: str = AGENT_JOB_WORKER_ID):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.worker_id = worker_id
+        self._collection = None
+        self._runners: dict[str, JobRunner] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: list[asyncio.Task] = []
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def start(self, collection, runners: dict[str, JobRunner]) -> None:
+        """Create indexes and spawn the worker pool (called from lifespan)"""
+        self._collection = collection
+        self._runners = runners
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+
+        # At most one active job per dedupe key across all workers/processes
+        await collection.create_index(
+            "dedupe_key", unique=True, partialFilterExpression={"active": True}, name="active_dedupe_key"
+        )
+        await collection.create_index("created_at", expireAfterSeconds=AGENT_JOB_RETENTION_SECONDS)
+        await collection.create_index([("active", 1), ("worker_id", 1)])
+
+        requeued, failed = await self._recover_orphans()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._worker_tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        print(f"✅ Agent job queue started with {self.workers} workers "
+              f"({requeued} orphaned jobs re-queued, {failed} failed)")
+
+    async def stop(self) -> None:
+        tasks = self._worker_tasks + ([self._heartbeat_task] if self._heartbeat_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._heartbeat_task = None
+
+    def _orphan_filter(self) -> dict:
+        """Active jobs of this process's previous run, or of any process that stopped heartbeating"""
+        cutoff = datetime.utcnow() - timedelta(seconds=AGENT_JOB_STALE_SECONDS)
+        return {"active": True, "$or": [{"worker_id": self.worker_id}, {"updated_at": {"$lt": cutoff}}]}
+
+    async def _recover_orphans(self) -> tuple[int, int]:
+        """Re-queue orphaned jobs that never started (up to the queue size), fail the rest"""
+        failed_fields = {"status": "failed", "active": False, "error": "Interrupted by a server restart",
+                         "finished_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+        # A run cut off half way may have written partial results; don't silently run it again
+        interrupted = await self._collection.update_many({**self._orphan_filter(), "status": "running"},
+                                                         {"$set": failed_fields})
+
+        requeued = []
+        while not self._queue.full():
+            job = await self._collection.find_one_and_update(
+                {**self._orphan_filter(), "status": "queued", "_id": {"$nin": requeued}},
+                {"$set": {"worker_id": self.worker_id, "updated_at": datetime.utcnow()}},
+                sort=[("created_at", 1)],
+            )
+            if not job:
+                break
+            self._queue.put_nowait(job["_id"])
+            requeued.append(job["_id"])
+
+        overflow = await self._collection.update_many(
+            {**self._orphan_filter(), "status": "queued", "_id": {"$nin": requeued}},
+            {"$set": failed_fields},
+        )
+        return len(requeued), interrupted.modified_count + overflow.modified_count
+
+    async def _heartbeat(self) -> None:
+        """Keep updated_at fresh on every job this process holds, queued or running"""
+        while True:
+            await asyncio.sleep(AGENT_JOB_HEARTBEAT_SECONDS)
+            try:
+                await self._collection.update_many(
+                    {"worker_id": self.worker_id, "active": True},
+                    {"$set": {"updated_at": datetime.utcnow()}},
+                )
+            except Exception as e:
+                print(f"❌ Agent job heartbeat failed: {e}")
+
+    async def submit(self, agent: str, project_id: str, owner_id: int, payload: dict) -> tuple[dict, bool]:
+        """
+        Queue a run of `agent` with `payload`, or attach to the identical active run.
+        Returns (job, deduplicated). Raises AgentJobQueueFull when the local queue is full.
+        """
+        if agent not in self._runners:
+            raise ValueError(f"Unknown agent: {agent}")
+
+        dedupe_key = f"{agent}:{project_id}:{hash_job_input(payload)}"
+        await self._expire_stale(dedupe_key)
+
+        existing = await self._attach(dedupe_key, owner_id)
+        if existing:
+            return existing, True
+
+        if self._queue.full():
+            raise AgentJobQueueFull()
+
+        now = datetime.utcnow()
+        job = {
+            "agent": agent,
+            "project_id": project_id,
+            "owner_id": owner_id,
+            "subscribers": [owner_id],  # users allowed to read the job (submitters that attached to it)
+            "worker_id": self.worker_id,
+            "dedupe_key": dedupe_key,
+            "payload": payload,
+            "status": "queued",
+            "active": True,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+        }
+        try:
+            result = await self._collection.insert_one(job)
+        except DuplicateKeyError:
+            # Lost the race against an identical submission
+            return await self._attach(dedupe_key, owner_id), True
+
+        job["_id"] = result.inserted_id
+        self._queue.put_nowait(job["_id"])
+        return job, False
+
+    async def _attach(self, dedupe_key: str, owner_id: int) -> Optional[dict]:
+        return await self._collection.find_one_and_update(
+            {"dedupe_key": dedupe_key, "active": True},
+            {"$addToSet": {"subscribers": owner_id}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        try:
+            return await self._collection.find_one({"_id": ObjectId(job_id)})
+        except Exception:
+            return None
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _expire_stale(self, dedupe_key: str) -> None:
+        cutoff = datetime.utcnow() - timedelta(seconds=AGENT_JOB_STALE_SECONDS)
+        await self._collection.update_many(
+            {"dedupe_key": dedupe_key, "active": True, "updated_at": {"$lt": cutoff}},
+            {"$set": {"status": "failed", "active": False, "error": "Job was lost before it finished",
+                      "finished_at": datetime.utcnow()}},
+        )
+
+    async def _set(self, job_id, **fields) -> None:
+        fields["updated_at"] = datetime.utcnow()
+        await self._collection.update_one({"_id": job_id}, {"$set": fields})
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # Only start the job if it is still ours and still queued (not expired or reclaimed)
+                job = await self._collection.find_one_and_update(
+                    {"_id": job_id, "active": True, "status": "queued", "worker_id": self.worker_id},
+                    {"$set": {"status": "running", "started_at": datetime.utcnow(), "updated_at": datetime.utcnow()}},
+                    return_document=ReturnDocument.AFTER,
+                )
+                if not job:
+                    continue
+
+                print(f"[Agent Jobs] worker {index} running {job['agent']} job {job_id}")
+                try:
+                    result = await self._runners[job["agent"]](job)
+                    await self._set(job_id, status="succeeded", active=False, result=result,
+                                    finished_at=datetime.utcnow())
+                    print(f"✅ Agent job {job_id} succeeded")
+                except asyncio.CancelledError:
+                    await self._set(job_id, status="failed", active=False, error="Cancelled on shutdown",
+                                    finished_at=datetime.utcnow())
+                    raise
+                except Exception as e:
+                    print(f"❌ Agent job {job_id} failed: {e}")
+                    await self._set(job_id, status="failed", active=False, error=str(e),
+                                    finished_at=datetime.utcnow())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Agent job worker {index} error: {e}")
+            finally:
+                self._queue.task_done()
+
+
+agent_job_queue = AgentJobQueue()
@@ -0,0 +1,240 @@
+"""
+Shared agent run steps used by the blocking, streaming and queued agent endpoints:
+loading the initial graph state from MongoDB, running the compiled agent and saving the plan.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+import re
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.agents.project_planner.graph import invoke_project_planner_agent, get_previous_plan_state
+from app.agents.project_planner.replan import prepare_incremental_state
+from app.agents.team_formation.team_formation_graph import invoke_team_formation_agent
+from app.models.project_plan import ProjectPlan
+
+
+def parse_duration_to_days(duration_str: str) -> int:
+    """
+    Parse a human-readable duration string into a number of days.
+    Supports: '2 weeks', '1 month', '10 days', '3 months', etc.
+    Defaults to 14 days if parsing fails.
+    """
+    duration_str = duration_str.strip().lower()
+    match = re.match(r'(\d+)\s*(day|days|week|weeks|month|months)', duration_str)
+    if not match:
+        return 14  # default to 2 weeks
+    
+    value = int(match.group(1))
+    unit = match.group(2)
+    
+    if 'day' in unit:
+        return value
+    elif 'week' in unit:
+        return value * 7
+    elif 'month' in unit:
+        return value * 30
+    return 14
+
+
+def compute_sprint_dates(roadmap: list, start_date: datetime) -> list:
+    """
+    Compute start_date and end_date for each sprint sequentially.
+    Each sprint starts when the previous one ends.
+    """
+    current_start = start_date
+    for sprint in roadmap:
+        duration_days = parse_duration_to_days(sprint.get("duration", "2 weeks"))
+        sprint_end = current_start + timedelta(days=duration_days)
+        sprint["start_date"] = current_start.isoformat()
+        sprint["end_date"] = sprint_end.isoformat()
+        current_start = sprint_end
+    return roadmap
+
+
+async def build_team_formation_state(db, project_id: str, owner_profile: dict | None, fast_mode: bool = False) -> dict:
+    """Load the project and build the initial TeamFormationState (404 if the project is missing)"""
+    projects_collection = db["projects"]
+
+    project = await projects_collection.find_one({"_id": ObjectId(project_id)})
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    # GET OWNER'S TIMEZONE FROM THEIR PROFILE (cached profile context)
+    owner_timezone = owner_profile.get("timezone", "UTC") if owner_profile else "UTC"
+
+    # Build initial state with keys matching TeamFormationState
+    return {
+        "project_id": str(project["_id"]),
+        "project_title": project.get("title", ""),
+        "required_skills": project.get("required_skills", []),
+        "team_size": project.get("team_size", {}).get("max", 4),
+        "timeline": project.get("estimated_duration", "4 weeks"),
+        "owner_timezone": owner_timezone,
+        "fast_mode": fast_mode,
+        "roles": [],
+        "candidates": [],
+        "recommendations": [],
+        "error": None
+    }
+
+
+async def build_project_planner_state(db, project_id: str) -> dict:
+    """Load the project and its team and build the initial ProjectPlannerState"""
+    projects_collection = db["projects"]
+    teams_collection = db["teams"]
+
+    # Fetch Project
+    try:
+        project = await projects_collection.find_one({"_id": ObjectId(project_id)})
+    except:
+        print(f"Invalid Project ID format: {project_id}")
+        raise HTTPException(status_code=400, detail="Invalid Project ID format")
+
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    print(f"Project found: {project.get('title', 'Unknown')}")
+
+    # Fetch Team (if exists)
+    team_members = []
+    if project.get("team_id"):
+        try:
+            team = await teams_collection.find_one({"_id": ObjectId(project["team_id"])})
+            if team:
+                team_members = team.get("team_members", [])
+                print(f"Team found: {len(team_members)} members")
+        except:
+            print("Invalid team ID format or team not found")
+    else:
+        print("No team assigned to this project yet.")
+
+    # Prepare State
+    return {
+        "project_id": str(project["_id"]),
+        "title": project.get("title", ""),
+        "category": project.get("category", ""),
+        "description": project.get("description", ""),
+        "features": project.get("features", []),
+        "required_skills": project.get("required_skills", []),
+        "team_size": project.get("team_size", {}), # Pass raw dict
+        "team_members": team_members, # Raw list from DB
+        "team_id": project.get("team_id"),
+        "complexity": project.get("complexity", ""),
+        "estimated_duration": project.get("estimated_duration", ""),
+        "status": project.get("status", "Open"),
+        "extracted_features": [],
+        "milestones": [],
+        "previous_roadmap": [],
+        "roadmap": [],
+        "error": None
+    }
+
+
+async def save_project_plan(db, result: dict) -> list:
+    """Date the sprints and upsert the plan; returns the dated roadmap (a failed save is only logged)"""
+    project_plans_collection = db["project_plans"]
+
+    # Compute sprint dates before saving
+    now = datetime.utcnow()
+    roadmap_with_dates = compute_sprint_dates(result["roadmap"], now)
+
+    try:
+        plan_data = ProjectPlan(
+            project_id=result["project_id"],
+            roadmap=roadmap_with_dates,
+            extracted_features=result["extracted_features"],
+            created_at=now,
+            updated_at=now
+        )
+
+        # Upsert: Update if exists, Insert if not
+        await project_plans_collection.update_one(
+            {"project_id": result["project_id"]},
+            {"$set": plan_data.model_dump()},
+            upsert=True
+        )
+        print(f"✅ Project Plan saved to DB for project: {result['project_id']}")
+    except Exception as db_err:
+        print(f"❌ Failed to save project plan to DB: {db_err}")
+        # We don't raise error here to let the response go through, but log it
+
+    return roadmap_with_dates
+
+
+async def run_team_formation(team_formation_agent, initial_state: dict, thread_id: str, bypass_llm_cache: bool = False) -> dict:
+    """Run the team formation agent to completion; returns the TeamFormationResponse body"""
+    final_state = await invoke_team_formation_agent(
+        team_formation_agent, initial_state, thread_id, bypass_llm_cache=bypass_llm_cache
+    )
+    return {
+        "recommendations": final_state.get("recommendations", []),
+        "error": final_state.get("error"),
+    }
+
+
+async def prepare_project_planner_state(
+    project_planner_agent,
+    initial_state: dict,
+    incremental: bool = False,
+    regenerate_sprints: Optional[list[int]] = None,
+) -> dict:
+    """For incremental re-plans, pre-fill the stages that are unchanged since the last checkpoint"""
+    if not incremental:
+        return initial_state
+    previous_state = await get_previous_plan_state(project_planner_agent, initial_state["project_id"])
+    return prepare_incremental_state(initial_state, previous_state, regenerate_sprints or [])
+
+
+async def run_project_planner(
+    project_planner_agent,
+    db,
+    initial_state: dict,
+    bypass_llm_cache: bool = False,
+    incremental: bool = False,
+    regenerate_sprints: Optional[list[int]] = None,
+) -> dict:
+    """Run the project planner to completion and save the plan; returns the ProjectPlannerResponse body"""
+    initial_state = await prepare_project_planner_state(
+        project_planner_agent, initial_state, incremental, regenerate_sprints
+    )
+    result = await invoke_project_planner_agent(
+        project_planner_agent, initial_state, thread_id=initial_state["project_id"], bypass_llm_cache=bypass_llm_cache
+    )
+    print("Project Planner Agent Execution Successful")
+
+    # Save Plan to DB
+    roadmap_with_dates = await save_project_plan(db, result)
+
+    return {
+        "project_id": result["project_id"],
+        "roadmap": roadmap_with_dates,
+        "extracted_features": result["extracted_features"],
+        "error": result.get("error"),
+    }
+
+
+def build_agent_job_runners(app_state) -> dict:
+    """Job runners for the agent job queue, bound to the agents compiled on app.state"""
+
+    async def run_team_formation_job(job: dict) -> dict:
+        payload = job["payload"]
+        return await run_team_formation(
+            app_state.team_formation_agent, payload["initial_state"], str(job["owner_id"]),
+            bypass_llm_cache=payload["bypass_cache"]
+        )
+
+    async def run_project_planner_job(job: dict) -> dict:
+        payload = job["payload"]
+        return await run_project_planner(
+            app_state.project_planner_agent, app_state.db, payload["initial_state"],
+            bypass_llm_cache=payload["bypass_cache"],
+            incremental=payload.get("incremental", False),
+            regenerate_sprints=payload.get("regenerate_sprints"),
+        )
+
+    return {
+        "team_formation": run_team_formation_job,
+        "project_planner": run_project_planner_job,
+    }
@@ -0,0 +1,60 @@
+"""
+Chat room list enrichment shared by /api/chat/get-chat-rooms and /api/dashboard.
+
+Direct rooms get the other participant's name and picture, team rooms their project title.
+The lookups are batched: one profiles query and one teams query for the whole list,
+instead of one query per room.
+"""
+import asyncio
+from typing import Optional
+
+
+async def enrich_chat_rooms(db, rooms: list[dict], current_user_id: int, known_teams: Optional[list[dict]] = None) -> list[dict]:
+    """
+    Serialize ids and add display fields to chat rooms in place.
+    known_teams (already-loaded team documents) are reused instead of queried again.
+    """
+    other_user_ids = set()
+    team_project_ids = set()
+    for room in rooms:
+        if room.get("room_type") == "direct":
+            others = [uid for uid in room.get("participants", []) if uid != current_user_id]
+            if others:
+                room["_other_user_id"] = others[0]
+                other_user_ids.add(others[0])
+        elif room.get("room_type") == "team" and room.get("team_id"):
+            team_project_ids.add(room["team_id"])
+
+    titles = {team["project_id"]: team.get("project_title") for team in known_teams or [] if "project_id" in team}
+    missing_project_ids = list(team_project_ids - titles.keys())
+
+    async def no_documents():
+        return []
+
+    profiles, teams = await asyncio.gather(
+        db.profiles.find(
+            {"auth_user_id": {"$in": list(other_user_ids)}},
+            {"auth_user_id": 1, "name": 1, "profile_picture": 1}
+        ).to_list(length=None) if other_user_ids else no_documents(),
+        db.teams.find(
+            {"project_id": {"$in": missing_project_ids}},
+            {"project_id": 1, "project_title": 1}
+        ).to_list(length=None) if missing_project_ids else no_documents(),
+    )
+    profiles_by_user = {profile["auth_user_id"]: profile for profile in profiles}
+    titles.update({team["project_id"]: team.get("project_title") for team in teams})
+
+    for room in rooms:
+        room["_id"] = str(room["_id"])
+        other_uid = room.pop("_other_user_id", None)
+        if other_uid is not None and other_uid in profiles_by_user:
+            room["other_user_name"] = profiles_by_user[other_uid].get("name")
+            room["other_user_pic"] = profiles_by_user[other_uid].get("profile_picture")
+        elif room.get("room_type") == "team" and room.get("team_id"):
+            room["project_title"] = titles.get(room["team_id"]) or f"Team: {room['team_id']}"
+
+        # Also convert last_message _id
+        if "last_message" in room and room["last_message"] and "_id" in room["last_message"]:
+            room["last_message"]["_id"] = str(room["last_message"]["_id"])
+
+    return rooms
@@ -0,0 +1,130 @@
+"""
+Batch execution: one program run against many stdin test cases.
+
+Cases run concurrently (at most EXECUTION_BATCH_CONCURRENCY at a time, and never more than
+the gateway lets one user queue) through the execution result cache and gateway, so
+identical cases are answered from cache and other users keep their fair share. Results are
+yielded as cases finish. Piston compiles on every run, so the batch cannot literally
+compile once; instead the first compile error stops the batch and the remaining cases are
+reported as compile errors without running.
+"""
+import asyncio
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from dotenv import load_dotenv
+
+from app.services.execution_cache import execution_cache
+from app.services.execution_gateway import execution_gateway, ExecutionQueueFull
+
+load_dotenv()
+
+EXECUTION_BATCH_MAX_CASES = int(os.getenv("EXECUTION_BATCH_MAX_CASES", "50"))
+EXECUTION_BATCH_CONCURRENCY = int(os.getenv("EXECUTION_BATCH_CONCURRENCY", "3"))
+# How many times a case waits out Retry-After when the user's queue is full
+EXECUTION_BATCH_QUEUE_RETRIES = int(os.getenv("EXECUTION_BATCH_QUEUE_RETRIES", "3"))
+
+
+def normalize_output(text: Optional[str]) -> str:
+    """Ignore trailing whitespace per line and trailing blank lines when comparing outputs"""
+    lines = [line.rstrip() for line in (text or "").replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).rstrip("\n")
+
+
+def compile_failed(result: dict) -> bool:
+    stage = result.get("compile")
+    return bool(stage) and (stage.get("code") not in (0, None) or bool(stage.get("signal")))
+
+
+def case_status(result: dict, expected_output: Optional[str]) -> str:
+    if compile_failed(result):
+        return "compile_error"
+    run = result.get("run") or {}
+    if run.get("signal"):
+        return "timeout" if run["signal"] == "SIGKILL" else "runtime_error"
+    if run.get("code") not in (0, None):
+        return "runtime_error"
+    if expected_output is None:
+        return "completed"
+    return "passed" if normalize_output(run.get("stdout")) == normalize_output(expected_output) else "failed"
+
+
+async def _execute_case(user_id: int, payload: dict, bypass_cache: bool) -> tuple[dict, float, str]:
+    for attempt in range(EXECUTION_BATCH_QUEUE_RETRIES + 1):
+        try:
+            return await execution_cache.run(
+                payload,
+                lambda: execution_gateway.execute(user_id, payload),
+                bypass=bypass_cache
+            )
+        except ExecutionQueueFull as e:
+            if attempt == EXECUTION_BATCH_QUEUE_RETRIES:
+                raise
+            await asyncio.sleep(e.retry_after)
+
+
+async def run_batch(user_id: int, payload: dict, cases: list[dict], bypass_cache: bool = False) -> AsyncIterator[dict]:
+    """
+    Run payload once per case ({"name", "stdin", "expected_output"}), yielding per-case
+    results in completion order. Closing the generator cancels cases that have not finished.
+    """
+    limit = max(1, min(EXECUTION_BATCH_CONCURRENCY, execution_gateway.max_queued_per_user))
+    semaphore = asyncio.Semaphore(limit)
+    compile_error: Optional[dict] = None
+
+    async def run_case(index: int, case: dict) -> dict:
+        nonlocal compile_error
+        base = {"index": index, "name": case.get("name") or f"case {index + 1}"}
+        async with semaphore:
+            if compile_error is not None:
+                return {**base, "status": "compile_error", "skipped": True, "compile": compile_error}
+
+            started = time.perf_counter()
+            try:
+                result, queue_wait, cache_status = await _execute_case(
+                    user_id, {**payload, "stdin": case.get("stdin") or ""}, bypass_cache
+                )
+            except Exception as e:
+                return {**base, "status": "error", "error": str(e) or type(e).__name__,
+                        "time_ms": int((time.perf_counter() - started) * 1000)}
+
+        status = case_status(result, case.get("expected_output"))
+        if status == "compile_error" and compile_error is None:
+            compile_error = result.get("compile")
+        run = result.get("run") or {}
+        return {
+            **base,
+            "status": status,
+            "stdout": run.get("stdout", ""),
+            "stderr": run.get("stderr", ""),
+            "code": run.get("code"),
+            "signal": run.get("signal"),
+            "compile": result.get("compile") if status == "compile_error" else None,
+            "time_ms": int((time.perf_counter() - started - queue_wait) * 1000),
+            "queue_wait_ms": int(queue_wait * 1000),
+            "cache": cache_status,
+        }
+
+    tasks = [asyncio.create_task(run_case(i, case)) for i, case in enumerate(cases)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def summarize_batch(results: list[dict], elapsed_seconds: float) -> dict:
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    return {
+        "total": len(results),
+        "passed": counts.get("passed", 0),
+        "failed": len(results) - counts.get("passed", 0) - counts.get("completed", 0),
+        "statuses": counts,
+        "all_passed": counts.get("passed", 0) == len(results),
+        "compile_error": counts.get("compile_error", 0) > 0,
+        "elapsed_ms": int(elapsed_seconds * 1000),
+    }
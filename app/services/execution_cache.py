@@ -0,0 +1,148 @@
+"""
+Result cache for code executions.
+
+Keyed by a SHA-256 of (language, version, files, stdin, args): re-running identical code
+with identical input returns the stored result without a Piston run. Identical requests
+that arrive while the first is still running share that run (single-flight) rather than
+queueing their own; if that run was turned away by its caller's per-user queue limit, each
+waiting caller runs under its own user instead. Only clean results are cached: runs killed by a signal (e.g. timeouts)
+and results whose output exceeds EXECUTION_CACHE_MAX_OUTPUT_BYTES are never stored.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+
+from app.services.execution_gateway import ExecutionQueueFull
+
+load_dotenv()
+
+EXECUTION_CACHE_TTL_SECONDS = float(os.getenv("EXECUTION_CACHE_TTL_SECONDS", "600"))
+EXECUTION_CACHE_MAX_ENTRIES = int(os.getenv("EXECUTION_CACHE_MAX_ENTRIES", "500"))
+EXECUTION_CACHE_MAX_OUTPUT_BYTES = int(os.getenv("EXECUTION_CACHE_MAX_OUTPUT_BYTES", str(64 * 1024)))
+
+# runner() -> (piston_result, queue_wait_seconds)
+ExecutionRunner = Callable[[], Awaitable[tuple[dict, float]]]
+
+
+def execution_cache_key(payload: dict) -> str:
+    material = json.dumps({
+        "language": payload.get("language"),
+        "version": payload.get("version"),
+        "files": payload.get("files", []),
+        "stdin": payload.get("stdin") or "",
+        "args": payload.get("args") or [],
+        # Limits change the outcome (a timeout or OOM kill at one limit can succeed at another)
+        "compile_timeout": payload.get("compile_timeout"),
+        "run_timeout": payload.get("run_timeout"),
+        "compile_memory_limit": payload.get("compile_memory_limit"),
+        "run_memory_limit": payload.get("run_memory_limit"),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _output_size(stage: Optional[dict]) -> int:
+    if not stage:
+        return 0
+    return len((stage.get("stdout") or "").encode("utf-8")) + len((stage.get("stderr") or "").encode("utf-8"))
+
+
+def is_cacheable_result(result: dict, max_output_bytes: int = EXECUTION_CACHE_MAX_OUTPUT_BYTES) -> bool:
+    stages = [result.get("compile"), result.get("run")]
+    if any(stage and stage.get("signal") for stage in stages):
+        return False
+    return sum(_output_size(stage) for stage in stages) <= max_output_bytes
+
+
+class ExecutionResultCache:
+    def __init__(self, ttl_seconds: float = EXECUTION_CACHE_TTL_SECONDS, max_entries: int = EXECUTION_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def run(self, payload: dict, runner: ExecutionRunner, bypass: bool = False) -> tuple[dict, float, str]:
+        """
+        Serve payload from cache, join an identical in-flight run, or start a new one.
+        Returns (result, queue_wait_seconds, cache_status) with cache_status one of
+        "hit", "shared", "miss" or "bypass".
+        """
+        if bypass:
+            result, queue_wait = await runner()
+            return result, queue_wait, "bypass"
+
+        key = execution_cache_key(payload)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, 0.0, "hit"
+
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            try:
+                result, queue_wait = await asyncio.shield(task)
+                self.shared += 1
+                return copy.deepcopy(result), queue_wait, "shared"
+            except ExecutionQueueFull:
+                # The leader's user was over their queue limit; that says nothing about ours
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                return await self.run(payload, runner)
+
+        self.misses += 1
+        # The run is its own task, so followers are unaffected if this caller disconnects
+        task = asyncio.create_task(runner())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda finished: self._finish(key, finished))
+        result, queue_wait = await asyncio.shield(task)
+        return copy.deepcopy(result), queue_wait, "miss"
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result, _ = task.result()
+        if is_cacheable_result(result):
+            self.put(key, result)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses,
+        }
+
+
+execution_cache = ExecutionResultCache()
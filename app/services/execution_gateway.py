@@ -0,0 +1,188 @@
+"""
+Gateway in front of the self-hosted Piston execution service.
+
+All executions share one pooled httpx client and at most EXECUTION_MAX_CONCURRENCY run
+at once. Requests beyond that wait in per-user queues that are served round-robin, so one
+user submitting many runs cannot starve everyone else. When the queue is full (overall,
+or for that user) callers get ExecutionQueueFull with a Retry-After estimate instead of piling on.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.config.external_services import PISTON_API_URL
+
+load_dotenv()
+
+EXECUTION_MAX_CONCURRENCY = int(os.getenv("EXECUTION_MAX_CONCURRENCY", "4"))
+EXECUTION_MAX_QUEUE = int(os.getenv("EXECUTION_MAX_QUEUE", "50"))
+EXECUTION_MAX_QUEUED_PER_USER = int(os.getenv("EXECUTION_MAX_QUEUED_PER_USER", "3"))
+# Added on top of compile_timeout + run_timeout for container start-up and transfer
+EXECUTION_TIMEOUT_MARGIN_SECONDS = float(os.getenv("EXECUTION_TIMEOUT_MARGIN_SECONDS", "5"))
+
+
+class ExecutionQueueFull(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Execution queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def execution_timeout(compile_timeout_ms: int, run_timeout_ms: int) -> httpx.Timeout:
+    """HTTP timeout that covers Piston's own compile + run limits plus a margin"""
+    read_seconds = (compile_timeout_ms + run_timeout_ms) / 1000 + EXECUTION_TIMEOUT_MARGIN_SECONDS
+    return httpx.Timeout(read_seconds, connect=5.0, pool=5.0)
+
+
+class ExecutionGateway:
+    def __init__(
+        self,
+        url: str = PISTON_API_URL,
+        max_concurrency: int = EXECUTION_MAX_CONCURRENCY,
+        max_queue: int = EXECUTION_MAX_QUEUE,
+        max_queued_per_user: int = EXECUTION_MAX_QUEUED_PER_USER,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._active = 0
+        self._waiters: dict[int, deque] = {}  # user_id -> futures waiting for a slot, oldest first
+        self._rotation: deque = deque()        # users with waiters, in round-robin order
+        self._avg_run_seconds = 1.0            # moving average used for Retry-After estimates
+
+    # ── lifecycle ────────────────────────────────────────────
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ── fair slot allocation ────────────────────────────────
+    def queued(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    def retry_after(self) -> int:
+        waves = (self.queued() + self._active) / max(1, self.max_concurrency)
+        return max(1, math.ceil(waves * self._avg_run_seconds))
+
+    def positions(self, user_id: int) -> list[int]:
+        """1-based queue positions of the user's waiting executions in round-robin service order"""
+        queues = [list(self._waiters[u]) for u in self._rotation]
+        order = []
+        depth = 0
+        while any(depth < len(q) for q in queues):
+            for user, q in zip(self._rotation, queues):
+                if depth < len(q):
+                    order.append(user)
+            depth += 1
+        return [i + 1 for i, user in enumerate(order) if user == user_id]
+
+    def status(self, user_id: int) -> dict:
+        return {
+            "active": self._active,
+            "queued": self.queued(),
+            "max_concurrency": self.max_concurrency,
+            "your_positions": self.positions(user_id),
+            "estimated_wait_seconds": self.retry_after() if self.queued() else 0,
+        }
+
+    async def _acquire(self, user_id: int) -> None:
+        if self._active < self.max_concurrency and not self._rotation:
+            self._active += 1
+            return
+
+        user_queue = self._waiters.get(user_id)
+        if self.queued() >= self.max_queue or (user_queue and len(user_queue) >= self.max_queued_per_user):
+            raise ExecutionQueueFull(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        if user_queue is None:
+            user_queue = self._waiters[user_id] = deque()
+            self._rotation.append(user_id)
+        user_queue.append(waiter)
+
+        try:
+            await waiter  # resolved by _release() when it hands us a slot
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # slot was handed over just as we were cancelled
+            else:
+                self._forget(user_id, waiter)
+            raise
+
+    def _forget(self, user_id: int, waiter) -> None:
+        user_queue = self._waiters.get(user_id)
+        if user_queue is None or waiter not in user_queue:
+            return
+        user_queue.remove(waiter)
+        if not user_queue:
+            del self._waiters[user_id]
+            self._rotation.remove(user_id)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next user in rotation (active count unchanged)
+        while self._rotation:
+            user_id = self._rotation.popleft()
+            user_queue = self._waiters[user_id]
+            waiter = user_queue.popleft()
+            if user_queue:
+                self._rotation.append(user_id)
+            else:
+                del self._waiters[user_id]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, user_id: int):
+        await self._acquire(user_id)
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ── execution ───────────────────────────────────────────
+    async def execute(self, user_id: int, payload: dict) -> tuple[dict, float]:
+        """
+        Run payload on Piston once a slot is free. Returns (piston_response, queue_wait_seconds).
+        Raises ExecutionQueueFull, or httpx errors from the Piston call.
+        """
+        enqueued_at = time.perf_counter()
+        async with self.slot(user_id):
+            started_at = time.perf_counter()
+            response = await self.client().post(
+                self.url,
+                json=payload,
+                timeout=execution_timeout(payload.get("compile_timeout", 10000), payload.get("run_timeout", 3000)),
+            )
+            elapsed = time.perf_counter() - started_at
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+
+        if response.status_code != 200:
+            print(f"Piston Error Body: {response.text}")
+        response.raise_for_status()
+        return response.json(), started_at - enqueued_at
+
+
+execution_gateway = ExecutionGateway()
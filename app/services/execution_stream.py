@@ -0,0 +1,186 @@
+"""
+Streamed code execution for collaboration rooms.
+
+Runs code through Piston's WebSocket API (/api/v2/connect), which reports stdout/stderr
+while the program is still running, and forwards the output to the room as it arrives
+(coalesced every EXECUTION_STREAM_FLUSH_MS). If the WebSocket API cannot be reached
+(older Piston, or it is disabled) the run falls back to the REST API and the room gets the
+output in one piece at the end. Runs with stdin also use the REST API: the WebSocket
+protocol can write to stdin but cannot close it, so a program reading to EOF would hang
+until run_timeout. Either way the run holds an execution gateway slot, so it counts
+against the same concurrency limit and per-user queue as POST /api/execution.
+
+Runs go through the execution result cache like POST /api/execution: a cached result, or
+one shared with an identical run already in progress, is posted to the room in one piece.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidHandshake, InvalidURI
+
+from app.config.external_services import PISTON_WS_URL
+from app.services.execution_cache import execution_cache
+from app.services.execution_gateway import execution_gateway, execution_timeout
+from app.sockets.events import SocketEvent
+
+load_dotenv()
+
+EXECUTION_STREAM_FLUSH_MS = float(os.getenv("EXECUTION_STREAM_FLUSH_MS", "50"))
+EXECUTION_STREAM_FLUSH_BYTES = int(os.getenv("EXECUTION_STREAM_FLUSH_BYTES", "4096"))
+
+# emit(event, data) pushes one Socket.IO event to the room
+Emit = Callable[[SocketEvent, dict], Awaitable[None]]
+
+
+class PistonStreamUnavailable(Exception):
+    """The WebSocket API could not be reached before anything ran"""
+
+
+class OutputBatcher:
+    """Coalesces small output chunks so a chatty program does not flood the room"""
+
+    def __init__(self, emit: Emit):
+        self.emit = emit
+        self._pending: list[tuple[str, str, str]] = []  # (stage, stream, data)
+        self._size = 0
+        self._lock = asyncio.Lock()  # keeps chunks in order when a timed and a size flush overlap
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, stage: str, stream: str, data: str) -> None:
+        if self._pending and self._pending[-1][:2] == (stage, stream):
+            self._pending[-1] = (stage, stream, self._pending[-1][2] + data)
+        else:
+            self._pending.append((stage, stream, data))
+        self._size += len(data)
+        if self._size >= EXECUTION_STREAM_FLUSH_BYTES:
+            await self.flush()
+        elif self._timer is None:
+            # Output that is followed by silence still reaches the room within the interval
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(EXECUTION_STREAM_FLUSH_MS / 1000)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            pending, self._pending, self._size = self._pending, [], 0
+            for stage, stream, data in pending:
+                await self.emit(SocketEvent.EXECUTION_OUTPUT, {"stage": stage, "stream": stream, "data": data})
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
+
+
+def _empty_stage() -> dict:
+    return {"stdout": "", "stderr": "", "output": "", "code": None, "signal": None}
+
+
+async def _stream_via_websocket(payload: dict, batcher: OutputBatcher) -> dict:
+    """Run payload over Piston's WebSocket API; returns a result shaped like the REST response"""
+    try:
+        websocket = await connect(PISTON_WS_URL, open_timeout=5)
+    except (OSError, InvalidHandshake, InvalidURI, asyncio.TimeoutError) as e:
+        raise PistonStreamUnavailable(str(e))
+
+    result = {"language": payload["language"], "version": payload["version"], "run": _empty_stage()}
+    stage = "run"
+    async with websocket:
+        await websocket.send(json.dumps({
+            "type": "init",
+            "language": payload["language"],
+            "version": payload["version"],
+            "files": payload["files"],
+            "args": payload.get("args") or [],
+            "compile_timeout": payload.get("compile_timeout"),
+            "run_timeout": payload.get("run_timeout"),
+        }))
+
+        try:
+            async for raw in websocket:
+                message = json.loads(raw)
+                kind = message.get("type")
+                if kind == "runtime":
+                    result["language"] = message.get("language", result["language"])
+                    result["version"] = message.get("version", result["version"])
+                elif kind == "stage":
+                    stage = message.get("stage", "run")
+                    result.setdefault(stage, _empty_stage())
+                elif kind == "data":
+                    stream = message.get("stream", "stdout")
+                    data = message.get("data", "")
+                    target = result.setdefault(stage, _empty_stage())
+                    target[stream] = target.get(stream, "") + data
+                    target["output"] += data
+                    await batcher.add(stage, stream, data)
+                elif kind == "exit":
+                    exit_stage = result.setdefault(message.get("stage", stage), _empty_stage())
+                    exit_stage["code"] = message.get("code")
+                    exit_stage["signal"] = message.get("signal")
+                    if message.get("stage", stage) == "run" or exit_stage["code"] not in (0, None):
+                        break  # run finished, or compilation failed and nothing will run
+                elif kind == "error":
+                    raise RuntimeError(f"Piston error: {message.get('message')}")
+        except ConnectionClosed:
+            pass  # Piston closes the socket once the job completes
+
+    return result
+
+
+async def _post_output(result: dict, batcher: OutputBatcher) -> None:
+    """Send the output of a run that was not streamed live (REST, cached or shared)"""
+    for stage in ("compile", "run"):
+        for stream in ("stdout", "stderr"):
+            data = (result.get(stage) or {}).get(stream)
+            if data:
+                await batcher.add(stage, stream, data)
+
+
+async def stream_execution(user_id: int, payload: dict, emit: Emit, started_by: Optional[str] = None,
+                           bypass_cache: bool = False) -> dict:
+    """
+    Execute payload, streaming output through emit (execution_started, execution_output...,
+    execution_finished). Returns the final result in the same shape as POST /api/execution.
+    """
+    batcher = OutputBatcher(emit)
+    limit = execution_timeout(payload.get("compile_timeout", 10000), payload.get("run_timeout", 3000)).read
+    streamed = False
+
+    async def runner() -> tuple[dict, float]:
+        nonlocal streamed
+        if not payload.get("stdin"):  # stdin needs EOF, which only the REST API delivers
+            try:
+                started = time.perf_counter()
+                async with execution_gateway.slot(user_id):
+                    queue_wait = time.perf_counter() - started
+                    result = await asyncio.wait_for(_stream_via_websocket(payload, batcher), timeout=limit)
+                streamed = True
+                return result, queue_wait
+            except PistonStreamUnavailable as e:
+                print(f"Piston WebSocket API unavailable ({e}), falling back to REST")
+        return await execution_gateway.execute(user_id, payload)
+
+    await emit(SocketEvent.EXECUTION_STARTED, {
+        "language": payload["language"], "version": payload["version"], "startedBy": started_by
+    })
+    try:
+        result, _, cache_status = await execution_cache.run(payload, runner, bypass=bypass_cache)
+        if not streamed:
+            await _post_output(result, batcher)
+    except Exception as e:
+        await batcher.close()
+        await emit(SocketEvent.EXECUTION_FINISHED, {"error": str(e) or type(e).__name__})
+        raise
+
+    await batcher.close()
+    await emit(SocketEvent.EXECUTION_FINISHED, {"result": result, "cache": cache_status})
+    return result
@@ -0,0 +1,77 @@
+"""
+Keyset (cursor) pagination for Mongo list endpoints, newest first.
+
+Pages are ordered by (created_at, _id) descending and the cursor is an opaque token for the
+last item of the previous page, so each page is one index range scan of at most limit + 1
+documents however deep the client pages (unlike skip/offset). Also conditional-GET helpers:
+a weak ETag over the serialized page lets unchanged pages answer 304.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+# Sort matching the (created_at, _id) indexes; newest first, _id breaks created_at ties
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def encode_cursor(document: dict) -> str:
+    raw = json.dumps({"t": document["created_at"].isoformat(), "id": str(document["_id"])})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    """Raises HTTP 400 for a cursor that was not produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_filter(query: dict, cursor: Optional[str]) -> dict:
+    """query restricted to documents after the cursor in KEYSET_SORT order"""
+    if not cursor:
+        return query
+    created_at, last_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": last_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+async def fetch_page(collection, query: dict, limit: int, cursor: Optional[str] = None,
+                     projection: Optional[dict] = None) -> tuple[list[dict], Optional[str]]:
+    """One page of documents and the cursor for the next page (None on the last page)"""
+    documents = await collection.find(keyset_filter(query, cursor), projection) \
+        .sort(KEYSET_SORT).limit(limit + 1).to_list(length=limit + 1)
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_cursor(documents[-1])
+
+
+def etag_for(payload) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return 'W/"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, response: Response, payload) -> Optional[Response]:
+    """
+    Set ETag / Cache-Control on response; if the client already has this exact payload
+    (If-None-Match), return the 304 response to send instead.
+    """
+    etag = etag_for(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
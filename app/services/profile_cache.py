@@ -0,0 +1,64 @@
+"""
+Process-level cache of profile documents keyed by auth_user_id.
+Reads fall through to MongoDB on a miss; profile writes go through put()/invalidate()
+so the owning worker never serves a stale copy, and other workers converge within the TTL.
+"""
+import copy
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+PROFILE_CACHE_MAX_SIZE = int(os.getenv("PROFILE_CACHE_MAX_SIZE", "5000"))
+
+
+class ProfileCache:
+    def __init__(self, ttl_seconds: float = PROFILE_CACHE_TTL_SECONDS, max_size: int = PROFILE_CACHE_MAX_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, profiles_collection, auth_user_id: int) -> Optional[dict]:
+        """
+        Return a copy of the raw profile document (with _id), or None if the user has no profile.
+        Callers are free to mutate the returned dict.
+        """
+        entry = self._entries.get(auth_user_id)
+        if entry is not None:
+            expires_at, profile = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(auth_user_id)
+                self.hits += 1
+                return copy.deepcopy(profile)
+            del self._entries[auth_user_id]
+
+        self.misses += 1
+        profile = await profiles_collection.find_one({"auth_user_id": auth_user_id})
+        if profile is None:
+            return None  # Not cached: the profile may be created at any moment
+
+        self.put(auth_user_id, profile)
+        return profile
+
+    def put(self, auth_user_id: int, profile: dict) -> None:
+        """Write-through after a profile insert/update (stores a private copy)"""
+        self._entries[auth_user_id] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(profile))
+        self._entries.move_to_end(auth_user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, auth_user_id: int) -> None:
+        self._entries.pop(auth_user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,131 @@
+"""
+Local copy of Piston's runtime catalog (GET /api/v2/runtimes).
+
+Fetched at startup and refreshed every RUNTIME_REFRESH_SECONDS, so execution requests can
+resolve language aliases ("py", "node", ...) and "*" / partial versions to a concrete
+runtime, and unknown runtimes are rejected before any network I/O. Semver ranges ("3.x",
+"^3", ">=3.10") are left for Piston to match. If the catalog could not be loaded yet (Piston
+down at startup), requests pass through unchanged and Piston decides.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from app.config.external_services import PISTON_RUNTIMES_URL
+from app.services.execution_gateway import execution_gateway
+
+load_dotenv()
+
+RUNTIME_REFRESH_SECONDS = float(os.getenv("RUNTIME_REFRESH_SECONDS", "600"))
+# Retry sooner while the catalog has never loaded
+RUNTIME_RETRY_SECONDS = float(os.getenv("RUNTIME_RETRY_SECONDS", "30"))
+
+
+# Plain dotted versions ("3", "3.10.0") are resolved locally; any other specifier goes to Piston
+PLAIN_VERSION = re.compile(r"\d+(\.\d+)*")
+
+
+class UnknownRuntime(Exception):
+    pass
+
+
+def version_key(version: str) -> tuple:
+    """Sort key for dotted versions: numeric parts compare as numbers"""
+    return tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in version.split("."))
+
+
+class RuntimeRegistry:
+    def __init__(self, url: str = PISTON_RUNTIMES_URL):
+        self.url = url
+        self.runtimes: list[dict] = []
+        self.etag: Optional[str] = None
+        self.fetched_at: Optional[float] = None
+        self._versions: dict[str, list[str]] = {}  # language -> versions, newest first
+        self._aliases: dict[str, str] = {}         # lowercase name or alias -> language
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.fetched_at is not None
+
+    def load(self, runtimes: list[dict]) -> None:
+        versions: dict[str, set] = {}
+        aliases: dict[str, str] = {}
+        for runtime in runtimes:
+            language = runtime["language"]
+            versions.setdefault(language, set()).add(runtime["version"])
+            aliases[language.lower()] = language
+            for alias in runtime.get("aliases") or []:
+                aliases.setdefault(alias.lower(), language)
+
+        self.runtimes = sorted(runtimes, key=lambda r: (r["language"], version_key(r["version"])))
+        self._versions = {lang: sorted(vs, key=version_key, reverse=True) for lang, vs in versions.items()}
+        self._aliases = aliases
+        body = json.dumps(self.runtimes, sort_keys=True).encode("utf-8")
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.fetched_at = time.time()
+
+    async def refresh(self) -> bool:
+        try:
+            response = await execution_gateway.client().get(self.url, timeout=10)
+            response.raise_for_status()
+            self.load(response.json())
+            print(f"✅ Loaded {len(self.runtimes)} Piston runtimes")
+            return True
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            print(f"❌ Failed to load Piston runtimes: {e}")
+            return False
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            ok = await self.refresh()
+            await asyncio.sleep(RUNTIME_REFRESH_SECONDS if ok or self.loaded else RUNTIME_RETRY_SECONDS)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def resolve(self, language: str, version: str = "*") -> tuple[str, str]:
+        """
+        Resolve an alias and a "*", exact or prefix ("3", "3.10") version to a runtime in the
+        catalog. Other specifiers (semver ranges) are passed through for Piston to resolve.
+        Raises UnknownRuntime for an unknown language or a plain version that is not installed.
+        """
+        if not self.loaded:
+            return language, version
+
+        resolved = self._aliases.get(language.lower())
+        if resolved is None:
+            raise UnknownRuntime(f"Unsupported language '{language}'")
+
+        available = self._versions[resolved]
+        version = (version or "*").strip()
+        if version in ("*", "", "latest"):
+            return resolved, available[0]
+        for candidate in available:
+            if candidate == version or candidate.startswith(version + "."):
+                return resolved, candidate
+        if not PLAIN_VERSION.fullmatch(version):
+            return resolved, version
+        raise UnknownRuntime(
+            f"Version '{version}' of {resolved} is not installed (available: {', '.join(available)})"
+        )
+
+
+runtime_registry = RuntimeRegistry()
@@ -0,0 +1,111 @@
+"""
+JWT verification with a bounded cache of already-verified tokens.
+Shared by the HTTP auth dependency and the Socket.IO connect handler.
+"""
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import jwt
+from dotenv import load_dotenv
+
+from app.config.jwt_config import SECRET_KEY, ALGORITHM
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller behind a verified token"""
+    user_id: int
+    token_type: Optional[str]  # "access" or "refresh"
+    expires_at: float  # Unix timestamp taken from the token's exp claim
+
+
+class TokenVerificationError(Exception):
+    """Raised when a token is expired, tampered with or missing required claims"""
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs and remembers the result until the token's own expiry.
+    Entries are keyed by a SHA-256 of the token so raw tokens are never kept in memory,
+    and the least recently used entry is evicted once max_size is reached.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._cache: "OrderedDict[str, Principal]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def verify(self, token: str) -> Principal:
+        if not token:
+            raise TokenVerificationError("Missing token")
+
+        key = self._key(token)
+        principal = self._cache.get(key)
+        if principal is not None:
+            if principal.expires_at > time.time():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return principal
+            del self._cache[key]
+
+        self.misses += 1
+        principal = self._decode(token)
+
+        self._cache[key] = principal
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+        return principal
+
+    def verify_access(self, token: str) -> Principal:
+        """verify() for API and socket auth: refresh tokens are only good at /refresh-token"""
+        principal = self.verify(token)
+        if principal.token_type != "access":
+            raise TokenVerificationError(f"Wrong token type: {principal.token_type}")
+        return principal
+
+    def _decode(self, token: str) -> Principal:
+        try:
+            payload = jwt.decode(
+                token,
+                SECRET_KEY,
+                algorithms=[ALGORITHM],
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise TokenVerificationError("Token expired") from e
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Invalid token: {type(e).__name__}") from e
+
+        try:
+            return Principal(
+                user_id=int(payload["sub"]),
+                token_type=payload.get("type"),
+                expires_at=float(payload["exp"]),
+            )
+        except (TypeError, ValueError) as e:
+            raise TokenVerificationError("Malformed token claims") from e
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Process-wide verifier (all callers run on the event loop, so no locking is needed)
+token_verifier = TokenVerifier()
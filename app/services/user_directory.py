@@ -0,0 +1,97 @@
+"""
+User directory: resolves MySQL user ids <-> usernames.
+Usernames change rarely, so resolved pairs are kept in an in-memory LRU and only
+the ids missing from it are fetched, in a single SELECT ... WHERE id IN (...).
+Entries are dropped automatically when a User row is updated or deleted through the ORM.
+"""
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.models.User import User
+
+load_dotenv()
+
+USER_DIRECTORY_MAX_SIZE = int(os.getenv("USER_DIRECTORY_MAX_SIZE", "20000"))
+
+
+class UserDirectory:
+    def __init__(self, max_size: int = USER_DIRECTORY_MAX_SIZE):
+        self.max_size = max_size
+        self._usernames: "OrderedDict[int, str]" = OrderedDict()
+        self._ids: dict[str, int] = {}
+
+    def remember(self, user_id: int, username: str) -> None:
+        self.invalidate(user_id)
+        self._usernames[user_id] = username
+        self._ids[username] = user_id
+        while len(self._usernames) > self.max_size:
+            _, evicted = self._usernames.popitem(last=False)
+            self._ids.pop(evicted, None)
+
+    def invalidate(self, user_id: int) -> None:
+        username = self._usernames.pop(user_id, None)
+        if username is not None:
+            self._ids.pop(username, None)
+
+    def clear(self) -> None:
+        self._usernames.clear()
+        self._ids.clear()
+
+    def resolve_usernames(self, session: Session, user_ids: Iterable[int]) -> dict[int, str]:
+        """Map user ids to usernames; unknown ids are left out of the result"""
+        resolved: dict[int, str] = {}
+        missing = set()
+        for user_id in set(user_ids):
+            username = self._usernames.get(user_id)
+            if username is None:
+                missing.add(user_id)
+            else:
+                self._usernames.move_to_end(user_id)
+                resolved[user_id] = username
+
+        if missing:
+            statement = select(User.id, User.username).where(User.id.in_(missing))  # type: ignore
+            for user_id, username in session.exec(statement).all():
+                self.remember(user_id, username)
+                resolved[user_id] = username
+
+        return resolved
+
+    def resolve_user_id(self, session: Session, username: str) -> Optional[int]:
+        """Map a username to its user id, or None if no such user exists"""
+        user_id = self._ids.get(username)
+        if user_id is not None:
+            return user_id
+
+        user = session.exec(select(User).where(User.username == username)).first()
+        if not user:
+            return None
+        self.remember(user.id, user.username)
+        return user.id
+
+    def enrich_team_members(self, teams: list[dict], session: Session) -> list[dict]:
+        """Set member["username"] on every member of every team with one lookup for the whole set"""
+        user_ids = [m["user_id"] for team in teams for m in team.get("team_members", [])]
+        if not user_ids:
+            return teams
+
+        id_to_username = self.resolve_usernames(session, user_ids)
+        for team in teams:
+            for member in team.get("team_members", []):
+                member["username"] = id_to_username.get(member["user_id"])
+        return teams
+
+
+user_directory = UserDirectory()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    if target.id is not None:
+        user_directory.invalidate(target.id)
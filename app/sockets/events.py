@@ -39,6 +39,11 @@ class SocketEvent(Enum):
     TYPING_START = "typing_start"
     TYPING_PAUSE = "typing_pause"
     CURSOR_MOVE = "cursor_move"
+
+    # Code execution (streamed to the whole room)
+    EXECUTION_STARTED = "execution_started"
+    EXECUTION_OUTPUT = "execution_output"
+    EXECUTION_FINISHED = "execution_finished"
     
 class UserConnectionStatus(Enum):
     ONLINE = "online"
@@ -1,7 +1,18 @@
+import os
+import logging
 import socketio
 from typing import List, Optional
 from dataclasses import dataclass
+from urllib.parse import parse_qs
 from .events import SocketEvent, UserConnectionStatus
+from app.services.token_verifier import TokenVerificationError, token_verifier
+
+logger = logging.getLogger(__name__)
+
+# Reject Socket.IO connections that do not carry a valid access token.
+# Off by default for this release so existing clients can start sending a token first;
+# connections without one are logged as warnings. The default becomes "true" next release.
+SOCKET_AUTH_REQUIRED = os.getenv("SOCKET_AUTH_REQUIRED", "false").lower() == "true"
 
 @dataclass
 class ConnectedUser:
@@ -45,13 +56,41 @@ def user_to_dict(user: ConnectedUser) -> dict:
         "userId": user.userId
     }
 
+def extract_socket_token(environ: dict, auth: Optional[dict]) -> Optional[str]:
+    """
+    Find the JWT sent by the client: the Socket.IO auth payload ({"token": ...}),
+    an Authorization: Bearer header, or a ?token= query parameter.
+    """
+    if isinstance(auth, dict) and auth.get("token"):
+        return auth["token"]
+
+    header = environ.get("HTTP_AUTHORIZATION", "")
+    if header.lower().startswith("bearer "):
+        return header[7:].strip()
+
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    tokens = query.get("token")
+    return tokens[0] if tokens else None
+
 def register_socket_handlers(sio: socketio.AsyncServer):
     """Register all socket event handlers"""
     global user_socket_map
 
     @sio.event
-    async def connect(sid, environ):
-        # We don't authenticate here yet, we wait for 'join_request'
+    async def connect(sid, environ, auth=None):
+        # Same verifier (and cache) as the HTTP auth dependency
+        token = extract_socket_token(environ, auth)
+        try:
+            principal = token_verifier.verify_access(token)
+        except TokenVerificationError as e:
+            if SOCKET_AUTH_REQUIRED:
+                logger.info("Rejected socket connection", extra={"sid": sid, "reason": str(e)})
+                raise socketio.exceptions.ConnectionRefusedError("Invalid or expired token")
+            logger.warning("Unauthenticated socket connection allowed (SOCKET_AUTH_REQUIRED is off)",
+                           extra={"sid": sid, "reason": str(e)})
+            principal = None
+
+        await sio.save_session(sid, {"user_id": principal.user_id if principal else None})
         print(f"Client connected: {sid}")
 
     @sio.event
@@ -83,7 +122,9 @@ def register_socket_handlers(sio: socketio.AsyncServer):
         global user_socket_map
         room_id = data.get("roomId")
         username = data.get("username")
-        user_id = data.get("userId") # Optional auth link
+        session = await sio.get_session(sid)
+        # Prefer the verified identity over whatever the client claims
+        user_id = str(session["user_id"]) if session.get("user_id") is not None else data.get("userId")
         
         print(f"Join Request: {username} -> {room_id}")
 
@@ -0,0 +1,8 @@
+import socketio
+
+# Shared Socket.IO server: main.py wraps the FastAPI app with it, and HTTP routes
+# import it to push events to rooms (e.g. streamed execution output)
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins='*' # Allow all origins for now
+)
@@ -1,38 +1,118 @@
 import asyncio
+import os
+import time
 from datetime import datetime, timedelta
-from app.db.mongo import get_database
 from typing import Optional
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+from sqlalchemy import and_, delete, or_
+from sqlmodel import Session
+from app.db.mysql_connection import engine
+from app.models.password_reset_token import PasswordResetToken
 
-async def delete_old_invitations(interval_seconds: int = 600, limit_days: int = 7):
+load_dotenv()
+
+# Answered (ACCEPTED / REJECTED) invitations are kept this long, then removed by Mongo's TTL monitor
+INVITATION_RETENTION_DAYS = float(os.getenv("INVITATION_RETENTION_DAYS", "7"))
+INVITATION_BACKFILL_BATCH_SIZE = int(os.getenv("INVITATION_BACKFILL_BATCH_SIZE", "500"))
+
+OTP_CLEANUP_INTERVAL_SECONDS = int(os.getenv("OTP_CLEANUP_INTERVAL_SECONDS", "900"))
+OTP_CLEANUP_BATCH_SIZE = int(os.getenv("OTP_CLEANUP_BATCH_SIZE", "1000"))
+
+
+def invitation_expire_at(responded_at: Optional[datetime] = None) -> datetime:
+    """When an invitation answered at responded_at should expire"""
+    return (responded_at or datetime.utcnow()) + timedelta(days=INVITATION_RETENTION_DAYS)
+
+
+async def ensure_invitation_indexes(invitations_collection) -> None:
+    """TTL index: documents are deleted once expire_at passes (PENDING invitations have none)"""
+    await invitations_collection.create_index("expire_at", expireAfterSeconds=0)
+
+
+async def ensure_project_indexes(db) -> None:
+    """Indexes behind the paginated /my-projects and /all-projects lists (keyset on created_at, _id)"""
+    await db["projects"].create_index([("created_at", -1), ("_id", -1)])
+    await db["projects"].create_index([("auth_user_id", 1), ("created_at", -1), ("_id", -1)])
+    await db["teams"].create_index("team_members.user_id")
+
+
+async def backfill_invitation_expiry(invitations_collection, batch_size: int = INVITATION_BACKFILL_BATCH_SIZE) -> int:
     """
-    Background task to delete invitations that are ACCEPTED or REJECTED 
-    and haven't been updated for 'limit_days'.
-    
-    :param interval_seconds: How often the task runs in seconds.
-    :param limit_days: Age of invitations (in days) to delete.
+    Give answered invitations created before the TTL index an expire_at, in bounded batches
+    so it never holds a full-collection scan or a huge update. Returns the number updated.
+
+    :param invitations_collection: Collection on the app's shared Mongo client.
+    :param batch_size: Documents updated per round trip.
     """
+    total = 0
     while True:
-        try:
-            # Connect to DB (assuming get_database returns the db instance)
-            db = await get_database() 
-            invitations_collection = db["invitations"] # Access collection directly or via dependency if preferred
-
-            cutoff_time = datetime.utcnow() - timedelta(days=limit_days)
-            
-            # Delete query
-            result = await invitations_collection.delete_many({
-                "status": {"$in": ["ACCEPTED", "REJECTED"]},
-                # "updated_at": {"$lt": cutoff_time} # Any invitation updated before cutoff date, are is deleted via this background task.
-            })
-
-            if result.deleted_count > 0:
-                print(f"[Cleanup] Deleted {result.deleted_count} old invitations.")
-            
-            else:
-                print("[Cleanup] No old invitations to delete.")
-            
-        except Exception as e:
-            print(f"[Cleanup Error] Error deleting old invitations: {e}")
-        
-        # Sleep for the specified interval
-        await asyncio.sleep(interval_seconds)
+        batch = await invitations_collection.find(
+            {"status": {"$in": ["ACCEPTED", "REJECTED"]}, "expire_at": {"$exists": False}},
+            {"_id": 1, "updated_at": 1, "created_at": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            return total
+
+        await invitations_collection.bulk_write([
+            UpdateOne(
+                {"_id": invitation["_id"]},
+                {"$set": {"expire_at": invitation_expire_at(invitation.get("updated_at") or invitation.get("created_at"))}}
+            )
+            for invitation in batch
+        ], ordered=False)
+        total += len(batch)
+        await asyncio.sleep(0)  # yield between batches
+
+
+def purge_password_reset_tokens(batch_size: int = OTP_CLEANUP_BATCH_SIZE) -> tuple[int, float]:
+    """
+    Delete used or expired OTPs with DELETE ... LIMIT batch_size until none are left, each
+    batch in its own short transaction. Blocking: call it off the event loop.
+    Returns (rows_deleted, seconds).
+    """
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    # Written as two ranges of the (is_used, expires_at) index rather than a plain OR
+    statement = delete(PasswordResetToken).where(
+        or_(
+            PasswordResetToken.is_used == True,
+            and_(PasswordResetToken.is_used == False, PasswordResetToken.expires_at < now)
+        )
+    ).with_dialect_options(mysql_limit=batch_size)
+
+    total = 0
+    with Session(engine) as session:
+        while True:
+            deleted = session.exec(statement).rowcount
+            session.commit()
+            total += deleted
+            if deleted < batch_size:
+                break
+    return total, time.perf_counter() - started
+
+
+async def cleanup_used_otps() -> dict:
+    """Purge used/expired OTPs off the event loop"""
+    deleted, seconds = await asyncio.to_thread(purge_password_reset_tokens)
+    return {"deleted": deleted, "delete_ms": int(seconds * 1000)}
+
+
+def register_maintenance_jobs(scheduler, db) -> None:
+    """Maintenance jobs run by the shared scheduler (one worker per run, see app/tasks/scheduler.py)"""
+    invitations_collection = db["invitations"]
+
+    async def invitation_maintenance() -> dict:
+        await ensure_invitation_indexes(invitations_collection)
+        return {"expiry_backfilled": await backfill_invitation_expiry(invitations_collection)}
+
+    async def project_indexes() -> None:
+        await ensure_project_indexes(db)
+
+    scheduler.register("otp_cleanup", cleanup_used_otps,
+                       interval_seconds=OTP_CLEANUP_INTERVAL_SECONDS, jitter_seconds=60)
+    # Index build + backfill: does real work once after a deploy, afterwards finds nothing to do
+    scheduler.register("invitation_maintenance", invitation_maintenance,
+                       interval_seconds=86400, jitter_seconds=300, run_at_start=True)
+    scheduler.register("project_indexes", project_indexes,
+                       interval_seconds=86400, jitter_seconds=300, run_at_start=True)
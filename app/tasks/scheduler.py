@@ -0,0 +1,251 @@
+"""
+Background job scheduler shared by every uvicorn worker.
+
+Jobs run on a fixed interval (plus random jitter so workers don't wake in lockstep). Each
+job has a document in the scheduled_jobs collection holding its lease and next_run_at: a
+worker only runs a job after atomically taking an expired lease on a due job, so with N
+workers a job still runs once per interval, and if the leader dies its lease expires and
+another worker takes over. Durations, results and failures of every run are recorded on
+the same document. A failing job is logged and retried on the next interval; it never
+kills the loop. Jobs registered with leader_only=False (e.g. per-process cache warmers)
+run in every worker without a lease.
+"""
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+load_dotenv()
+
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("JOB_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+# Floor for re-checking a job another worker owns, and for retrying after a Mongo error
+JOB_MIN_POLL_SECONDS = float(os.getenv("JOB_MIN_POLL_SECONDS", "5"))
+
+# A job returns an optional JSON-able summary (e.g. {"deleted": 20}) that is recorded with the run
+JobFunc = Callable[[], Awaitable[Any]]
+
+
+class ScheduledJob:
+    def __init__(self, name: str, func: JobFunc, interval_seconds: float, jitter_seconds: float = 0,
+                 run_at_start: bool = False, leader_only: bool = True):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.run_at_start = run_at_start
+        self.leader_only = leader_only
+        # Local view of the last run in this worker
+        self.runs = 0
+        self.failures = 0
+        self.last_status: Optional[str] = None
+        self.last_duration_ms: Optional[int] = None
+
+
+class JobScheduler:
+    def __init__(self, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.jobs: dict[str, ScheduledJob] = {}
+        self._collection = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._loops: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._lost_leases: dict[str, str] = {}  # job name -> why its running lease was given up
+
+    def register(self, name: str, func: JobFunc, interval_seconds: float, jitter_seconds: float = 0,
+                 run_at_start: bool = False, leader_only: bool = True) -> None:
+        """Add a job; call before start()"""
+        self.jobs[name] = ScheduledJob(name, func, interval_seconds, jitter_seconds, run_at_start, leader_only)
+
+    # ── lifecycle ────────────────────────────────────────────
+    async def start(self, collection) -> None:
+        self._collection = collection
+        self._stopping = asyncio.Event()
+        if any(job.run_at_start for job in self.jobs.values()):
+            # Startup jobs are due now, whatever the previous deployment scheduled
+            await collection.update_many(
+                {"_id": {"$in": [job.name for job in self.jobs.values() if job.run_at_start and job.leader_only]}},
+                {"$set": {"next_run_at": datetime.utcnow()}}
+            )
+        self._loops = [asyncio.create_task(self._job_loop(job)) for job in self.jobs.values()]
+        print(f"✅ Job scheduler started ({len(self.jobs)} jobs, worker {self.owner})")
+
+    async def stop(self, timeout: float = JOB_SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Stop scheduling, give running jobs up to timeout to finish, then cancel and release leases"""
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        if self._running:
+            await asyncio.wait(list(self._running.values()), timeout=timeout)
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        self._stopping = None
+
+    # ── scheduling ──────────────────────────────────────────
+    def _jitter(self, job: ScheduledJob) -> float:
+        return random.uniform(0, job.jitter_seconds) if job.jitter_seconds else 0.0
+
+    async def _sleep(self, seconds: float) -> bool:
+        """Sleep unless shutdown starts first; returns False when stopping"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=max(0.0, seconds))
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def _job_loop(self, job: ScheduledJob) -> None:
+        delay = self._jitter(job) if job.run_at_start else job.interval_seconds + self._jitter(job)
+        while await self._sleep(delay):
+            if not job.leader_only:
+                await self._run(job)
+                delay = job.interval_seconds + self._jitter(job)
+                continue
+
+            try:
+                if await self._acquire(job):
+                    await self._run(job)
+                    delay = job.interval_seconds + self._jitter(job)
+                else:
+                    delay = await self._seconds_until_due(job) + self._jitter(job)
+            except PyMongoError as e:
+                print(f"❌ Scheduler could not coordinate job '{job.name}': {e}")
+                delay = JOB_MIN_POLL_SECONDS + self._jitter(job)
+
+    async def _acquire(self, job: ScheduledJob) -> bool:
+        """Take the job's lease if the job is due and no live worker holds it"""
+        now = datetime.utcnow()
+        try:
+            document = await self._collection.find_one_and_update(
+                {
+                    "_id": job.name,
+                    "$and": [
+                        {"$or": [{"next_run_at": {"$lte": now}}, {"next_run_at": {"$exists": False}}]},
+                        {"$or": [{"lease_expires_at": {"$lte": now}}, {"lease_expires_at": {"$exists": False}}]},
+                    ],
+                },
+                {"$set": {"lease_owner": self.owner, "lease_expires_at": now + timedelta(seconds=self.lease_seconds)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return False  # document exists but is not due or is leased: the upsert collided with it
+        return document is not None and document.get("lease_owner") == self.owner
+
+    async def _seconds_until_due(self, job: ScheduledJob) -> float:
+        document = await self._collection.find_one({"_id": job.name}, {"next_run_at": 1, "lease_expires_at": 1})
+        now = datetime.utcnow()
+        due = [value for value in ((document or {}).get("next_run_at"), (document or {}).get("lease_expires_at")) if value]
+        wait = max(((value - now).total_seconds() for value in due), default=0.0)
+        return min(job.interval_seconds, max(JOB_MIN_POLL_SECONDS, wait))
+
+    async def _heartbeat(self, job: ScheduledJob, task: asyncio.Task) -> None:
+        """
+        Extend the lease while a long run is still going. If the lease is taken over, or
+        cannot be extended before it runs out, cancel the run: another worker may start it.
+        """
+        lease_until = time.monotonic() + self.lease_seconds
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                result = await self._collection.update_one(
+                    {"_id": job.name, "lease_owner": self.owner},
+                    {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=self.lease_seconds)}}
+                )
+            except PyMongoError as e:
+                print(f"❌ Could not extend the lease of job '{job.name}': {e}")
+                if lease_until - time.monotonic() > self.lease_seconds / 2:
+                    continue  # still time for another attempt before the lease runs out
+                reason = "lease could not be extended"
+            else:
+                if result.matched_count:
+                    lease_until = time.monotonic() + self.lease_seconds
+                    continue
+                reason = "lease was taken over by another worker"
+            print(f"❌ Job '{job.name}' lost its lease ({reason}), stopping this run")
+            self._lost_leases[job.name] = reason
+            task.cancel()
+            return
+
+    async def _run(self, job: ScheduledJob) -> None:
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        task = asyncio.create_task(job.func())
+        heartbeat = asyncio.create_task(self._heartbeat(job, task)) if job.leader_only else None
+        self._running[job.name] = task
+        result, error = None, None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            error = self._lost_leases.get(job.name, "cancelled during shutdown")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            self._running.pop(job.name, None)
+            self._lost_leases.pop(job.name, None)
+            if heartbeat is not None:
+                heartbeat.cancel()
+
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        job.runs += 1
+        job.last_duration_ms = duration_ms
+        job.last_status = "failed" if error else "ok"
+        if error:
+            job.failures += 1
+            print(f"❌ Job '{job.name}' failed after {duration_ms} ms: {error}")
+        else:
+            print(f"✅ Job '{job.name}' finished in {duration_ms} ms" + (f": {result}" if result is not None else ""))
+
+        if job.leader_only:
+            await self._record(job, started_at, duration_ms, result, error)
+
+    async def _record(self, job: ScheduledJob, started_at: datetime, duration_ms: int, result: Any, error: Optional[str]) -> None:
+        finished_at = datetime.utcnow()
+        update = {
+            "$set": {
+                "last_started_at": started_at,
+                "last_finished_at": finished_at,
+                "last_duration_ms": duration_ms,
+                "last_status": "failed" if error else "ok",
+                "last_error": error,
+                "last_owner": self.owner,
+                "interval_seconds": job.interval_seconds,
+                "next_run_at": finished_at + timedelta(seconds=job.interval_seconds),
+                "lease_expires_at": finished_at,  # release: the next run is gated by next_run_at
+            },
+            "$inc": {"runs": 1, "failures": 1 if error else 0},
+        }
+        if result is not None and not error:
+            update["$set"]["last_result"] = result
+        try:
+            await self._collection.update_one({"_id": job.name, "lease_owner": self.owner}, update)
+        except PyMongoError as e:
+            print(f"❌ Could not record run of job '{job.name}': {e}")
+
+    def status(self) -> dict:
+        """This worker's view of its jobs"""
+        return {
+            name: {
+                "interval_seconds": job.interval_seconds,
+                "leader_only": job.leader_only,
+                "running": name in self._running,
+                "runs": job.runs,
+                "failures": job.failures,
+                "last_status": job.last_status,
+                "last_duration_ms": job.last_duration_ms,
+            }
+            for name, job in self.jobs.items()
+        }
+
+
+job_scheduler = JobScheduler()
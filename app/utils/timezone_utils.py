@@ -2,8 +2,10 @@
 Timezone utility functions for team formation.
 Calculates timezone differences and filters candidates.
 """
+from bisect import bisect_right
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional
+import numpy as np
 import pytz
 
 # Common timezone mappings (IANA timezone names)
@@ -20,6 +22,55 @@ TIMEZONE_OFFSETS = {
 }
 
 
+class TimezoneOffsetCache:
+    """
+    UTC offsets per timezone, resolved once and reused until the zone's next DST
+    transition (fixed-offset zones never expire). Unknown zones resolve to UTC.
+    """
+
+    def __init__(self):
+        self._offsets: Dict[str, tuple] = {}  # timezone_str -> (offset_hours, valid_until naive UTC or None)
+
+    @staticmethod
+    def _resolve(timezone_str: str, now: datetime) -> tuple:
+        # Convert short codes to IANA format
+        name = TIMEZONE_OFFSETS.get(timezone_str, timezone_str)
+        try:
+            tz = pytz.timezone(name)
+        except Exception:
+            return 0.0, None  # Default to UTC if timezone is invalid
+
+        offset = pytz.UTC.localize(now).astimezone(tz).utcoffset()
+        transitions = getattr(tz, "_utc_transition_times", None)
+        valid_until = None
+        if transitions:
+            index = bisect_right(transitions, now)
+            valid_until = transitions[index] if index < len(transitions) else None
+        return offset.total_seconds() / 3600, valid_until
+
+    def offset_hours(self, timezone_str: str, now: Optional[datetime] = None) -> float:
+        now = now or datetime.utcnow()
+        cached = self._offsets.get(timezone_str)
+        if cached is not None and (cached[1] is None or now < cached[1]):
+            return cached[0]
+        offset, valid_until = self._resolve(timezone_str, now)
+        self._offsets[timezone_str] = (offset, valid_until)
+        return offset
+
+    def offsets_hours(self, timezones: Iterable[str]) -> np.ndarray:
+        """Offsets for many zones at once; each distinct zone is looked up a single time"""
+        timezones = list(timezones)
+        now = datetime.utcnow()
+        unique = {tz: self.offset_hours(tz, now) for tz in set(timezones)}
+        return np.array([unique[tz] for tz in timezones], dtype=np.float64)
+
+    def clear(self) -> None:
+        self._offsets.clear()
+
+
+timezone_offsets = TimezoneOffsetCache()
+
+
 def get_utc_offset_hours(timezone_str: str) -> float:
     """
     Get the UTC offset in hours for a given timezone.
@@ -36,17 +87,7 @@ def get_utc_offset_hours(timezone_str: str) -> float:
         >>> get_utc_offset_hours("PST")
         -8.0
     """
-    # Convert short codes to IANA format
-    if timezone_str in TIMEZONE_OFFSETS:
-        timezone_str = TIMEZONE_OFFSETS[timezone_str]
-    
-    try:
-        tz = pytz.timezone(timezone_str)
-        now = datetime.now(pytz.UTC)
-        offset = tz.utcoffset(now)
-        return offset.total_seconds() / 3600  # Convert to hours
-    except Exception:
-        return 0.0  # Default to UTC if timezone is invalid
+    return timezone_offsets.offset_hours(timezone_str)
 
 
 def calculate_timezone_difference(tz1: str, tz2: str) -> float:
@@ -126,17 +167,17 @@ def filter_candidates_by_timezone(
         >>> len(filtered)  # Only Priya passes
         1
     """
+    if not candidates:
+        return []
+
+    # One offset lookup per distinct zone, then differences/scores for all candidates at once
+    owner_offset = timezone_offsets.offset_hours(owner_timezone)
+    candidate_offsets = timezone_offsets.offsets_hours(c.get("timezone", "UTC") for c in candidates)
+    tz_diffs = np.abs(candidate_offsets - owner_offset)
+    tz_scores = np.where(tz_diffs > max_hour_difference, 0.0, 1.0 - tz_diffs / max_hour_difference)
+
     filtered_candidates = []
-    
-    for candidate in candidates:
-        candidate_tz = candidate.get("timezone", "UTC")
-        
-        # Calculate difference
-        tz_diff = calculate_timezone_difference(owner_timezone, candidate_tz)
-        
-        # Calculate score
-        tz_score = get_timezone_compatibility_score(owner_timezone, candidate_tz, max_hour_difference)
-        
+    for candidate, tz_diff, tz_score in zip(candidates, tz_diffs.tolist(), tz_scores.tolist()):
         # Add timezone info to candidate
         candidate["timezone_diff"] = tz_diff
         candidate["timezone_score"] = tz_score
@@ -148,6 +189,22 @@ def filter_candidates_by_timezone(
     return filtered_candidates
 
 
+def utc_offset_metadata_filter(owner_timezone: str, max_hour_difference: float = 4.0) -> dict:
+    """
+    Pinecone metadata filter keeping profiles whose stored utc_offset is within reach of the owner.
+    Widened by an hour because stored offsets may predate a DST change; the exact check is
+    still done by filter_candidates_by_timezone. Profiles indexed before utc_offset existed pass.
+    """
+    owner_offset = timezone_offsets.offset_hours(owner_timezone)
+    slack = max_hour_difference + 1.0
+    return {
+        "$or": [
+            {"utc_offset": {"$gte": owner_offset - slack, "$lte": owner_offset + slack}},
+            {"utc_offset": {"$exists": False}},
+        ]
+    }
+
+
 def get_timezone_label(tz_diff: float) -> str:
     """
     Get a human-readable label for timezone compatibility.
@@ -5,6 +5,8 @@ from pinecone import Pinecone,ServerlessSpec
 from dotenv import load_dotenv
 from langchain_core.documents import Document
 from fastapi import Depends
+from functools import lru_cache
+from app.utils.timezone_utils import get_utc_offset_hours
 
 load_dotenv()
 
@@ -18,9 +20,10 @@ def get_pinecone_instance():
     pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV)
     return pc
 
+@lru_cache(maxsize=None)
 def get_pinecone_index():
     """
-    Get or create the profiles Pinecone index
+    Get or create the profiles Pinecone index (resolved once per process)
     """
     pc = get_pinecone_instance()
 
@@ -42,9 +45,10 @@ def get_pinecone_index():
     return index
 
 
+@lru_cache(maxsize=None)
 def get_projects_pinecone_index():
     """
-    Get or create the projects Pinecone index
+    Get or create the projects Pinecone index (resolved once per process)
     """
     pc = get_pinecone_instance()
 
@@ -65,12 +69,15 @@ def get_projects_pinecone_index():
     return index
 
 
+@lru_cache(maxsize=None)
 def get_embedding_model():
+    """Sentence-transformer model, loaded once per process and shared by all vector stores"""
     embedding_model = HuggingFaceEmbeddings(
         model_name="sentence-transformers/all-MiniLM-L6-v2"
     )
     return embedding_model
 
+@lru_cache(maxsize=None)
 def get_pinecone_vector_store():
     index = get_pinecone_index()
     embedding_model = get_embedding_model()
@@ -81,6 +88,7 @@ def get_pinecone_vector_store():
     )
 
 
+@lru_cache(maxsize=None)
 def get_projects_vector_store():
     """Vector store for project semantic search"""
     index = get_projects_pinecone_index()
@@ -107,7 +115,9 @@ def index_profile(profile: dict):
             "username": profile.get("username"),
             "availability_hours": profile.get("availability_hours"),
             "email": profile.get("email"),
-            "timezone": profile.get("timezone", "UTC")
+            "timezone": profile.get("timezone", "UTC"),
+            # Lets skill search pre-filter by timezone inside the vector query
+            "utc_offset": get_utc_offset_hours(profile.get("timezone", "UTC") or "UTC")
         })
 
         vector_store = get_pinecone_vector_store()
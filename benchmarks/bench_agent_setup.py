@@ -0,0 +1,166 @@
+"""
+Per-request agent cost: rebuilding + compiling the graph and then running it on every
+request (the old behaviour) vs running the agent compiled once at startup.
+
+Both arms execute the full graph with a stub LLM (and a stub vector store for skill
+search), so the difference is the setup work alone, measured against real execution cost.
+
+Without --mongo-uri both arms checkpoint to memory, which isolates the StateGraph
+build/compile cost. With --mongo-uri both checkpoint to MongoDB; the old path also opens a
+fresh MongoDBSaver connection (and its index checks) per request, as the routers used to.
+
+Usage:
+    python -m benchmarks.bench_agent_setup [--iterations 200] [--llm-ms 0] [--mongo-uri mongodb://localhost:27017]
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+import app.agents.project_planner.nodes.feature_extraction as feature_extraction
+import app.agents.project_planner.nodes.milestone_definition as milestone_definition
+import app.agents.project_planner.nodes.task_generation as task_generation
+import app.agents.team_formation.nodes.llm_evaluator as llm_evaluator
+import app.agents.team_formation.nodes.role_analyzer as role_analyzer
+import app.agents.team_formation.nodes.skill_matcher as skill_matcher
+from app.agents.project_planner.graph import initiate_project_planner_agent_graph, compile_project_planner_agent
+from app.agents.team_formation.team_formation_graph import initiate_team_formation_agent_graph, compile_team_formation_agent
+
+# Canned answers, picked by a phrase of each node's system prompt
+STUB_RESPONSES = {
+    "technical architect": ["JWT Authentication", "Login Screen", "Task Board API", "Deployment"],
+    "Agile coach": [
+        {"sprint_number": 1, "name": "Foundation", "duration": "2 weeks",
+         "goals": ["Setup Repo", "Auth API"], "features": ["JWT Authentication", "Login Screen"]},
+        {"sprint_number": 2, "name": "Core", "duration": "2 weeks",
+         "goals": ["Task Board"], "features": ["Task Board API", "Deployment"]},
+    ],
+    "Tech Lead": [
+        {"id": "T-101", "title": "Setup repo", "assignee": "alice", "role": "Backend",
+         "estimate": "4h", "priority": "High", "status": "todo"},
+    ],
+    "team analyst": [{"role": "Backend Developer", "count": 1, "skills": ["Python", "FastAPI"]}],
+}
+
+
+class StubLLM:
+    model_name = "stub-model"
+    temperature = 0.5
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    async def ainvoke(self, messages):
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        text = "\n".join(m.content for m in messages)
+        for phrase, response in STUB_RESPONSES.items():
+            if phrase in text:
+                return AIMessage(content=json.dumps(response))
+        # Candidate evaluation: score every candidate in the prompt
+        emails = sorted({part.split('"')[0] for part in text.split('"email": "')[1:]})
+        return AIMessage(content=json.dumps([{"email": e, "match_score": 80, "reasoning": "ok"} for e in emails]))
+
+
+class StubEmbeddings:
+    def embed_documents(self, texts):
+        return [[0.0] * 8 for _ in texts]
+
+
+class StubVectorStore:
+    embeddings = StubEmbeddings()
+
+    def similarity_search_by_vector_with_score(self, vector, k, filter=None):
+        return [
+            (Document(page_content="Python, FastAPI, MongoDB",
+                      metadata={"name": f"Dev {i}", "username": f"dev{i}", "email": f"dev{i}@example.com",
+                                "availability_hours": 20, "timezone": "UTC"}), 0.9 - i * 0.05)
+            for i in range(k)
+        ]
+
+
+def install_stubs(latency_ms: float) -> None:
+    llm = StubLLM(latency_ms)
+    for module in (feature_extraction, milestone_definition, task_generation):
+        module.get_llm = lambda: llm
+    role_analyzer.get_chat_llm = lambda: llm
+    llm_evaluator.get_chat_llm = lambda: llm
+    skill_matcher.get_pinecone_vector_store = lambda: StubVectorStore()
+
+
+PLANNER_STATE = {
+    "project_id": "bench", "title": "Bench Project", "category": "Full Stack",
+    "description": "A task board with authentication.", "features": ["User Auth", "Task Board"],
+    "required_skills": ["Python", "React"], "team_size": {"min": 2, "max": 3},
+    "team_members": [{"username": "alice", "role": "Backend", "skills": ["Python"]}],
+    "estimated_duration": "4 weeks",
+}
+TEAM_STATE = {
+    "project_id": "bench", "project_title": "Bench Project", "required_skills": ["Python", "FastAPI"],
+    "team_size": 3, "timeline": "4 weeks", "owner_timezone": "UTC", "fast_mode": False,
+}
+
+
+def run_config() -> dict:
+    # Fresh thread per run (no checkpoint history), cache bypassed so every node really runs
+    return {"configurable": {"thread_id": uuid.uuid4().hex, "bypass_llm_cache": True}}
+
+
+@contextmanager
+def checkpointer_for(mongo_uri):
+    if not mongo_uri:
+        yield InMemorySaver()
+        return
+    from langgraph.checkpoint.mongodb import MongoDBSaver
+    with MongoDBSaver.from_conn_string(conn_string=mongo_uri, db_name="bench_checkpoints") as checkpointer:
+        yield checkpointer
+
+
+async def _old_request(initiate, state, mongo_uri):
+    graph = await initiate()
+    with checkpointer_for(mongo_uri) as checkpointer:
+        agent = graph.compile(checkpointer=checkpointer)
+        return await agent.ainvoke(dict(state), run_config())
+
+
+async def _bench(label, initiate, compile_once, state, iterations, mongo_uri):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await _old_request(initiate, state, mongo_uri)
+    old_ms = (time.perf_counter() - start) / iterations * 1000
+
+    with checkpointer_for(mongo_uri) as checkpointer:
+        start = time.perf_counter()
+        agent = await compile_once(checkpointer)
+        startup_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await agent.ainvoke(dict(state), run_config())
+        reused_ms = (time.perf_counter() - start) / iterations * 1000
+
+    print(f"{label:16s} per request (setup + run): {old_ms:8.3f} ms -> {reused_ms:8.3f} ms "
+          f"(one-off compile at startup: {startup_ms:.2f} ms)")
+
+
+async def main(iterations: int, llm_ms: float, mongo_uri: str | None) -> None:
+    install_stubs(llm_ms)
+    await _bench("team formation", initiate_team_formation_agent_graph, compile_team_formation_agent,
+                 TEAM_STATE, iterations, mongo_uri)
+    await _bench("project planner", initiate_project_planner_agent_graph, compile_project_planner_agent,
+                 PLANNER_STATE, iterations, mongo_uri)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--llm-ms", type=float, default=0, help="simulated latency per LLM call")
+    parser.add_argument("--mongo-uri", default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.llm_ms, args.mongo_uri))
@@ -0,0 +1,59 @@
+"""
+Per-request auth overhead micro-benchmark.
+
+Compares the old dependency (jwt.decode + three debug prints on every request) with the
+cached TokenVerifier behind get_current_user_id.
+
+Usage:
+    python -m benchmarks.bench_auth [--requests 20000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+# jwt_config reads these at import time
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "21")
+
+from app.config.jwt_config import create_access_token, decode_token  # noqa: E402
+from app.services.token_verifier import TokenVerifier  # noqa: E402
+
+
+def _old_dependency(token: str) -> int:
+    print(f"🔍 DEBUG: Token received: {token[:30] if token else 'NONE'}...")
+    payload = decode_token(token)
+    print(f"✅ DEBUG: User ID extracted: {payload['sub']}")
+    return int(payload["sub"])
+
+
+def _time_per_call(fn, token: str, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn(token)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main(requests: int) -> None:
+    token = create_access_token(42)
+    verifier = TokenVerifier()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        old = _time_per_call(_old_dependency, token, requests)
+    uncached = _time_per_call(lambda t: verifier._decode(t), token, requests)
+    cached = _time_per_call(verifier.verify, token, requests)
+
+    print(f"{requests} authenticated requests, same token")
+    print(f"  old dependency (decode + prints) : {old:7.2f} µs/request")
+    print(f"  verifier, cache miss             : {uncached:7.2f} µs/request")
+    print(f"  verifier, cache hit              : {cached:7.2f} µs/request")
+    print(f"  hit rate: {verifier.hits / (verifier.hits + verifier.misses):.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    main(parser.parse_args().requests)
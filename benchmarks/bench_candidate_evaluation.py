@@ -0,0 +1,99 @@
+"""
+Candidate evaluation prompt size and latency: one pretty-printed prompt with every
+candidate (the old behaviour) vs deduped, compact, token-budgeted chunks evaluated concurrently.
+
+Candidates are synthetic: each person matches --roles-per-person roles and carries a long
+profile text, as skill search returns them. The fake LLM's latency grows with prompt size.
+
+Usage:
+    python -m benchmarks.bench_candidate_evaluation [--people 60] [--roles-per-person 2] [--ms-per-1k-tokens 400]
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import ChatPromptTemplate
+
+from app.agents.llm_cache import llm_cache
+import app.agents.team_formation.nodes.llm_evaluator as llm_evaluator
+from app.agents.team_formation.evaluation import estimate_tokens
+
+
+def make_candidates(people: int, roles_per_person: int) -> list[dict]:
+    candidates = []
+    for i in range(people):
+        for r in range(roles_per_person):
+            candidates.append({
+                "role": f"Role {r}",
+                "name": f"Person {i}",
+                "username": f"person{i}",
+                "email": f"person{i}@example.com",
+                "skills": "Skills: Python, FastAPI, React, MongoDB, Docker. " * 12,
+                "similarity_score": 0.8,
+                "availability_hours": 20,
+                "timezone": "UTC",
+                "timezone_diff": 1.0,
+                "timezone_score": 0.9,
+            })
+    return candidates
+
+
+class FakeLLM:
+    model_name = "fake-model"
+    temperature = 0.5
+
+    def __init__(self, ms_per_1k_tokens: float):
+        self.ms_per_1k_tokens = ms_per_1k_tokens
+        self.prompt_tokens: list[int] = []
+
+    async def ainvoke(self, messages):
+        text = "".join(m.content for m in messages)
+        tokens = estimate_tokens(text)
+        self.prompt_tokens.append(tokens)
+        await asyncio.sleep(tokens / 1000 * self.ms_per_1k_tokens / 1000)
+        emails = sorted(set(re.findall(r'"email":\s*"([^"]+)"', text)))
+        return AIMessage(content=json.dumps([
+            {"email": email, "match_score": 80, "reasoning": "ok"} for email in emails
+        ]))
+
+
+async def old_evaluation(llm: FakeLLM, candidates: list[dict]) -> None:
+    messages = ChatPromptTemplate.from_template(llm_evaluator.EVAL_PROMPT).format_messages(
+        project_title="Bench", required_skills="Python", candidates_json=json.dumps(candidates, indent=2)
+    )
+    await llm.ainvoke(messages)
+
+
+async def main(people: int, roles_per_person: int, ms_per_1k_tokens: float) -> None:
+    candidates = make_candidates(people, roles_per_person)
+    state = {"project_title": "Bench", "required_skills": ["Python"], "candidates": candidates}
+
+    old_llm = FakeLLM(ms_per_1k_tokens)
+    start = time.perf_counter()
+    await old_evaluation(old_llm, candidates)
+    old_time = time.perf_counter() - start
+
+    new_llm = FakeLLM(ms_per_1k_tokens)
+    llm_evaluator.get_chat_llm = lambda: new_llm
+    llm_cache.clear()
+    start = time.perf_counter()
+    result = await llm_evaluator.evaluate_candidates(state, {"configurable": {"bypass_llm_cache": True}})
+    new_time = time.perf_counter() - start
+
+    print(f"{len(candidates)} candidate rows ({people} people x {roles_per_person} roles)")
+    print(f"  single pretty prompt : {sum(old_llm.prompt_tokens):7d} tokens in 1 call, {old_time * 1000:8.1f} ms")
+    print(f"  chunked compact      : {sum(new_llm.prompt_tokens):7d} tokens in {len(new_llm.prompt_tokens)} calls "
+          f"(largest {max(new_llm.prompt_tokens)}), {new_time * 1000:8.1f} ms")
+    print(f"  recommendations      : {len(result['recommendations'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=60)
+    parser.add_argument("--roles-per-person", type=int, default=2)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=400)
+    args = parser.parse_args()
+    asyncio.run(main(args.people, args.roles_per_person, args.ms_per_1k_tokens))
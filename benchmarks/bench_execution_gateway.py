@@ -0,0 +1,179 @@
+"""
+Execution throughput against a local fake Piston.
+
+The fake Piston has --cores CPU slots: when more runs are in flight than cores, every run
+slows down proportionally, and a run that exceeds its run_timeout is killed (as Piston
+does). One heavy user submits --heavy-runs executions and --light-users users submit
+--light-runs each, all at once. Compared:
+  (a) direct: a fresh httpx client per request, no limit (the old router)
+  (b) gateway: ExecutionGateway with max_concurrency = cores and fair per-user queues
+
+Usage:
+    python -m benchmarks.bench_execution_gateway [--cores 4] [--run-ms 200] [--run-timeout-ms 1500]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+import uvicorn
+
+from app.services.execution_gateway import ExecutionGateway
+
+_connections = 0
+_in_flight = 0
+
+
+def make_fake_piston_app(cores: int, run_ms: float):
+    async def app(scope, receive, send):
+        global _in_flight
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        request = json.loads(body or b"{}")
+
+        # CPU contention: progress per tick shrinks when more runs than cores are in flight
+        _in_flight += 1
+        done_ms, elapsed_ms, killed = 0.0, 0.0, False
+        try:
+            while done_ms < run_ms:
+                await asyncio.sleep(0.01)
+                elapsed_ms += 10
+                done_ms += 10 * min(1.0, cores / _in_flight)
+                if elapsed_ms > request.get("run_timeout", 3000):
+                    killed = True
+                    break
+        finally:
+            _in_flight -= 1
+
+        payload = json.dumps({
+            "language": request.get("language"), "version": "3.10.0",
+            "run": {"stdout": "" if killed else "ok\n", "stderr": "", "code": None if killed else 0,
+                    "signal": "SIGKILL" if killed else None},
+        }).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+    return app
+
+
+class _Server(uvicorn.Server):
+    """uvicorn server that records the ephemeral port it bound to"""
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        for server in self.servers:
+            for sock in server.sockets:
+                self.port = sock.getsockname()[1]
+
+
+def _count_connections(config: uvicorn.Config) -> None:
+    protocol_class = config.http_protocol_class
+
+    class CountingProtocol(protocol_class):
+        def connection_made(self, transport):
+            global _connections
+            _connections += 1
+            super().connection_made(transport)
+
+    config.http_protocol_class = CountingProtocol
+
+
+def _payload(run_timeout_ms: int) -> dict:
+    return {"language": "python", "version": "*", "files": [{"name": "main.py", "content": "print('ok')"}],
+            "stdin": "", "args": [], "compile_timeout": 10000, "run_timeout": run_timeout_ms}
+
+
+async def _scenario(run_one, users: dict[int, int]) -> tuple[float, dict[int, list[float]], int]:
+    latencies: dict[int, list[float]] = {user: [] for user in users}
+    killed = 0
+
+    async def timed(user_id):
+        nonlocal killed
+        start = time.perf_counter()
+        result = await run_one(user_id)
+        latencies[user_id].append(time.perf_counter() - start)
+        if result["run"]["signal"]:
+            killed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[timed(user) for user, runs in users.items() for _ in range(runs)])
+    return time.perf_counter() - start, latencies, killed
+
+
+def _report(label, total_time, latencies, killed, connections, runs):
+    light = [lat for user, lats in latencies.items() if user != 0 for lat in lats]
+    print(f"  {label:8s}: {runs / total_time:6.1f} runs/s, {killed:3d}/{runs} killed by run_timeout, "
+          f"{connections:3d} connections, light users mean {statistics.mean(light) * 1000:7.1f} ms")
+
+
+async def main(cores, run_ms, run_timeout_ms, heavy_runs, light_users, light_runs):
+    global _connections
+    config = uvicorn.Config(make_fake_piston_app(cores, run_ms), host="127.0.0.1", port=0, log_level="warning")
+    config.load()
+    _count_connections(config)
+    server = _Server(config)
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    url = f"http://127.0.0.1:{server.port}/api/v2/execute"
+
+    users = {0: heavy_runs, **{u: light_runs for u in range(1, light_users + 1)}}
+    runs = sum(users.values())
+
+    async def direct(user_id):
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, json=_payload(run_timeout_ms), timeout=60)
+            return response.json()
+
+    _connections = 0
+    direct_result = await _scenario(direct, users)
+    direct_connections = _connections
+
+    gateway = ExecutionGateway(url=url, max_concurrency=cores, max_queue=runs, max_queued_per_user=runs)
+
+    async def via_gateway(user_id):
+        result, _ = await gateway.execute(user_id, _payload(run_timeout_ms))
+        return result
+
+    _connections = 0
+    gateway_result = await _scenario(via_gateway, users)
+    gateway_connections = _connections
+    await gateway.aclose()
+
+    server.should_exit = True
+    await serve_task
+
+    print(f"{runs} runs (1 user x {heavy_runs}, {light_users} users x {light_runs}), "
+          f"{cores} cores, {run_ms:.0f} ms per run, run_timeout {run_timeout_ms} ms")
+    _report("direct", *direct_result, direct_connections, runs)
+    _report("gateway", *gateway_result, gateway_connections, runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--run-ms", type=float, default=200)
+    parser.add_argument("--run-timeout-ms", type=int, default=1500)
+    parser.add_argument("--heavy-runs", type=int, default=40)
+    parser.add_argument("--light-users", type=int, default=4)
+    parser.add_argument("--light-runs", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.cores, args.run_ms, args.run_timeout_ms, args.heavy_runs, args.light_users, args.light_runs))
@@ -0,0 +1,153 @@
+"""
+LLM client benchmark against a local fake OpenAI-compatible server.
+
+Starts a tiny /v1/chat/completions server in-process, then sends the same burst of
+concurrent calls through (a) a fresh ChatOpenAI per call, as the nodes used to do, and
+(b) the shared LLMClientRegistry. Reports wall time and how many TCP connections the
+server accepted for each.
+
+The fake server can also be run on its own to exercise the app end to end:
+    python -m benchmarks.bench_llm_clients --serve --port 8765
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 uvicorn app.main:app
+
+Usage:
+    python -m benchmarks.bench_llm_clients [--calls 64] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from app.agents.llm_config import LLMClientRegistry
+
+_connections = 0
+
+
+def make_fake_openai_app(latency_ms: float):
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        await asyncio.sleep(latency_ms / 1000)
+        request = json.loads(body or b"{}")
+        payload = json.dumps({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "[\"Fake feature\"]"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": payload})
+
+    return app
+
+
+class _CountingServer(uvicorn.Server):
+    """uvicorn server that records the ephemeral port it bound to"""
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        for server in self.servers:
+            for sock in server.sockets:
+                self.port = sock.getsockname()[1]
+
+
+def _count_connections(config: uvicorn.Config) -> None:
+    protocol_class = config.http_protocol_class
+
+    class CountingProtocol(protocol_class):
+        def connection_made(self, transport):
+            global _connections
+            _connections += 1
+            super().connection_made(transport)
+
+    config.http_protocol_class = CountingProtocol
+
+
+async def _burst(get_llm, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        get_llm().ainvoke([HumanMessage(content=f"request {i}")]) for i in range(calls)
+    ])
+    return time.perf_counter() - start
+
+
+async def main(calls: int, latency_ms: float) -> None:
+    global _connections
+    config = uvicorn.Config(make_fake_openai_app(latency_ms), host="127.0.0.1", port=0, log_level="warning")
+    config.load()
+    _count_connections(config)
+    server = _CountingServer(config)
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    base_url = f"http://127.0.0.1:{server.port}/v1"
+
+    fresh_clients = []
+
+    def fresh_llm():
+        llm = ChatOpenAI(model="fake-model", base_url=base_url, api_key="sk-fake", temperature=0.5)
+        fresh_clients.append(llm)
+        return llm
+
+    _connections = 0
+    fresh_time = await _burst(fresh_llm, calls)
+    fresh_connections = _connections
+
+    registry = LLMClientRegistry(base_url=base_url, api_keys=["sk-fake-1", "sk-fake-2", "sk-fake-3"])
+    await _burst(lambda: registry.get("fake-model"), registry.max_concurrency_per_model)  # warm the pool
+    _connections = 0
+    pooled_time = await _burst(lambda: registry.get("fake-model"), calls)
+    pooled_connections = _connections
+    await registry.aclose()
+
+    server.should_exit = True
+    await serve_task
+
+    print(f"{calls} concurrent calls, {latency_ms:.0f} ms fake model latency")
+    print(f"  fresh ChatOpenAI per call : {fresh_time * 1000:8.1f} ms, {fresh_connections} new connections")
+    print(f"  shared registry           : {pooled_time * 1000:8.1f} ms, {pooled_connections} new connections "
+          f"(cap {registry.max_concurrency_per_model}/model, {len(registry.api_keys)} keys rotated)")
+
+
+def serve(port: int, latency_ms: float) -> None:
+    uvicorn.run(make_fake_openai_app(latency_ms), host="127.0.0.1", port=port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--serve", action="store_true", help="only run the fake OpenAI server")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.port, args.latency_ms)
+    else:
+        asyncio.run(main(args.calls, args.latency_ms))
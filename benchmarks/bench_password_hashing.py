@@ -0,0 +1,60 @@
+"""
+Login throughput benchmark for password verification.
+
+Compares verifying on the event loop (the old behaviour) with the bcrypt process pool
+used by /api/auth/login, and reports logins/sec overall and per core.
+
+Usage:
+    python -m benchmarks.bench_password_hashing [--logins 64] [--rounds 12]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from app.config import security
+
+
+async def _bench_inline(hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        security.verify_password("correct horse battery staple", hashed)
+    return time.perf_counter() - start
+
+
+async def _bench_pool(hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        security.verify_password_async("correct horse battery staple", hashed)
+        for _ in range(logins)
+    ])
+    return time.perf_counter() - start
+
+
+async def main(logins: int, rounds: int) -> None:
+    os.environ["BCRYPT_ROUNDS"] = str(rounds)  # skip calibration, measure a fixed cost
+    hashed = security.hash_password("correct horse battery staple", rounds=rounds)
+
+    security.start_password_hasher()
+    try:
+        # Warm the pool so process start-up is not part of the measurement
+        await security.verify_password_async("warm-up", hashed)
+
+        inline = await _bench_inline(hashed, logins)
+        pooled = await _bench_pool(hashed, logins)
+    finally:
+        security.shutdown_password_hasher()
+
+    cores = security.PASSWORD_HASH_WORKERS
+    print(f"bcrypt cost {rounds}, {logins} logins, {cores} workers")
+    print(f"  inline : {logins / inline:8.1f} logins/s  ({logins / inline:6.1f} per core, loop blocked {inline * 1000:.0f} ms)")
+    print(f"  pool   : {logins / pooled:8.1f} logins/s  ({logins / pooled / cores:6.1f} per core, loop free)")
+    print(f"  calibrated cost for {security.BCRYPT_TARGET_MS} ms target: {security.calibrate_bcrypt_rounds()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.rounds))
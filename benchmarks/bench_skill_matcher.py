@@ -0,0 +1,89 @@
+"""
+skill_matcher latency with a simulated embedding model and Pinecone round trip:
+one embed + query per role in series (the old behaviour) vs one batched embed and
+concurrent vector queries.
+
+Usage:
+    python -m benchmarks.bench_skill_matcher [--roles 6] [--embed-ms 15] [--query-ms 80]
+"""
+import argparse
+import asyncio
+import time
+
+from langchain_core.documents import Document
+
+import app.agents.team_formation.nodes.skill_matcher as skill_matcher_module
+
+
+class FakeEmbeddings:
+    def __init__(self, embed_ms: float):
+        self.embed_ms = embed_ms
+        self.calls = 0
+
+    def embed_query(self, text):
+        self.calls += 1
+        time.sleep(self.embed_ms / 1000)
+        return [0.0] * 384
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        time.sleep(self.embed_ms / 1000)  # batched: roughly one forward pass
+        return [[0.0] * 384 for _ in texts]
+
+
+class FakeVectorStore:
+    def __init__(self, embed_ms: float, query_ms: float):
+        self.embeddings = FakeEmbeddings(embed_ms)
+        self.query_ms = query_ms
+        self.queries = 0
+
+    def _results(self, k):
+        self.queries += 1
+        time.sleep(self.query_ms / 1000)
+        return [
+            (Document(page_content="Python FastAPI", metadata={"email": f"p{i}@example.com", "timezone": "UTC"}), 0.9 - i * 0.1)
+            for i in range(k)
+        ]
+
+    def similarity_search_with_score(self, query, k=4):
+        self.embeddings.embed_query(query)
+        return self._results(k)
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, filter=None):
+        return self._results(k)
+
+
+def old_skill_matcher(vector_store, roles):
+    for role in roles:
+        vector_store.similarity_search_with_score(" ".join(role["skills"]), k=5)
+
+
+async def main(role_count: int, embed_ms: float, query_ms: float) -> None:
+    roles = [{"role": f"Role {i}", "skills": [f"skill{i}", "python"]} for i in range(role_count)]
+    state = {"roles": roles, "owner_timezone": "UTC"}
+
+    store = FakeVectorStore(embed_ms, query_ms)
+    start = time.perf_counter()
+    old_skill_matcher(store, roles)
+    old_time = time.perf_counter() - start
+    old_embeds = store.embeddings.calls
+
+    store = FakeVectorStore(embed_ms, query_ms)
+    skill_matcher_module.get_pinecone_vector_store = lambda: store
+    start = time.perf_counter()
+    result = await skill_matcher_module.skill_matcher(state)
+    new_time = time.perf_counter() - start
+
+    print(f"{role_count} roles, {embed_ms:.0f} ms embed, {query_ms:.0f} ms vector query")
+    print(f"  serial per role    : {old_time * 1000:8.1f} ms ({old_embeds} embed calls)")
+    print(f"  batched+concurrent : {new_time * 1000:8.1f} ms ({store.embeddings.calls} embed call, "
+          f"{store.queries} concurrent queries, {len(result['candidates'])} unique candidates)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=6)
+    parser.add_argument("--embed-ms", type=float, default=15)
+    parser.add_argument("--query-ms", type=float, default=80)
+    args = parser.parse_args()
+    asyncio.run(main(args.roles, args.embed_ms, args.query_ms))